@@ -123,7 +123,10 @@ if __name__ == '__main__':
     if not test:
         logger.info('Running the benchmarks')
         logger.weak_line()
-        suite.run(exec_type=exec_type)
+        try:
+            suite.run(exec_type=exec_type)
+        finally:
+            suite.close()
 
         if exec_type != 'slurm':
             logger.info('Saving the plots on disk')
@@ -6,6 +6,7 @@ from mushroom_rl.algorithms.actor_critic import DDPG
 from mushroom_rl.policy import OrnsteinUhlenbeckPolicy
 
 from mushroom_rl_benchmark.builders import AgentBuilder
+from mushroom_rl_benchmark.builders.memory import replace_replay_memory
 from mushroom_rl_benchmark.builders.network import DDPGActorNetwork as ActorNetwork, DDPGCriticNetwork as CriticNetwork
 
 
@@ -16,7 +17,7 @@ class DDPGBuilder(AgentBuilder):
     """
 
     def __init__(self, policy_class, policy_params, actor_params, actor_optimizer, critic_params, alg_params,
-                 preprocessors=None, n_steps_per_fit=1):
+                 preprocessors=None, n_steps_per_fit=1, replay_memory=None, prefetch=False, fit_batch=None):
         """
         Constructor.
 
@@ -27,7 +28,12 @@ class DDPGBuilder(AgentBuilder):
             actor_optimizer (dict): parameters for the actor optimizer;
             critic_params (dict): parameters for the critic;
             alg_params (dict): parameters for the algorithm;
-            n_steps_per_fit (int, 1): number of steps per fit.
+            n_steps_per_fit (int, 1): number of steps per fit;
+            replay_memory (str, None): type of replay memory, see build_replay_memory. By default, the replay
+                memory of the algorithm is used;
+            prefetch (bool, False): select to sample the minibatches in a background thread;
+            fit_batch (int, None): number of fits batched together, see set_fit_batch. If None, the fit
+                batching mode is disabled.
 
         """
         self.policy_class = policy_class
@@ -36,7 +42,10 @@ class DDPGBuilder(AgentBuilder):
         self.actor_optimizer = actor_optimizer
         self.critic_params = critic_params
         self.alg_params = alg_params
+        self.replay_memory = replay_memory
+        self.prefetch = prefetch
         super().__init__(n_steps_per_fit=n_steps_per_fit, preprocessors=preprocessors, compute_policy_entropy=False)
+        self.set_fit_batch(fit_batch)
 
     def build(self, mdp_info):
         actor_input_shape = mdp_info.observation_space.shape
@@ -47,8 +56,12 @@ class DDPGBuilder(AgentBuilder):
         critic_input_shape = (actor_input_shape[0] + mdp_info.action_space.shape[0],)
         self.critic_params["input_shape"] = critic_input_shape
         self.critic_params["action_shape"] = mdp_info.action_space.shape
-        return DDPG(mdp_info, self.policy_class, self.policy_params, self.actor_params, self.actor_optimizer,
-                    self.critic_params, **self.alg_params)
+        agent = DDPG(mdp_info, self.policy_class, self.policy_params, self.actor_params, self.actor_optimizer,
+                     self.critic_params, **self.alg_params)
+
+        return replace_replay_memory(agent, getattr(self, 'replay_memory', None),
+                                     self.alg_params['initial_replay_size'], self.alg_params['max_replay_size'],
+                                     prefetch=getattr(self, 'prefetch', False))
 
     def compute_Q(self, agent, states):
         actions = agent._actor_approximator(states)
@@ -58,7 +71,8 @@ class DDPGBuilder(AgentBuilder):
     @classmethod
     def default(cls, actor_lr=1e-4, actor_network=ActorNetwork, critic_lr=1e-3, critic_network=CriticNetwork,
                 initial_replay_size=500, max_replay_size=50000, batch_size=64, n_features=[80, 80], tau=1e-3,
-                use_cuda=False, preprocessors=None, get_default_dict=False):
+                use_cuda=False, preprocessors=None, replay_memory=None, prefetch=False, fit_batch=None,
+                get_default_dict=False):
         defaults = locals()
         
         policy_class = OrnsteinUhlenbeckPolicy
@@ -91,7 +105,9 @@ class DDPGBuilder(AgentBuilder):
             batch_size=batch_size,
             tau=tau)
 
-        builder = cls(policy_class, policy_params, actor_params, actor_optimizer, critic_params, alg_params, preprocessors=preprocessors)
+        builder = cls(policy_class, policy_params, actor_params, actor_optimizer, critic_params, alg_params,
+                      preprocessors=preprocessors, replay_memory=replay_memory, prefetch=prefetch,
+                      fit_batch=fit_batch)
 
         if get_default_dict:
             return builder, defaults
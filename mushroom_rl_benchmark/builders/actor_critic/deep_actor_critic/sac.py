@@ -5,6 +5,7 @@ import torch.nn.functional as F
 from mushroom_rl.algorithms.actor_critic import SAC
 
 from mushroom_rl_benchmark.builders import AgentBuilder
+from mushroom_rl_benchmark.builders.memory import replace_replay_memory
 from mushroom_rl_benchmark.builders.network import SACActorNetwork as ActorNetwork, SACCriticNetwork as CriticNetwork
 
 
@@ -14,7 +15,8 @@ class SACBuilder(AgentBuilder):
     """
 
     def __init__(self, actor_mu_params, actor_sigma_params, actor_optimizer, critic_params, alg_params,
-                 n_q_samples=100, n_steps_per_fit=1, preprocessors=None):
+                 n_q_samples=100, n_steps_per_fit=1, preprocessors=None, replay_memory=None,
+                 prefetch=False, fit_batch=None):
         """
         Constructor.
 
@@ -26,7 +28,12 @@ class SACBuilder(AgentBuilder):
             alg_params (dict): parameters for the algorithm;
             n_q_samples (int, 100): number of samples to compute value function;
             n_steps_per_fit (int, 1): number of steps per fit;
-            preprocessors (list, None): list of preprocessors.
+            preprocessors (list, None): list of preprocessors;
+            replay_memory (str, None): type of replay memory, see build_replay_memory. By default, the replay
+                memory of the algorithm is used;
+            prefetch (bool, False): select to sample the minibatches in a background thread;
+            fit_batch (int, None): number of fits batched together, see set_fit_batch. If None, the fit
+                batching mode is disabled.
 
         """
         self.actor_mu_params = actor_mu_params
@@ -35,7 +42,10 @@ class SACBuilder(AgentBuilder):
         self.critic_params = critic_params
         self.alg_params = alg_params
         self.n_q_samples = n_q_samples
+        self.replay_memory = replay_memory
+        self.prefetch = prefetch
         super().__init__(n_steps_per_fit=n_steps_per_fit, compute_entropy_with_states=True, preprocessors=preprocessors)
+        self.set_fit_batch(fit_batch)
 
     def build(self, mdp_info):
         actor_input_shape = mdp_info.observation_space.shape
@@ -48,7 +58,9 @@ class SACBuilder(AgentBuilder):
         self.critic_params["input_shape"] = critic_input_shape
         sac = SAC(mdp_info, self.actor_mu_params, self.actor_sigma_params, self.actor_optimizer, self.critic_params,
                   **self.alg_params)
-        return sac
+        return replace_replay_memory(sac, getattr(self, 'replay_memory', None),
+                                     self.alg_params['initial_replay_size'], self.alg_params['max_replay_size'],
+                                     prefetch=getattr(self, 'prefetch', False))
 
     def compute_Q(self, agent, states):
         Q = list()
@@ -62,7 +74,8 @@ class SACBuilder(AgentBuilder):
     def default(cls, actor_lr=3e-4, actor_network=ActorNetwork, critic_lr=3e-4, critic_network=CriticNetwork,
                 initial_replay_size=64, max_replay_size=50000, n_features=64, warmup_transitions=100,
                 batch_size=64, tau=5e-3, lr_alpha=3e-3,
-                preprocessors=None, target_entropy=None, use_cuda=False, get_default_dict=False):
+                preprocessors=None, target_entropy=None, use_cuda=False, replay_memory=None, prefetch=False,
+                fit_batch=None, get_default_dict=False):
         defaults = locals()
 
         actor_mu_params = dict(network=actor_network,
@@ -94,7 +107,8 @@ class SACBuilder(AgentBuilder):
             target_entropy=target_entropy)
 
         builder = cls(actor_mu_params, actor_sigma_params, actor_optimizer, critic_params, alg_params,
-                      preprocessors=preprocessors)
+                      preprocessors=preprocessors, replay_memory=replay_memory, prefetch=prefetch,
+                      fit_batch=fit_batch)
 
         if get_default_dict:
             return builder, defaults
@@ -6,6 +6,7 @@ from mushroom_rl.algorithms.actor_critic import TD3
 from mushroom_rl.policy import ClippedGaussianPolicy
 
 from mushroom_rl_benchmark.builders import AgentBuilder
+from mushroom_rl_benchmark.builders.memory import replace_replay_memory
 from mushroom_rl_benchmark.builders.network import TD3ActorNetwork as ActorNetwork, TD3CriticNetwork as CriticNetwork
 
 
@@ -16,7 +17,8 @@ class TD3Builder(AgentBuilder):
     """
 
     def __init__(self, policy_class, policy_params, actor_params, actor_optimizer, critic_params, alg_params,
-                 n_steps_per_fit=1., preprocessors=None):
+                 n_steps_per_fit=1., preprocessors=None, replay_memory=None, prefetch=False,
+                 fit_batch=None):
         """
         Constructor.
 
@@ -27,7 +29,12 @@ class TD3Builder(AgentBuilder):
             actor_optimizer (dict): parameters for the actor optimizer;
             critic_params (dict): parameters for the critic;
             alg_params (dict): parameters for the algorithm;
-            n_steps_per_fit (int, 1): number of steps per fit.
+            n_steps_per_fit (int, 1): number of steps per fit;
+            replay_memory (str, None): type of replay memory, see build_replay_memory. By default, the replay
+                memory of the algorithm is used;
+            prefetch (bool, False): select to sample the minibatches in a background thread;
+            fit_batch (int, None): number of fits batched together, see set_fit_batch. If None, the fit
+                batching mode is disabled.
 
         """
         self.policy_class = policy_class
@@ -36,7 +43,10 @@ class TD3Builder(AgentBuilder):
         self.actor_optimizer = actor_optimizer
         self.critic_params = critic_params
         self.alg_params = alg_params
+        self.replay_memory = replay_memory
+        self.prefetch = prefetch
         super().__init__(n_steps_per_fit=n_steps_per_fit, preprocessors=preprocessors, compute_policy_entropy=False)
+        self.set_fit_batch(fit_batch)
 
     def build(self, mdp_info):
         actor_input_shape = mdp_info.observation_space.shape
@@ -53,8 +63,12 @@ class TD3Builder(AgentBuilder):
             self.policy_params['low'] = mdp_info.action_space.low
             self.policy_params['high'] = mdp_info.action_space.high
 
-        return TD3(mdp_info, self.policy_class, self.policy_params, self.actor_params, self.actor_optimizer,
-                   self.critic_params, **self.alg_params)
+        agent = TD3(mdp_info, self.policy_class, self.policy_params, self.actor_params, self.actor_optimizer,
+                    self.critic_params, **self.alg_params)
+
+        return replace_replay_memory(agent, getattr(self, 'replay_memory', None),
+                                     self.alg_params['initial_replay_size'], self.alg_params['max_replay_size'],
+                                     prefetch=getattr(self, 'prefetch', False))
 
     def compute_Q(self, agent, states):
         actions = agent._actor_approximator(states)
@@ -64,7 +78,8 @@ class TD3Builder(AgentBuilder):
     @classmethod
     def default(cls, actor_lr=1e-4, actor_network=ActorNetwork, critic_lr=1e-3, critic_network=CriticNetwork,
                 initial_replay_size=500, max_replay_size=50000, batch_size=64, n_features=[80, 80], tau=1e-3,
-                preprocessors=None, use_cuda=False, get_default_dict=False):
+                preprocessors=None, use_cuda=False, replay_memory=None, prefetch=False, fit_batch=None,
+                get_default_dict=False):
         defaults = locals()
         
         policy_class = ClippedGaussianPolicy
@@ -95,7 +110,9 @@ class TD3Builder(AgentBuilder):
             batch_size=batch_size,
             tau=tau)
 
-        builder = cls(policy_class, policy_params, actor_params, actor_optimizer, critic_params, alg_params, preprocessors=preprocessors)
+        builder = cls(policy_class, policy_params, actor_params, actor_optimizer, critic_params, alg_params,
+                      preprocessors=preprocessors, replay_memory=replay_memory, prefetch=prefetch,
+                      fit_batch=fit_batch)
 
         if get_default_dict:
             return builder, defaults
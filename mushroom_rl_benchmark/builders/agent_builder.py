@@ -1,4 +1,6 @@
 from copy import deepcopy
+
+import numpy as np
 import mushroom_rl.utils.preprocessors as m_prep
 
 
@@ -20,6 +22,7 @@ class AgentBuilder:
         self._preprocessors = None
         self._n_steps_per_fit = n_steps_per_fit
         self._n_episodes_per_fit = n_episodes_per_fit
+        self._fit_batch = None
         self.set_preprocessors(preprocessors)
         self.compute_policy_entropy = compute_policy_entropy
         self.compute_entropy_with_states = compute_entropy_with_states
@@ -32,6 +35,27 @@ class AgentBuilder:
         """
         return dict(n_steps_per_fit=self._n_steps_per_fit, n_episodes_per_fit=self._n_episodes_per_fit)
 
+    def set_fit_batch(self, fit_batch):
+        """
+        Set the fit batching mode for the specific AgentBuilder. The steps of fit_batch fits are collected
+        before fitting the agent, and the fit_batch updates are run back-to-back, with their minibatches
+        drawn together. The mode is used only by the agents with a replay memory and n_steps_per_fit.
+
+        Args:
+            fit_batch (int, None): number of fits batched together. If None, the fit batching mode is
+                disabled.
+
+        """
+        self._fit_batch = fit_batch
+
+    def get_fit_batch(self):
+        """
+        Get the number of fits batched together for the specific AgentBuilder, None if the fit batching mode
+        is disabled
+
+        """
+        return getattr(self, '_fit_batch', None)
+
     def set_preprocessors(self, preprocessors):
         """
         Set preprocessor for the specific AgentBuilder
@@ -97,7 +121,23 @@ class AgentBuilder:
 
         """
         pass
-    
+
+    def draw_actions(self, agent, states):
+        """
+        Draw the actions of the agent for a batch of states, as done by the vectorized evaluation.
+        This function can be overwritten by any agent builder to compute the actions of the
+        whole batch with a single forward pass.
+
+        Args:
+            agent (Agent): the considered agent;
+            states (np.ndarray): the batch of states.
+
+        Returns:
+            The batch of actions.
+
+        """
+        return np.array([agent.draw_action(state) for state in states])
+
     @classmethod
     def default(cls, get_default_dict=False, **kwargs):
         """
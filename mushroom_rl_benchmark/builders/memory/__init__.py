@@ -0,0 +1,20 @@
+from .vectorized_replay_memory import VectorizedSumTree, VectorizedPrioritizedReplayMemory
+from .compact_replay_memory import FrameBuffer, CompactReplayMemory, CompactPrioritizedReplayMemory
+from .disk_replay_memory import DiskReplayMemory
+from .prefetching_replay_memory import PrefetchingReplayMemory
+from .batched_replay_memory import BatchedReplayMemory
+from .replay_memory_factory import build_replay_memory, replace_replay_memory
+
+
+__all__ = [
+    'VectorizedSumTree',
+    'VectorizedPrioritizedReplayMemory',
+    'FrameBuffer',
+    'CompactReplayMemory',
+    'CompactPrioritizedReplayMemory',
+    'DiskReplayMemory',
+    'PrefetchingReplayMemory',
+    'BatchedReplayMemory',
+    'build_replay_memory',
+    'replace_replay_memory'
+]
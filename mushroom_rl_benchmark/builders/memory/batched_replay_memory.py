@@ -0,0 +1,107 @@
+from mushroom_rl.core import Serializable
+
+
+class BatchedReplayMemory(Serializable):
+    """
+    Wrapper of a uniform replay memory used by the fit batching mode, where a fit of the agent is followed by
+    further updates without new transitions. The minibatches of all the updates of a fit are drawn with a
+    single sample of the wrapped memory, and returned one at a time. As the memory does not change between
+    the updates of a fit, the minibatches are distributed as the ones drawn by separate samples.
+
+    """
+    def __init__(self, replay_memory, n_batches):
+        """
+        Constructor.
+
+        Args:
+            replay_memory (ReplayMemory): the wrapped replay memory;
+            n_batches (int): number of minibatches drawn with each sample, i.e. the number of updates of a fit.
+
+        """
+        self._replay_memory = replay_memory
+        self._n_batches = n_batches
+
+        self._batches = list()
+
+        self._add_save_attr(
+            _replay_memory='mushroom',
+            _n_batches='primitive'
+        )
+
+    def add(self, dataset, n_steps_return=1, gamma=1.):
+        """
+        Add elements to the replay memory. The minibatches not used yet are discarded when new elements are
+        added.
+
+        Args:
+            dataset (list): list of elements to add to the replay memory;
+            n_steps_return (int, 1): number of steps to consider for computing n-step return;
+            gamma (float, 1.): discount factor for n-step return.
+
+        """
+        if len(dataset) > 0:
+            self._batches = list()
+            self._replay_memory.add(dataset, n_steps_return=n_steps_return, gamma=gamma)
+
+    def get(self, n_samples):
+        """
+        Returns the next minibatch, drawing the minibatches of the next updates when none is left.
+
+        Args:
+            n_samples (int): the number of samples to return.
+
+        Returns:
+            The requested number of samples.
+
+        """
+        if len(self._batches) == 0 or len(self._batches[0][0]) != n_samples:
+            samples = self._replay_memory.get(n_samples * self._n_batches)
+            self._batches = [tuple(values[i * n_samples:(i + 1) * n_samples] for values in samples)
+                             for i in range(self._n_batches)]
+
+        return self._batches.pop(0)
+
+    def reset(self):
+        """
+        Reset the replay memory, discarding the minibatches not used yet.
+
+        """
+        self._batches = list()
+        self._replay_memory.reset()
+
+    def unwrap(self):
+        """
+        Returns:
+            The wrapped replay memory. When it is a wrapper itself, the replay memory wrapped by it.
+
+        """
+        replay_memory = self._replay_memory
+
+        return replay_memory.unwrap() if hasattr(replay_memory, 'unwrap') else replay_memory
+
+    @property
+    def initialized(self):
+        """
+        Returns:
+            Whether the replay memory has reached the number of elements that allows it to be used.
+
+        """
+        return self._replay_memory.initialized
+
+    @property
+    def size(self):
+        """
+        Returns:
+            The number of elements contained in the replay memory.
+
+        """
+        return self._replay_memory.size
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_batches'] = list()
+
+        return state
+
+    def _post_load(self):
+        self._batches = list()
@@ -0,0 +1,321 @@
+import numpy as np
+
+from mushroom_rl.utils.replay_memory import ReplayMemory
+
+from .vectorized_replay_memory import VectorizedPrioritizedReplayMemory
+
+
+class FrameBuffer:
+    """
+    Contiguous storage of the frames of stacked observations. Each frame is stored once, and the stacks are
+    stored as references to their frames. Consecutive stacks are deduplicated by content, so that the
+    frames shared by a state and its next state, and by consecutive transitions, are not stored again.
+    The references are increasing frame counters: a frame is stored in the position given by its reference
+    modulo the capacity, and the buffer is grown when a new frame would overwrite a frame still referenced.
+
+    """
+    def __init__(self, capacity):
+        """
+        Constructor.
+
+        Args:
+            capacity (int): initial number of frames of the buffer.
+
+        """
+        self._capacity = capacity
+        self._frames = None
+        self._n_frames = 0
+        self._last_refs = None
+
+    @property
+    def n_frames(self):
+        """
+        Returns:
+            The number of frames stored since the creation of the buffer, i.e. the reference of the next frame.
+
+        """
+        return self._n_frames
+
+    def add(self, stack, oldest_ref):
+        """
+        Store the frames of a stack that are not already stored.
+
+        Args:
+            stack (np.ndarray): the stack of frames, with the frames along the first axis;
+            oldest_ref (int): reference of the oldest frame that is still in use.
+
+        Returns:
+            The array of references of the frames of the stack.
+
+        """
+        stack_frames = np.asarray(stack)
+        if self._frames is None:
+            self._frames = np.empty((self._capacity,) + stack_frames.shape[1:], dtype=stack_frames.dtype)
+
+        last_refs = self._last_refs
+        if last_refs is not None and len(last_refs) == len(stack_frames):
+            oldest_ref = min(oldest_ref, last_refs.min())
+            if np.array_equal(self.get(last_refs), stack_frames):
+                refs = last_refs
+            elif np.array_equal(self.get(last_refs[1:]), stack_frames[:-1]):
+                refs = np.append(last_refs[1:], self._write(stack_frames[-1], oldest_ref))
+            else:
+                refs = self._write_stack(stack_frames, oldest_ref)
+        else:
+            refs = self._write_stack(stack_frames, oldest_ref)
+
+        self._last_refs = refs
+
+        return refs
+
+    def get(self, refs):
+        """
+        Args:
+            refs (np.ndarray): array of references of the frames.
+
+        Returns:
+            The array of frames, with the shape of the references followed by the shape of a frame.
+
+        """
+        return self._frames[refs % self._capacity]
+
+    def get_snapshot_ring(self, path):
+        """
+        Args:
+            path (str): the name of the attribute of the replay memory holding the buffer.
+
+        Returns:
+            The description of the frames as a ring buffer, for the incremental snapshots of the replay memory.
+
+        """
+        return dict(path=path, fields=['_frames'], idx=self._n_frames % self._capacity, capacity=self._capacity,
+                    allocated=self._frames is not None, n_written=self._n_frames)
+
+    def _write_stack(self, stack_frames, oldest_ref):
+        refs = np.empty(len(stack_frames), dtype=np.int64)
+        for i, frame in enumerate(stack_frames):
+            if i > 0 and np.array_equal(frame, stack_frames[i - 1]):
+                refs[i] = refs[i - 1]
+            else:
+                refs[i] = self._write(frame, oldest_ref)
+
+        return refs
+
+    def _write(self, frame, oldest_ref):
+        if self._n_frames - oldest_ref >= self._capacity:
+            self._grow(oldest_ref)
+
+        self._frames[self._n_frames % self._capacity] = frame
+        self._n_frames += 1
+
+        return self._n_frames - 1
+
+    def _grow(self, oldest_ref):
+        capacity = self._capacity + self._capacity // 4 + 1
+        frames = np.empty((capacity,) + self._frames.shape[1:], dtype=self._frames.dtype)
+
+        live_refs = np.arange(oldest_ref, self._n_frames)
+        frames[live_refs % capacity] = self._frames[live_refs % self._capacity]
+
+        self._capacity = capacity
+        self._frames = frames
+
+
+class CompactReplayMemory(ReplayMemory):
+    """
+    Replay memory for stacked frame observations, e.g. the Atari environments. The frames are stored once
+    in a contiguous buffer with the dtype of the observations, and the states and next states are rebuilt
+    from the references of their frames when sampled. The sampled transitions are the same as the ones of
+    the ReplayMemory of MushroomRL.
+
+    """
+    def __init__(self, initial_size, max_size, frame_capacity=None):
+        """
+        Constructor.
+
+        Args:
+            initial_size (int): initial number of elements in the replay memory;
+            max_size (int): maximum number of elements that the replay memory can contain;
+            frame_capacity (int, None): initial number of frames of the frame buffer. By default, 10% more
+                than the maximum number of elements. The buffer is grown if needed.
+
+        """
+        self._initial_size = initial_size
+        self._max_size = max_size
+        self._frame_capacity = max_size + max_size // 10 + 16 if frame_capacity is None else frame_capacity
+
+        self.reset()
+
+        self._add_save_attr(
+            _initial_size='primitive',
+            _max_size='primitive',
+            _frame_capacity='primitive',
+            _idx='primitive!',
+            _full='primitive!',
+            _frames='pickle!',
+            _states='pickle!',
+            _actions='pickle!',
+            _rewards='pickle!',
+            _next_states='pickle!',
+            _absorbing='pickle!',
+            _last='pickle!'
+        )
+
+    def add(self, dataset, n_steps_return=1, gamma=1.):
+        assert n_steps_return > 0
+
+        # The frames are stored in temporal order, so that consecutive stacks share their frames
+        oldest_ref = self._get_oldest_ref()
+        refs = [(self._frames.add(step[0], oldest_ref), self._frames.add(step[3], oldest_ref)) for step in dataset]
+
+        i = 0
+        while i < len(dataset) - n_steps_return + 1:
+            reward = dataset[i][2]
+            j = 0
+            while j < n_steps_return - 1:
+                if dataset[i + j][5]:
+                    i += j + 1
+                    break
+                j += 1
+                reward += gamma ** j * dataset[i + j][2]
+            else:
+                if self._states is None:
+                    self._allocate(refs[i][0], dataset[i][1])
+
+                self._states[self._idx] = refs[i][0]
+                self._actions[self._idx] = dataset[i][1]
+                self._rewards[self._idx] = reward
+
+                self._next_states[self._idx] = refs[i + j][1]
+                self._absorbing[self._idx] = dataset[i + j][4]
+                self._last[self._idx] = dataset[i + j][5]
+
+                self._idx += 1
+                if self._idx == self._max_size:
+                    self._full = True
+                    self._idx = 0
+
+                i += 1
+
+    def get(self, n_samples):
+        return self.get_transitions(np.random.randint(self.size, size=n_samples))
+
+    def get_transitions(self, idxs):
+        """
+        Args:
+            idxs (np.ndarray): the slots of the transitions.
+
+        Returns:
+            The transitions stored in the given slots.
+
+        """
+        return self._frames.get(self._states[idxs]), self._actions[idxs], self._rewards[idxs],\
+            self._frames.get(self._next_states[idxs]), self._absorbing[idxs], self._last[idxs]
+
+    def get_snapshot_rings(self):
+        """
+        Returns:
+            The ring buffers of the replay memory, i.e. the slots of the transitions and the frame buffer, for
+            its incremental snapshots.
+
+        """
+        return [dict(path='', fields=['_states', '_actions', '_rewards', '_next_states', '_absorbing', '_last'],
+                     idx=self._idx, capacity=self._max_size, allocated=self._states is not None, n_written=None),
+                self._frames.get_snapshot_ring('_frames')]
+
+    def reset(self):
+        self._idx = 0
+        self._full = False
+        self._frames = FrameBuffer(self._frame_capacity)
+        self._states = None
+        self._actions = None
+        self._rewards = None
+        self._next_states = None
+        self._absorbing = None
+        self._last = None
+
+    def _allocate(self, refs, action):
+        action = np.asarray(action)
+
+        self._states = np.empty((self._max_size, len(refs)), dtype=np.int64)
+        self._next_states = np.empty((self._max_size, len(refs)), dtype=np.int64)
+        self._actions = np.empty((self._max_size,) + action.shape, dtype=action.dtype)
+        self._rewards = np.empty(self._max_size)
+        self._absorbing = np.empty(self._max_size, dtype=bool)
+        self._last = np.empty(self._max_size, dtype=bool)
+
+    def _get_oldest_ref(self):
+        if self.size == 0:
+            return self._frames.n_frames
+
+        oldest = self._idx if self._full else 0
+
+        return min(self._states[oldest].min(), self._next_states[oldest].min())
+
+
+class CompactPrioritizedReplayMemory(VectorizedPrioritizedReplayMemory):
+    """
+    Prioritized replay memory for stacked frame observations. The frames are stored once, as in the
+    CompactReplayMemory, and the vectorized sum tree stores the references of the frames of each transition.
+
+    """
+    def __init__(self, initial_size, max_size, alpha, beta, epsilon=.01, frame_capacity=None):
+        """
+        Constructor.
+
+        Args:
+            initial_size (int): initial number of elements in the replay memory;
+            max_size (int): maximum number of elements that the replay memory can contain;
+            alpha (float): prioritization coefficient;
+            beta ([float, Parameter]): importance sampling coefficient;
+            epsilon (float, .01): small value to avoid zero probabilities;
+            frame_capacity (int, None): initial number of frames of the frame buffer. By default, 10% more
+                than the maximum number of elements. The buffer is grown if needed.
+
+        """
+        super().__init__(initial_size, max_size, alpha, beta, epsilon=epsilon)
+
+        self._frame_capacity = max_size + max_size // 10 + 16 if frame_capacity is None else frame_capacity
+        self._frames = FrameBuffer(self._frame_capacity)
+
+        self._add_save_attr(
+            _frame_capacity='primitive',
+            _frames='pickle!'
+        )
+
+    def add(self, dataset, p, n_steps_return=1, gamma=1.):
+        assert n_steps_return > 0
+
+        oldest_ref = self._get_oldest_ref()
+        compact_dataset = [(self._frames.add(step[0], oldest_ref),) + tuple(step[1:3])
+                           + (self._frames.add(step[3], oldest_ref),) + tuple(step[4:]) for step in dataset]
+
+        self._tree.add(compact_dataset, p, n_steps_return, gamma)
+
+    def get(self, n_samples):
+        state_refs, actions, rewards, next_state_refs, absorbing, last, idxs, is_weight = super().get(n_samples)
+
+        return self._frames.get(state_refs), actions, rewards, self._frames.get(next_state_refs), absorbing,\
+            last, idxs, is_weight
+
+    def get_snapshot_rings(self):
+        """
+        Returns:
+            The ring buffers of the replay memory, i.e. the slots of the sum tree and the frame buffer, for its
+            incremental snapshots.
+
+        """
+        return super().get_snapshot_rings() + [self._frames.get_snapshot_ring('_frames')]
+
+    def _get_oldest_ref(self):
+        if self._tree.size == 0:
+            return self._frames.n_frames
+
+        oldest = self._tree._data[self._tree._idx if self._tree._full else 0]
+
+        return min(oldest[0].min(), oldest[3].min())
+
+    def _post_load(self):
+        super()._post_load()
+        if self._frames is None:
+            self._frames = FrameBuffer(self._frame_capacity)
@@ -0,0 +1,331 @@
+import os
+import mmap
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from mushroom_rl.utils.replay_memory import ReplayMemory
+
+
+class DiskReplayMemory(ReplayMemory):
+    """
+    Replay memory storing the transitions in memory-mapped files. The new transitions are collected in an
+    in-memory hot window, written to the files when the window is full. The minibatches are read from the
+    files with a single sorted read per field, and the pages of the files are released from the memory of
+    the process after each write, so that the resident memory is bounded by the hot window.
+    The files also serve as the snapshot of the replay memory in the checkpoints of the runs: the transitions
+    of the last snapshot are appended to an undo log before being overwritten, and written back when the
+    snapshot is restored.
+
+    """
+    _default_hot_size = 10000
+    _fields = ['_states', '_actions', '_rewards', '_next_states', '_absorbing', '_last']
+
+    def __init__(self, initial_size, max_size, path=None, hot_size=None):
+        """
+        Constructor.
+
+        Args:
+            initial_size (int): initial number of elements in the replay memory;
+            max_size (int): maximum number of elements that the replay memory can contain;
+            path (str, None): directory of the files. By default, the directory set by exec_run, or a
+                temporary directory;
+            hot_size (int, None): number of transitions kept in memory before being written to the files.
+
+        """
+        self._initial_size = initial_size
+        self._max_size = max_size
+        self._hot_size = min(self._default_hot_size if hot_size is None else hot_size, max_size)
+        self._path = None if path is None else str(path)
+
+        self.reset()
+
+        self._add_save_attr(
+            _initial_size='primitive',
+            _max_size='primitive',
+            _hot_size='primitive',
+            _path='primitive',
+            _idx='primitive!',
+            _full='primitive!',
+            _specs='pickle!',
+            _hot='pickle!',
+            _hot_start='primitive!',
+            _n_hot='primitive!',
+            _snapshot_id='primitive!',
+            _snapshot_size='primitive!',
+            _saved='numpy!'
+        )
+
+    def set_path(self, path):
+        """
+        Set the directory of the files. It has no effect once transitions are stored.
+
+        Args:
+            path (str): the directory of the files.
+
+        """
+        if self._specs is None:
+            self._path = str(path)
+
+    def add(self, dataset, n_steps_return=1, gamma=1.):
+        assert n_steps_return > 0
+
+        i = 0
+        while i < len(dataset) - n_steps_return + 1:
+            reward = dataset[i][2]
+            j = 0
+            while j < n_steps_return - 1:
+                if dataset[i + j][5]:
+                    i += j + 1
+                    break
+                j += 1
+                reward += gamma ** j * dataset[i + j][2]
+            else:
+                transition = (dataset[i][0], dataset[i][1], reward, dataset[i + j][3], dataset[i + j][4],
+                              dataset[i + j][5])
+                if self._specs is None:
+                    self._allocate(transition)
+                if self._hot is None:
+                    self._allocate_hot()
+
+                for field, value in zip(self._fields, transition):
+                    self._hot[field][self._n_hot] = value
+                self._n_hot += 1
+
+                self._idx += 1
+                if self._idx == self._max_size:
+                    self._full = True
+                    self._idx = 0
+
+                if self._n_hot == self._hot_size:
+                    self.flush()
+
+                i += 1
+
+    def get(self, n_samples):
+        return self.get_transitions(np.random.randint(self.size, size=n_samples))
+
+    def get_transitions(self, idxs):
+        """
+        Args:
+            idxs (np.ndarray): the slots of the transitions.
+
+        Returns:
+            The transitions stored in the given slots.
+
+        """
+        n_samples = len(idxs)
+        hot_positions = (idxs - self._hot_start) % self._max_size
+        in_hot = hot_positions < self._n_hot
+
+        # The transitions on disk are read in increasing order of position
+        cold = np.flatnonzero(~in_hot)
+        cold = cold[np.argsort(idxs[cold], kind='stable')]
+
+        storage = self._get_storage()
+        samples = list()
+        for field in self._fields:
+            shape, dtype = self._specs[field]
+            values = np.empty((n_samples,) + shape, dtype=dtype)
+            if self._n_hot > 0:
+                values[in_hot] = self._hot[field][hot_positions[in_hot]]
+            values[cold] = storage[field][idxs[cold]]
+            samples.append(values)
+
+        return tuple(samples)
+
+    def flush(self):
+        """
+        Write the transitions of the hot window to the files.
+
+        """
+        if self._n_hot == 0:
+            return
+
+        storage = self._get_storage()
+        positions = (self._hot_start + np.arange(self._n_hot)) % self._max_size
+        self._save_overwritten(storage, positions)
+        for field in self._fields:
+            storage[field][positions] = self._hot[field][:self._n_hot]
+            storage[field].flush()
+            _release_pages(storage[field])
+
+        self._hot_start = self._idx
+        self._n_hot = 0
+
+    def reset(self):
+        self._idx = 0
+        self._full = False
+        self._specs = None
+        self._storage = None
+        self._hot = None
+        self._hot_start = 0
+        self._n_hot = 0
+        self._snapshot_id = None
+        self._snapshot_size = 0
+        self._saved = None
+
+    def remove(self):
+        """
+        Remove the files of the replay memory and reset it.
+
+        """
+        self.reset()
+        if self._path is not None:
+            shutil.rmtree(self._path, ignore_errors=True)
+
+    def get_snapshot(self, base_path=None):
+        """
+        Write the hot window to the files and return the state of the replay memory. The content of the
+        replay memory is not copied, as the files are the snapshot: the transitions of the snapshot that are
+        overwritten later are saved in its undo log.
+
+        Args:
+            base_path (str, None): the directory the path of the files is made relative to, when they are
+                inside of it, e.g. the checkpoint directory.
+
+        Returns:
+            The state of the replay memory.
+
+        """
+        self.flush()
+
+        # The previous snapshot may still be restored until the one being taken is complete
+        if self._snapshot_id is not None and self._path is not None:
+            for undo_file in Path(self._path).glob('undo_*.pkl'):
+                if int(undo_file.stem.split('_')[1]) < self._snapshot_id:
+                    undo_file.unlink()
+
+        self._snapshot_id = 0 if self._snapshot_id is None else self._snapshot_id + 1
+        self._snapshot_size = self._max_size if self._full else self._idx
+        self._saved = np.zeros(self._max_size, dtype=bool)
+
+        path, relative = self._path, False
+        if path is not None and base_path is not None:
+            try:
+                path, relative = str(Path(path).resolve().relative_to(Path(base_path).resolve())), True
+            except ValueError:
+                pass
+
+        return dict(path=path, relative=relative, idx=self._idx, full=self._full, specs=self._specs,
+                    snapshot_id=self._snapshot_id)
+
+    def set_snapshot(self, snapshot, base_path=None):
+        """
+        Restore the state of the replay memory from the files, writing back the transitions overwritten
+        after the snapshot.
+
+        Args:
+            snapshot (dict): the state returned by get_snapshot;
+            base_path (str, None): the directory the path of the files was made relative to.
+
+        """
+        self.reset()
+        self._path = str(Path(base_path) / snapshot['path']) if snapshot.get('relative', False) \
+            else snapshot['path']
+        self._idx = snapshot['idx']
+        self._full = snapshot['full']
+        self._hot_start = self._idx
+        self._specs = snapshot['specs']
+
+        snapshot_id = snapshot.get('snapshot_id')
+        if self._specs is not None and snapshot_id is not None:
+            # The logs of the later snapshots are applied first, as they hold later values of the slots
+            undo_files = sorted(Path(self._path).glob('undo_*.pkl'), key=lambda f: int(f.stem.split('_')[1]),
+                                reverse=True)
+            storage = self._get_storage()
+            for undo_file in undo_files:
+                if int(undo_file.stem.split('_')[1]) >= snapshot_id:
+                    for positions, values in _read_undo_log(undo_file):
+                        for field in self._fields:
+                            storage[field][positions] = values[field]
+            for field in self._fields:
+                storage[field].flush()
+            for undo_file in undo_files:
+                undo_file.unlink()
+
+            self._snapshot_id = snapshot_id
+            self._snapshot_size = self._max_size if self._full else self._idx
+            self._saved = np.zeros(self._max_size, dtype=bool)
+
+    def __getstate__(self):
+        # The copies of the memory, e.g. the best agents, refer to the same files without copying them
+        self.flush()
+        state = self.__dict__.copy()
+        state['_storage'] = None
+        state['_hot'] = None
+
+        return state
+
+    def _allocate(self, transition):
+        if self._path is None:
+            self._path = tempfile.mkdtemp(prefix='replay_memory_')
+
+        self._specs = dict()
+        for field, value in zip(self._fields, transition):
+            value = np.asarray(value)
+            self._specs[field] = (value.shape, value.dtype.str)
+
+        Path(self._path).mkdir(parents=True, exist_ok=True)
+        self._storage = {field: np.lib.format.open_memmap(self._get_file(field), mode='w+', dtype=dtype,
+                                                          shape=(self._max_size,) + shape)
+                         for field, (shape, dtype) in self._specs.items()}
+
+    def _save_overwritten(self, storage, positions):
+        # The transitions of the last snapshot are logged, once, before being overwritten
+        if self._snapshot_id is None:
+            return
+
+        positions = positions[(positions < self._snapshot_size) & ~self._saved[positions]]
+        if len(positions) == 0:
+            return
+
+        values = {field: storage[field][positions] for field in self._fields}
+        with self._get_undo_file(self._snapshot_id).open('ab') as f:
+            pickle.dump((positions, values), f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        self._saved[positions] = True
+
+    def _allocate_hot(self):
+        self._hot = {field: np.empty((self._hot_size,) + shape, dtype=dtype)
+                     for field, (shape, dtype) in self._specs.items()}
+
+    def _get_storage(self):
+        if self._storage is None:
+            self._storage = {field: np.load(self._get_file(field), mmap_mode='r+') for field in self._fields}
+
+        return self._storage
+
+    def _get_file(self, field):
+        return Path(self._path) / 'replay{}.npy'.format(field)
+
+    def _get_undo_file(self, snapshot_id):
+        return Path(self._path) / 'undo_{}.pkl'.format(snapshot_id)
+
+    def _post_load(self):
+        if self._full is None:
+            self.reset()
+        else:
+            self._storage = None
+
+
+def _read_undo_log(undo_file):
+    # A record interrupted while being written is discarded, as the slots were not overwritten yet
+    records = list()
+    with undo_file.open('rb') as f:
+        while True:
+            try:
+                records.append(pickle.load(f))
+            except (EOFError, pickle.UnpicklingError):
+                return records
+
+
+def _release_pages(array):
+    # The pages written to the file are dropped from the resident memory, they are read again when sampled
+    mapped_file = getattr(array, '_mmap', None)
+    if mapped_file is not None and hasattr(mmap, 'MADV_DONTNEED'):
+        mapped_file.madvise(mmap.MADV_DONTNEED)
@@ -0,0 +1,184 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from mushroom_rl.core import Serializable
+from mushroom_rl.utils.replay_memory import PrioritizedReplayMemory
+
+
+class PrefetchingReplayMemory(Serializable):
+    """
+    Wrapper of a uniform replay memory that samples the next minibatch in a background thread, while the
+    agent performs the gradient step and collects the next transitions. The minibatch is gathered in
+    contiguous arrays, that torch wraps without copies.
+    The prefetched minibatch is corrected when new transitions are added: each sample is replaced with the
+    probability of drawing one of the new transitions, and the samples of overwritten slots are gathered
+    again, so that the minibatch is distributed as one sampled after the transitions are added.
+
+    """
+    def __init__(self, replay_memory, seed=None):
+        """
+        Constructor.
+
+        Args:
+            replay_memory (ReplayMemory): the wrapped replay memory;
+            seed (int, None): seed of the random generator of the sampler. By default, it is drawn from the
+                numpy random generator.
+
+        """
+        if isinstance(replay_memory, PrioritizedReplayMemory):
+            raise ValueError('Prefetching is not supported by prioritized replay memories')
+
+        self._replay_memory = replay_memory
+        self._random_state = np.random.RandomState(np.random.randint(2 ** 32) if seed is None else seed)
+
+        self._executor = None
+        self._future = None
+        self._batch = None
+
+        self._add_save_attr(
+            _replay_memory='mushroom',
+            _random_state='pickle'
+        )
+
+    def add(self, dataset, n_steps_return=1, gamma=1.):
+        """
+        Add elements to the replay memory, correcting the prefetched minibatch.
+
+        Args:
+            dataset (list): list of elements to add to the replay memory;
+            n_steps_return (int, 1): number of steps to consider for computing n-step return;
+            gamma (float, 1.): discount factor for n-step return.
+
+        """
+        self._wait()
+
+        replay_memory = self._replay_memory
+        size, idx = replay_memory.size, replay_memory._idx
+        replay_memory.add(dataset, n_steps_return=n_steps_return, gamma=gamma)
+
+        if self._batch is not None:
+            if len(dataset) >= replay_memory._max_size:
+                self._batch = None
+            else:
+                self._correct(size, idx)
+
+    def get(self, n_samples):
+        """
+        Returns the prefetched minibatch, and starts prefetching the next one.
+
+        Args:
+            n_samples (int): the number of samples to return.
+
+        Returns:
+            The requested number of samples.
+
+        """
+        self._wait()
+
+        if self._batch is not None and len(self._batch[0]) == n_samples:
+            _, transitions = self._batch
+        else:
+            _, transitions = self._sample(n_samples)
+        self._batch = None
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        self._future = self._executor.submit(self._sample, n_samples)
+
+        return tuple(transitions)
+
+    def reset(self):
+        """
+        Reset the replay memory, discarding the prefetched minibatch.
+
+        """
+        self._wait()
+        self._batch = None
+        self._replay_memory.reset()
+
+    def unwrap(self):
+        """
+        Complete the pending prefetch, so that the wrapped replay memory can be accessed safely.
+
+        Returns:
+            The wrapped replay memory.
+
+        """
+        self._wait()
+
+        return self._replay_memory
+
+    @property
+    def initialized(self):
+        """
+        Returns:
+            Whether the replay memory has reached the number of elements that allows it to be used.
+
+        """
+        return self._replay_memory.initialized
+
+    @property
+    def size(self):
+        """
+        Returns:
+            The number of elements contained in the replay memory.
+
+        """
+        return self._replay_memory.size
+
+    def _wait(self):
+        if self._future is not None:
+            self._batch = self._future.result()
+            self._future = None
+
+    def _sample(self, n_samples):
+        idxs = self._random_state.randint(self._replay_memory.size, size=n_samples)
+
+        return idxs, self._get_transitions(idxs)
+
+    def _correct(self, size, idx):
+        replay_memory = self._replay_memory
+        idxs, transitions = self._batch
+
+        new_size = replay_memory.size
+        n_written = (replay_memory._idx - idx) % replay_memory._max_size
+
+        # Samples drawn among the previous transitions are replaced by samples of the new ones
+        idxs = idxs.copy()
+        if new_size > size:
+            replaced = self._random_state.uniform(size=len(idxs)) >= size / new_size
+            idxs[replaced] = self._random_state.randint(size, new_size, size=replaced.sum())
+
+        stale = (idxs - idx) % replay_memory._max_size < n_written
+        if stale.any():
+            for values, new_values in zip(transitions, self._get_transitions(idxs[stale])):
+                values[stale] = new_values
+
+        self._batch = idxs, transitions
+
+    def _get_transitions(self, idxs):
+        replay_memory = self._replay_memory
+        if hasattr(replay_memory, 'get_transitions'):
+            return list(replay_memory.get_transitions(idxs))
+
+        return [np.array([np.array(replay_memory._states[i]) for i in idxs]),
+                np.array([replay_memory._actions[i] for i in idxs]),
+                np.array([replay_memory._rewards[i] for i in idxs]),
+                np.array([np.array(replay_memory._next_states[i]) for i in idxs]),
+                np.array([replay_memory._absorbing[i] for i in idxs]),
+                np.array([replay_memory._last[i] for i in idxs])]
+
+    def __getstate__(self):
+        self._wait()
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        state['_future'] = None
+        state['_batch'] = None
+
+        return state
+
+    def _post_load(self):
+        self._executor = None
+        self._future = None
+        self._batch = None
@@ -0,0 +1,82 @@
+from mushroom_rl.utils.replay_memory import ReplayMemory, PrioritizedReplayMemory
+
+from .compact_replay_memory import CompactReplayMemory, CompactPrioritizedReplayMemory
+from .disk_replay_memory import DiskReplayMemory
+from .vectorized_replay_memory import VectorizedPrioritizedReplayMemory
+from .prefetching_replay_memory import PrefetchingReplayMemory
+
+
+def build_replay_memory(replay_memory, initial_size, max_size, alpha=None, beta=None, prefetch=False):
+    """
+    Build the replay memory of an agent.
+
+    Args:
+        replay_memory (str, None): the type of replay memory. None for the replay memories of MushroomRL,
+            'compact' for the replay memories storing each frame of stacked observations once, 'disk' for
+            the replay memory storing the transitions in memory-mapped files, 'vectorized' for the
+            prioritized replay memory sampling and updating the priorities of a minibatch with array
+            operations. The compact prioritized replay memory is also vectorized;
+        initial_size (int): initial number of elements in the replay memory;
+        max_size (int): maximum number of elements that the replay memory can contain;
+        alpha (float, None): prioritization coefficient. If not None, a prioritized replay memory is built;
+        beta ([float, Parameter], None): importance sampling coefficient of the prioritized replay memory;
+        prefetch (bool, False): select to sample the minibatches in a background thread. Only uniform replay
+            memories support prefetching.
+
+    Returns:
+        The replay memory.
+
+    """
+    memory = _build_replay_memory(replay_memory, initial_size, max_size, alpha, beta)
+
+    return PrefetchingReplayMemory(memory) if prefetch else memory
+
+
+def replace_replay_memory(agent, replay_memory, initial_size, max_size, alpha=None, beta=None, prefetch=False):
+    """
+    Replace the replay memory built by an algorithm, when a different type of replay memory or prefetching is
+    selected.
+
+    Args:
+        agent (Agent): the agent whose replay memory is replaced;
+        replay_memory (str, None): the type of replay memory, see build_replay_memory;
+        initial_size (int): initial number of elements in the replay memory;
+        max_size (int): maximum number of elements that the replay memory can contain;
+        alpha (float, None): prioritization coefficient. If not None, a prioritized replay memory is built;
+        beta ([float, Parameter], None): importance sampling coefficient of the prioritized replay memory;
+        prefetch (bool, False): select to sample the minibatches in a background thread.
+
+    Returns:
+        The agent.
+
+    """
+    if replay_memory is not None or prefetch:
+        agent._replay_memory = build_replay_memory(replay_memory, initial_size, max_size, alpha=alpha, beta=beta,
+                                                   prefetch=prefetch)
+
+    return agent
+
+
+def _build_replay_memory(replay_memory, initial_size, max_size, alpha, beta):
+    prioritized = alpha is not None
+
+    if replay_memory is None:
+        if prioritized:
+            return PrioritizedReplayMemory(initial_size, max_size, alpha=alpha, beta=beta)
+        else:
+            return ReplayMemory(initial_size, max_size)
+    elif replay_memory == 'compact':
+        if prioritized:
+            return CompactPrioritizedReplayMemory(initial_size, max_size, alpha=alpha, beta=beta)
+        else:
+            return CompactReplayMemory(initial_size, max_size)
+    elif replay_memory == 'vectorized':
+        if not prioritized:
+            raise ValueError('The vectorized replay memory requires prioritization')
+        return VectorizedPrioritizedReplayMemory(initial_size, max_size, alpha=alpha, beta=beta)
+    elif replay_memory == 'disk':
+        if prioritized:
+            raise ValueError('The disk replay memory does not support prioritization')
+        return DiskReplayMemory(initial_size, max_size)
+    else:
+        raise ValueError('Unknown replay memory: {}'.format(replay_memory))
@@ -0,0 +1,238 @@
+import numpy as np
+
+from mushroom_rl.utils.replay_memory import PrioritizedReplayMemory
+
+
+class VectorizedSumTree:
+    """
+    Sum tree stored in a flat array, with all the leaves at the same depth. The priorities of a batch of
+    transitions are updated, and a batch of transitions is retrieved, with array operations on a whole
+    level of the tree at a time. The retrieval follows the same rules as the SumTree of MushroomRL.
+    A max tree is updated together with the sum tree, so that the maximum priority is not computed
+    over all the leaves at each step.
+
+    """
+    def __init__(self, max_size):
+        """
+        Constructor.
+
+        Args:
+            max_size (int): maximum size of the tree.
+
+        """
+        self._max_size = max_size
+        self._depth = int(np.ceil(np.log2(max(max_size, 1))))
+        self._n_leaves = 2 ** self._depth
+        self._tree = np.zeros(2 * self._n_leaves)
+        self._max_tree = np.zeros(2 * self._n_leaves)
+        self._data = [None for _ in range(max_size)]
+        self._idx = 0
+        self._full = False
+
+    def add(self, dataset, priority, n_steps_return, gamma):
+        """
+        Add elements to the tree.
+
+        Args:
+            dataset (list): list of elements to add to the tree;
+            priority (np.ndarray): priority of each sample in the dataset;
+            n_steps_return (int): number of steps to consider for computing n-step return;
+            gamma (float): discount factor for n-step return.
+
+        """
+        idxs = list()
+        priorities = list()
+
+        i = 0
+        while i < len(dataset) - n_steps_return + 1:
+            reward = dataset[i][2]
+
+            j = 0
+            while j < n_steps_return - 1:
+                if dataset[i + j][5]:
+                    i += j + 1
+                    break
+                j += 1
+                reward += gamma ** j * dataset[i + j][2]
+            else:
+                d = list(dataset[i])
+                d[2] = reward
+                d[3] = dataset[i + j][3]
+                d[4] = dataset[i + j][4]
+                d[5] = dataset[i + j][5]
+
+                self._data[self._idx] = d
+                idxs.append(self._idx + self._n_leaves)
+                priorities.append(priority[i])
+
+                self._idx += 1
+                if self._idx == self._max_size:
+                    self._idx = 0
+                    self._full = True
+
+                i += 1
+
+        if len(idxs) > 0:
+            self.update(idxs, priorities)
+
+    def retrieve(self, s):
+        """
+        Find the leaves of a batch of values of the cumulative priority.
+
+        Args:
+            s (np.ndarray): the values of the cumulative priority.
+
+        Returns:
+            The indexes of the leaves in the tree and their priorities.
+
+        """
+        s = np.array(s, dtype=float)
+        idx = np.ones(len(s), dtype=np.int64)
+
+        for _ in range(self._depth):
+            left = 2 * idx
+            left_p = self._tree[left]
+            right_p = self._tree[left + 1]
+            go_right = s > left_p
+
+            # As in MushroomRL, a child is chosen at random when both children have the same priority, and
+            # the value is not reduced
+            tie = left_p == right_p
+            if tie.any():
+                go_right[tie] = np.random.uniform(size=tie.sum()) < .5
+
+            # The sums drift from the ones of their children with the updates, so a value close to the total
+            # priority can exceed the sum of both children. The children without priority, i.e. the padding
+            # leaves and the empty slots, are never chosen
+            go_right = np.where(right_p > 0, go_right | (left_p <= 0), False)
+
+            s -= left_p * (go_right & ~tie)
+            idx = left + go_right
+
+        return idx, self._tree[idx]
+
+    def get_data(self, idx):
+        """
+        Args:
+            idx (np.ndarray): the indexes of the leaves in the tree.
+
+        Returns:
+            The list of elements stored in the leaves.
+
+        """
+        return [self._data[i] for i in idx - self._n_leaves]
+
+    def update(self, idx, priorities):
+        """
+        Update the priority of the sample at the provided index in the dataset.
+
+        Args:
+            idx (np.ndarray): indexes of the transitions in the dataset;
+            priorities (np.ndarray): priorities of the transitions.
+
+        """
+        idx = np.asarray(idx, dtype=np.int64)
+        priorities = np.asarray(priorities, dtype=float)
+
+        # When an index is repeated, the last priority is kept, as with sequential updates
+        _, last = np.unique(idx[::-1], return_index=True)
+        last = len(idx) - 1 - last
+        idx, priorities = idx[last], priorities[last]
+
+        # All the leaves are at the same depth, the ancestors of a leaf are found by shifting its index
+        ancestors = idx >> np.arange(1, self._depth + 1)[:, None]
+        np.add.at(self._tree, ancestors.ravel(), np.tile(priorities - self._tree[idx], self._depth))
+        self._tree[idx] = priorities
+
+        self._max_tree[idx] = priorities
+        for nodes in ancestors:
+            children = 2 * nodes
+            self._max_tree[nodes] = np.maximum(self._max_tree[children], self._max_tree[children + 1])
+
+    @property
+    def size(self):
+        """
+        Returns:
+            The current size of the tree.
+
+        """
+        return self._idx if not self._full else self._max_size
+
+    @property
+    def max_p(self):
+        """
+        Returns:
+            The maximum priority among the ones in the tree.
+
+        """
+        return self._max_tree[1]
+
+    @property
+    def total_p(self):
+        """
+        Returns:
+            The sum of the priorities in the tree, i.e. the value of the root node.
+
+        """
+        return self._tree[1]
+
+
+class VectorizedPrioritizedReplayMemory(PrioritizedReplayMemory):
+    """
+    Prioritized replay memory using a VectorizedSumTree, that samples a minibatch and updates its priorities
+    with array operations. The sampling distribution is the same as the PrioritizedReplayMemory of MushroomRL.
+
+    """
+    def __init__(self, initial_size, max_size, alpha, beta, epsilon=.01):
+        """
+        Constructor.
+
+        Args:
+            initial_size (int): initial number of elements in the replay memory;
+            max_size (int): maximum number of elements that the replay memory can contain;
+            alpha (float): prioritization coefficient;
+            beta ([float, Parameter]): importance sampling coefficient;
+            epsilon (float, .01): small value to avoid zero probabilities.
+
+        """
+        super().__init__(initial_size, max_size, alpha, beta, epsilon=epsilon)
+
+        self._tree = VectorizedSumTree(max_size)
+
+    def get(self, n_samples):
+        total_p = self._tree.total_p
+        segment = total_p / n_samples
+
+        a = np.arange(n_samples) * segment
+        b = np.arange(1, n_samples + 1) * segment
+        samples = np.random.uniform(a, b)
+
+        idxs, priorities = self._tree.retrieve(samples)
+        data = self._tree.get_data(idxs)
+
+        states = np.array([np.array(d[0]) for d in data])
+        actions = np.array([d[1] for d in data])
+        rewards = np.array([d[2] for d in data])
+        next_states = np.array([np.array(d[3]) for d in data])
+        absorbing = np.array([d[4] for d in data])
+        last = np.array([d[5] for d in data])
+
+        sampling_probabilities = priorities / total_p
+        is_weight = (self._tree.size * sampling_probabilities) ** -self._beta()
+        is_weight /= is_weight.max()
+
+        return states, actions, rewards, next_states, absorbing, last, idxs, is_weight
+
+    def get_snapshot_rings(self):
+        """
+        Returns:
+            The ring buffers of the replay memory, i.e. the slots of the sum tree, for its incremental
+            snapshots. The arrays of the tree are not part of the slots.
+
+        """
+        return [dict(path='_tree', fields=['_data'], idx=self._tree._idx, capacity=self._tree._max_size,
+                     allocated=True, n_written=None)]
+
+    def _post_load(self):
+        if self._tree is None:
+            self._tree = VectorizedSumTree(self._max_size)
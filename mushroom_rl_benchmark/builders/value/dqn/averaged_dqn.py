@@ -20,12 +20,12 @@ class AveragedDQNBuilder(DQNBuilder):
         self.epsilon = LinearParameter(value=1, threshold_value=.05, n=1000000)
         self.epsilon_test = Parameter(value=.01)
 
-        return AveragedDQN(mdp_info, self.policy, self.approximator, **self.alg_params)
+        return AveragedDQN(mdp_info, self.policy, self.approximator, **self._get_alg_params())
 
     @classmethod
     def default(cls, lr=.0001, network=DQNNetwork, initial_replay_size=50000, max_replay_size=1000000,
                 batch_size=32, target_update_frequency=2500, n_steps_per_fit=1, n_approximators=10, use_cuda=False,
-                get_default_dict=False):
+                replay_memory=None, get_default_dict=False):
         defaults = locals()
         policy = EpsGreedy(epsilon=Parameter(value=1.))
 
@@ -45,7 +45,7 @@ class AveragedDQNBuilder(DQNBuilder):
             target_update_frequency=target_update_frequency
         )
 
-        builder = cls(policy, TorchApproximator, approximator_params, alg_params, n_steps_per_fit)
+        builder = cls(policy, TorchApproximator, approximator_params, alg_params, n_steps_per_fit, replay_memory)
 
         if get_default_dict:
             return builder, defaults
@@ -19,12 +19,13 @@ class CategoricalDQNBuilder(DQNBuilder):
         self.epsilon = LinearParameter(value=1, threshold_value=.05, n=1000000)
         self.epsilon_test = Parameter(value=.01)
 
-        return CategoricalDQN(mdp_info, self.policy, self.approximator_params, **self.alg_params)
+        return CategoricalDQN(mdp_info, self.policy, self.approximator_params, **self._get_alg_params())
 
     @classmethod
     def default(cls, lr=.0001, network=DQNFeatureNetwork, initial_replay_size=50000, max_replay_size=1000000,
                 batch_size=32, target_update_frequency=2500, n_features=512, n_steps_per_fit=1, v_min=-10, v_max=10,
-                n_atoms=51, use_cuda=False, get_default_dict=False):
+                n_atoms=51, use_cuda=False,
+                replay_memory=None, get_default_dict=False):
         defaults = locals()
 
         policy = EpsGreedy(epsilon=Parameter(value=1.))
@@ -47,7 +48,7 @@ class CategoricalDQNBuilder(DQNBuilder):
             target_update_frequency=target_update_frequency
         )
 
-        builder = cls(policy, TorchApproximator, approximator_params, alg_params, n_steps_per_fit)
+        builder = cls(policy, TorchApproximator, approximator_params, alg_params, n_steps_per_fit, replay_memory)
 
         if get_default_dict:
             return builder, defaults
@@ -12,4 +12,4 @@ class DoubleDQNBuilder(DQNBuilder):
         self.epsilon = LinearParameter(value=1, threshold_value=.05, n=1000000)
         self.epsilon_test = Parameter(value=.01)
 
-        return DoubleDQN(mdp_info, self.policy, self.approximator, self.approximator_params, **self.alg_params)
\ No newline at end of file
+        return DoubleDQN(mdp_info, self.policy, self.approximator, self.approximator_params, **self._get_alg_params())
\ No newline at end of file
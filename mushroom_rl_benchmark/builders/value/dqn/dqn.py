@@ -1,3 +1,4 @@
+import numpy as np
 import torch.nn.functional as F
 import torch.optim as optim
 
@@ -7,6 +8,7 @@ from mushroom_rl.policy import EpsGreedy
 from mushroom_rl.utils.parameters import LinearParameter, Parameter
 
 from mushroom_rl_benchmark.builders import AgentBuilder
+from mushroom_rl_benchmark.builders.memory import build_replay_memory
 from mushroom_rl_benchmark.builders.network import DQNNetwork
 
 
@@ -15,7 +17,8 @@ class DQNBuilder(AgentBuilder):
     AgentBuilder for Deep Q-Network (DQN).
 
     """
-    def __init__(self, policy, approximator, approximator_params, alg_params, n_steps_per_fit=1):
+    def __init__(self, policy, approximator, approximator_params, alg_params, n_steps_per_fit=1, replay_memory=None,
+                 prefetch=False, fit_batch=None):
         """
         Constructor.
 
@@ -24,15 +27,23 @@ class DQNBuilder(AgentBuilder):
             approximator (dict): Q-function approximator;
             approximator_params (dict): parameters of the Q-function approximator;
             alg_params (dict): parameters for the algorithm;
-            n_steps_per_fit (int, 1): number of steps per fit.
+            n_steps_per_fit (int, 1): number of steps per fit;
+            replay_memory (str, None): type of replay memory, see build_replay_memory. By default, the replay
+                memory of the algorithm is used;
+            prefetch (bool, False): select to sample the minibatches in a background thread;
+            fit_batch (int, None): number of fits batched together, see set_fit_batch. If None, the fit
+                batching mode is disabled.
 
         """
         self.policy = policy
         self.approximator = approximator
         self.approximator_params = approximator_params
         self.alg_params = alg_params
+        self.replay_memory = replay_memory
+        self.prefetch = prefetch
 
         super().__init__(n_steps_per_fit=n_steps_per_fit, compute_policy_entropy=False)
+        self.set_fit_batch(fit_batch)
 
     def build(self, mdp_info):
         self.approximator_params['input_shape'] = mdp_info.observation_space.shape
@@ -41,7 +52,7 @@ class DQNBuilder(AgentBuilder):
         self.epsilon = LinearParameter(value=1, threshold_value=.05, n=1000000)
         self.epsilon_test = Parameter(value=.01)
 
-        return DQN(mdp_info, self.policy, self.approximator, self.approximator_params, **self.alg_params)
+        return DQN(mdp_info, self.policy, self.approximator, self.approximator_params, **self._get_alg_params())
 
     def compute_Q(self, agent, states):
         q_max = agent.approximator(states).max()
@@ -54,9 +65,35 @@ class DQNBuilder(AgentBuilder):
         else:
             agent.policy.set_epsilon(self.epsilon)
 
+    def draw_actions(self, agent, states):
+        policy = agent.policy
+        q = policy.get_q().predict(states, **getattr(policy, '_predict_params', dict()))
+
+        # Greedy actions with random tie breaking, replaced by random actions with probability epsilon
+        actions = np.argmax((q == q.max(axis=1, keepdims=True)) * np.random.uniform(size=q.shape), axis=1)
+        epsilon = np.array([policy._epsilon(state) for state in states])
+        explore = np.random.uniform(size=len(states)) < epsilon
+        actions[explore] = np.random.choice(q.shape[1], size=explore.sum())
+
+        return actions[:, None]
+
+    def _get_alg_params(self, alpha=None, beta=None):
+        # The replay memory is not stored in the builder, that is saved with the checkpoints of the runs
+        alg_params = dict(self.alg_params)
+        replay_memory = getattr(self, 'replay_memory', None)
+        prefetch = getattr(self, 'prefetch', False)
+
+        if replay_memory is not None or alpha is not None or prefetch:
+            alg_params['replay_memory'] = build_replay_memory(replay_memory, alg_params['initial_replay_size'],
+                                                              alg_params['max_replay_size'], alpha=alpha, beta=beta,
+                                                              prefetch=prefetch)
+
+        return alg_params
+
     @classmethod
     def default(cls, lr=.0001, network=DQNNetwork, initial_replay_size=50000, max_replay_size=1000000,
-                batch_size=32, target_update_frequency=2500, n_steps_per_fit=1, use_cuda=False, get_default_dict=False):
+                batch_size=32, target_update_frequency=2500, n_steps_per_fit=1, use_cuda=False,
+                replay_memory=None, prefetch=False, fit_batch=None, get_default_dict=False):
         defaults = locals()
         policy = EpsGreedy(epsilon=Parameter(value=1.))
 
@@ -75,7 +112,8 @@ class DQNBuilder(AgentBuilder):
             target_update_frequency=target_update_frequency
         )
 
-        builder = cls(policy, TorchApproximator, approximator_params, alg_params, n_steps_per_fit)
+        builder = cls(policy, TorchApproximator, approximator_params, alg_params, n_steps_per_fit, replay_memory,
+                      prefetch, fit_batch)
 
         if get_default_dict:
             return builder, defaults
@@ -19,12 +19,12 @@ class NoisyDQNBuilder(DQNBuilder):
         self.epsilon = LinearParameter(value=0, threshold_value=0, n=1)
         self.epsilon_test = Parameter(value=0)
 
-        return NoisyDQN(mdp_info, self.policy, self.approximator_params, **self.alg_params)
+        return NoisyDQN(mdp_info, self.policy, self.approximator_params, **self._get_alg_params())
 
     @classmethod
     def default(cls, lr=.0001, network=DQNFeatureNetwork, initial_replay_size=50000, max_replay_size=1000000,
                 batch_size=32, target_update_frequency=2500, n_features=512, n_steps_per_fit=1, use_cuda=False,
-                get_default_dict=False):
+                replay_memory=None, get_default_dict=False):
         defaults = locals()
         policy = EpsGreedy(epsilon=Parameter(value=0.))
 
@@ -44,7 +44,7 @@ class NoisyDQNBuilder(DQNBuilder):
             target_update_frequency=target_update_frequency
         )
 
-        builder = cls(policy, TorchApproximator, approximator_params, alg_params, n_steps_per_fit)
+        builder = cls(policy, TorchApproximator, approximator_params, alg_params, n_steps_per_fit, replay_memory)
 
         if get_default_dict:
             return builder, defaults
@@ -5,6 +5,7 @@ from mushroom_rl.algorithms.value import Rainbow
 from mushroom_rl.approximators.parametric import TorchApproximator
 from mushroom_rl.policy import EpsGreedy
 from mushroom_rl.utils.parameters import LinearParameter, Parameter
+from mushroom_rl_benchmark.builders.memory import replace_replay_memory
 from mushroom_rl_benchmark.builders.network import DQNFeatureNetwork
 
 from .dqn import DQNBuilder
@@ -18,13 +19,18 @@ class RainbowBuilder(DQNBuilder):
         self.epsilon = LinearParameter(value=0., threshold_value=0., n=1)
         self.epsilon_test = Parameter(value=0.)
 
-        return Rainbow(mdp_info, self.policy, self.approximator_params, **self.alg_params)
+        agent = Rainbow(mdp_info, self.policy, self.approximator_params, **self.alg_params)
+
+        # Rainbow builds its own prioritized replay memory, that is replaced if a different type is selected
+        return replace_replay_memory(agent, getattr(self, 'replay_memory', None),
+                                     self.alg_params['initial_replay_size'], self.alg_params['max_replay_size'],
+                                     alpha=self.alg_params['alpha_coeff'], beta=self.alg_params['beta'])
 
     @classmethod
     def default(cls, lr=.0001, network=DQNFeatureNetwork, initial_replay_size=50000, max_replay_size=1000000,
                 batch_size=32, target_update_frequency=2500, n_features=512, n_steps_per_fit=1, v_min=-10, v_max=10,
                 n_atoms=51, n_steps_return=3, alpha_coeff=.5, use_cuda=False,
-                get_default_dict=False):
+                replay_memory=None, get_default_dict=False):
         defaults = locals()
         policy = EpsGreedy(epsilon=Parameter(value=1.))
 
@@ -51,7 +57,7 @@ class RainbowBuilder(DQNBuilder):
             target_update_frequency=target_update_frequency
         )
 
-        builder = cls(policy, TorchApproximator, approximator_params, alg_params, n_steps_per_fit)
+        builder = cls(policy, TorchApproximator, approximator_params, alg_params, n_steps_per_fit, replay_memory)
 
         if get_default_dict:
             return builder, defaults
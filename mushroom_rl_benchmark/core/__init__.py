@@ -1,8 +1,13 @@
 from .experiment import BenchmarkExperiment
-from .logger import BenchmarkLogger
+from .logger import BenchmarkLogger, convert_results_to_columnar
+from .reader import ExperimentReader, SuiteReader
+from .results_index import ResultsIndex
+from .run_cache import RunCache
 from .suite import BenchmarkSuite
+from .sweep_store import SweepStore, SweepLogger
 from .suite_visualizer import BenchmarkSuiteVisualizer
 from .visualizer import BenchmarkVisualizer
 
-__all__ = ['BenchmarkExperiment', 'BenchmarkLogger', 'BenchmarkSuite',
-           'BenchmarkVisualizer', 'BenchmarkSuiteVisualizer']
\ No newline at end of file
+__all__ = ['BenchmarkExperiment', 'BenchmarkLogger', 'convert_results_to_columnar', 'ExperimentReader', 'SuiteReader',
+           'ResultsIndex', 'RunCache', 'BenchmarkSuite', 'SweepStore', 'SweepLogger', 'BenchmarkVisualizer',
+           'BenchmarkSuiteVisualizer']
\ No newline at end of file
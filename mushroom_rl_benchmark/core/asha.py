@@ -0,0 +1,120 @@
+import numpy as np
+
+
+class ASHAScheduler:
+    """
+    Class implementing the Asynchronous Successive Halving Algorithm (ASHA) from "A System for Massively
+    Parallel Hyperparameter Tuning" by Li L. et al., to prune the configurations of a parameter sweep.
+
+    All the configurations are run up to the first rung. A configuration completed at a rung is promoted
+    to the next one as soon as it is in the top 1/reduction_factor of the configurations completed at that
+    rung. Configurations never promoted are pruned.
+
+    """
+    def __init__(self, configurations, n_epochs, min_fraction=0.1, reduction_factor=3):
+        """
+        Constructor.
+
+        Args:
+            configurations (list): the names of the configurations of the sweep;
+            n_epochs (int): number of epochs of a complete run;
+            min_fraction (float, 0.1): fraction of the epochs of the first rung;
+            reduction_factor (int, 3): the inverse of the fraction of configurations promoted at each rung,
+                and the ratio between the epochs of two consecutive rungs.
+
+        """
+        assert reduction_factor > 1
+
+        self._reduction_factor = reduction_factor
+
+        self._rungs = list()
+        rung_epochs = max(1, int(round(n_epochs * min_fraction)))
+        while rung_epochs < n_epochs:
+            self._rungs.append(rung_epochs)
+            rung_epochs = int(round(rung_epochs * reduction_factor))
+        self._rungs.append(n_epochs)
+
+        self._pending = list(configurations)
+        self._running = set()
+        self._scores = [dict() for _ in self._rungs]
+        self._promoted = [set() for _ in self._rungs]
+
+    @property
+    def rungs(self):
+        """
+        Returns:
+            The number of epochs of each rung.
+
+        """
+        return self._rungs
+
+    def next_job(self):
+        """
+        Get the next job to run. Promotions to higher rungs have precedence over new configurations.
+        When no configuration is promotable, no new configuration is left and no job is running, the best
+        configuration of the highest rung is promoted, so that at least one configuration completes all the
+        epochs.
+
+        Returns:
+            The (configuration, rung) tuple of the job, or None if no job is currently available.
+
+        """
+        for rung in reversed(range(len(self._rungs) - 1)):
+            n_promotable = len(self._scores[rung]) // self._reduction_factor
+            for configuration in self._get_ranking(rung)[:n_promotable]:
+                if configuration not in self._promoted[rung]:
+                    return self._start(configuration, rung + 1)
+
+        if len(self._pending) > 0:
+            return self._start(self._pending.pop(0), 0)
+
+        if len(self._running) == 0 and len(self._scores[-1]) == 0:
+            for rung in reversed(range(len(self._rungs) - 1)):
+                for configuration in self._get_ranking(rung):
+                    if configuration not in self._promoted[rung]:
+                        return self._start(configuration, rung + 1)
+
+        return None
+
+    def report(self, configuration, rung, score):
+        """
+        Report the score obtained by a configuration at the end of a rung.
+
+        Args:
+            configuration (str): the configuration of the job;
+            rung (int): the rung of the job;
+            score (float): the score of the configuration, higher is better.
+
+        """
+        self._running.discard(configuration)
+        self._scores[rung][configuration] = -np.inf if np.isnan(score) else score
+
+    def get_decisions(self):
+        """
+        Returns:
+            A dictionary with, for each started configuration, the last rung reached, its number of epochs,
+            the score at that rung and whether the configuration has been pruned.
+
+        """
+        decisions = dict()
+        for rung, scores in enumerate(self._scores):
+            for configuration, score in scores.items():
+                decisions[configuration] = dict(
+                    rung=rung,
+                    epochs=self._rungs[rung],
+                    score=float(score),
+                    pruned=rung < len(self._rungs) - 1
+                )
+
+        return decisions
+
+    def _get_ranking(self, rung):
+        scores = self._scores[rung]
+        return sorted(scores, key=lambda configuration: scores[configuration], reverse=True)
+
+    def _start(self, configuration, rung):
+        if rung > 0:
+            self._promoted[rung - 1].add(configuration)
+        self._running.add(configuration)
+
+        return configuration, rung
@@ -4,17 +4,27 @@ os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
 import pkgutil
 import subprocess
 
-from tqdm import trange
+from tqdm import tqdm
 import multiprocessing
 from joblib import delayed
 
 from mushroom_rl_benchmark.utils import extract_arguments
-from mushroom_rl_benchmark.experiment import exec_run
+from mushroom_rl_benchmark.experiment import exec_run, exec_run_to_dir, load_run_result, ResourcePolicy
+from mushroom_rl_benchmark.experiment.supervisor import exec_supervised_run, is_failed_run
 from mushroom_rl_benchmark.experiment.slurm import create_slurm_script, generate_slurm, make_arguments
+from mushroom_rl_benchmark.core.logger import BenchmarkLogger
 from mushroom_rl_benchmark.core.visualizer import BenchmarkVisualizer
 from mushroom_rl_benchmark.utils.tqdm_parallel import TqdmParallel
 
 
+# Configuration entries describing the state of the execution, not parameters of the runs
+_CONFIG_STATE_KEYS = ['agent_type', 'n_runs_completed', 'max_concurrent_runs', 'use_threading', 'resources',
+                      'run_parallel', 'run_slurm']
+
+# Run parameters holding the settings of the executors, that are not passed to the runs
+_EXECUTOR_KEYS = ['sequential', 'parallel', 'slurm']
+
+
 class BenchmarkExperiment:
     """
     Class to create and run an experiment using MushroomRL
@@ -40,20 +50,54 @@ class BenchmarkExperiment:
         self.V = list()
         self.R = list()
         self.entropy = list()
+        self.seeds = list()
+        self.epochs = list()
         self.config = dict()
         self.stats = dict(best_J=float("-inf"))
 
+        self.results_index = None
+        self._index_key = dict()
+        self.run_cache = None
+        self._run_cache_keys = dict()
+
+    def set_results_index(self, results_index, environment, agent, sweep_key=None):
+        """
+        Set the results index where each run is recorded as soon as it is saved.
+
+        Args:
+            results_index (ResultsIndex): the results index;
+            environment (str): the environment id of the experiment;
+            agent (str): the agent name of the experiment;
+            sweep_key (str, None): the sweep key of the experiment, if it is part of a sweep.
+
+        """
+        self.results_index = results_index
+        self._index_key = dict(environment=environment, agent=agent, sweep_key=sweep_key)
+
+    def set_run_cache(self, run_cache):
+        """
+        Set the cache of the results of the runs. The runs found in the cache are not executed again, and the
+        completed runs are added to the cache.
+
+        Args:
+            run_cache (RunCache): the run cache.
+
+        """
+        self.run_cache = run_cache
+
     def run(self, exec_type='sequential', **run_params):
         """
         Execute the experiment.
 
         Args:
             exec_type (str, 'sequential'): type of executing the experiment [sequential|parallel|slurm];
-            **run_params: parameters for the selected execution type.
+            **run_params: parameters for the selected execution type. The settings of each executor can be
+                passed as a dictionary, e.g. parallel=dict(max_concurrent_runs=4), and only the ones of the
+                selected executor are used.
 
         """
-        executor_params = run_params[exec_type] if exec_type in run_params and run_params[exec_type] is not None \
-            else dict()
+        executor_settings = {executor: run_params.pop(executor, None) for executor in _EXECUTOR_KEYS}
+        executor_params = dict() if executor_settings.get(exec_type) is None else executor_settings[exec_type]
         try:
             run_fn = getattr(self, 'run_{}'.format(exec_type))
         except AttributeError as e: 
@@ -77,45 +121,30 @@ class BenchmarkExperiment:
         
         self.save_builders()
 
+        seeds = self._get_pending_seeds(n_runs, n_runs_completed)
+
         self.set_and_save_config(
             agent_type=self.agent_builder.__class__.__name__,
             n_runs=n_runs,
-            n_runs_completed=n_runs_completed,
+            n_runs_completed=n_runs - len(seeds),
             run_parallel=False,
             use_threading=False,
             **run_params)
 
-        for run in trange(n_runs_completed, n_runs, leave=False):
-            result = exec_run(self.agent_builder, self.env_builder, seed=run, quiet=False, **run_params)
-            self.extend_and_save_J([result['J']])
-            self.extend_and_save_R([result['R']])
-            if self.agent_builder.compute_value_function:
-                self.extend_and_save_V([result['V']])
-            if self.agent_builder.compute_policy_entropy:
-                self.extend_and_save_entropy([result['E']])
-            new_score = result['score']
-
-            if new_score[0] > self.stats['best_J']:
-                self.set_and_save_stats(best_J=new_score[0], best_R=new_score[1])
-
-                if self.agent_builder.compute_value_function:
-                    self.set_and_save_stats(best_V=new_score[2])
-
-                if self.agent_builder.compute_policy_entropy:
-                    self.set_and_save_stats(best_E=new_score[-1])
-
-                if 'agent' in result:
-                    new_agent = result['agent']
-                    self.logger.save_best_agent(new_agent)
-
-            self.set_and_save_config(n_runs_completed=(run+1))
+        for seed in tqdm(seeds, leave=False):
+            params = self._get_run_params(seed, run_params)
+            result = self._get_cached_run(seed, params)
+            if result is None:
+                result = exec_supervised_run(exec_run, self.agent_builder, self.env_builder, quiet=False, **params)
+            self.save_run_result(result)
+        self.set_and_save_config()
         self.stop_timer()
 
-        if save_plot:
+        if save_plot and self.has_results():
             self.save_plot()
 
     def run_parallel(self, n_runs, n_runs_completed=0, threading=False,
-                     save_plot=True, max_concurrent_runs=None, **run_params):
+                     save_plot=True, max_concurrent_runs=None, resources=None, **run_params):
         """
         Execute the experiment in parallel threads.
 
@@ -124,15 +153,22 @@ class BenchmarkExperiment:
             n_runs_completed (int, 0): number of completed runs of the experiment;
             threading (bool, False): select to use threads instead of processes;
             save_plot (bool, True): select if a plot of the experiment should be saved to the log directory;
-            max_concurrent_runs (int, -1): maximum number of concurrent runs. By default it uses the number of cores;
+            max_concurrent_runs (int, None): maximum number of concurrent runs. If None or not positive, it uses the
+                number of cores;
+            resources (dict, None): parameters of the ResourcePolicy of the workers. Cores are not pinned, as
+                the runs are not bound to a worker;
             **run_params: parameters for executing a benchmark run.
 
         """
-        self.start_timer()
-        self.save_builders()
-
+        if max_concurrent_runs is None:
+            max_concurrent_runs = -1
         used_cores = max_concurrent_runs if max_concurrent_runs > 0 else multiprocessing.cpu_count()
-        used_cores = min(used_cores, n_runs)
+        resource_policy = ResourcePolicy(used_cores, **(dict() if resources is None else resources))
+
+        runs = self.start_parallel(n_runs, n_runs_completed, threading, max_concurrent_runs,
+                                   resources=resource_policy.get_config(), **run_params)
+
+        used_cores = min(used_cores, max(len(runs), 1))
 
         self.logger.info('Number of used cores: {}'.format(used_cores))
 
@@ -140,75 +176,95 @@ class BenchmarkExperiment:
         parallel_settings['n_jobs'] = max_concurrent_runs
         if threading:
             parallel_settings['prefer'] = 'threads'
+            resource_policy.apply()
+
+        self.logger.info('Starting experiment ...')
+
+        with TqdmParallel(return_as='generator_unordered', **parallel_settings) as parallel:
+            results = parallel((delayed(_exec_run)(resource_policy, self.agent_builder.copy(),
+                                                   self.env_builder.copy(), **run)
+                                for run in runs), total=len(runs))
+
+            # Results are consumed as soon as each run completes, so that a partial experiment is always on disk
+            for result in results:
+                self.save_run_result(result)
+
+        self.stop_parallel(save_plot)
+
+    def start_parallel(self, n_runs, n_runs_completed=0, threading=False, max_concurrent_runs=None, resources=None,
+                       **run_params):
+        """
+        Prepare the parallel execution of the experiment, saving builders and configuration. The pending
+        runs can be executed by any pool, passing their results to the save_run_result method and calling
+        the stop_parallel method when all of them are completed.
+
+        Args:
+            n_runs (int): number of total runs of the experiment;
+            n_runs_completed (int, 0): number of completed runs of the experiment;
+            threading (bool, False): select to use threads instead of processes;
+            max_concurrent_runs (int, None): maximum number of concurrent runs;
+            resources (dict, None): settings of the ResourcePolicy of the workers, saved in the configuration;
+            **run_params: parameters for executing a benchmark run.
+
+        Returns:
+            The list of the parameters of exec_run_to_dir for each pending run, excluding the builders. Each
+            run is saved in its own run directory, if the logger provides one. The runs found in the run cache
+            are saved immediately, and not returned.
+
+        """
+        self.start_timer()
+        self.save_builders()
+
+        seeds = self._get_pending_seeds(n_runs, n_runs_completed)
 
         self.set_and_save_config(
             agent_type=self.agent_builder.__class__.__name__,
-            n_runs_completed=n_runs_completed,
+            n_runs_completed=n_runs - len(seeds),
             n_runs=n_runs,
             max_concurrent_runs=max_concurrent_runs,
             use_threading=threading,
+            resources=resources,
             run_parallel=True,
             **run_params
         )
 
-        self.logger.info('Starting experiment ...')
-
-        with TqdmParallel(**parallel_settings) as parallel:
-            runs = parallel(
-                (delayed(exec_run)(self.agent_builder.copy(), self.env_builder.copy(),
-                                  seed=seed, **run_params)
-                for seed in range(n_runs)),
-                total=n_runs
-            )
-
-            run_J = list()
-            run_R = list()
-            run_V = list()
-            run_E = list()
-            new_score = [float("-inf"), 0, 0, 0]  # J, R, Q, E
-            new_agent = None
-
-            for run in runs:
-                # Collect J, R, Q and E
-                run_J.append(run['J'])
-                run_R.append(run['R'])
-                if self.agent_builder.compute_value_function:
-                    run_V.append(run['V'])
-                if self.agent_builder.compute_policy_entropy:
-                    run_E.append(run['E'])
-
-                # Check for best Agent (depends on J)
-                if run['score'][0] > new_score[0]:
-                    new_score = run['score']
-                    if 'agent' in run:
-                        new_agent = run['agent']
-
-            self.extend_and_save_J(run_J)
-            self.extend_and_save_R(run_R)
-            if self.agent_builder.compute_value_function:
-                self.extend_and_save_V(run_V)
-            if self.agent_builder.compute_policy_entropy:
-                self.extend_and_save_entropy(run_E)
-
-            if new_score[0] > self.stats['best_J']:
-                self.set_and_save_stats(best_J=new_score[0], best_R=new_score[1])
+        runs = list()
+        for seed in seeds:
+            run_dir = self.logger.get_run_path(seed)
+            params = self._get_run_params(seed, run_params)
+            result = self._get_cached_run(seed, params)
+            if result is None:
+                runs.append(dict(run_dir=None if run_dir is None else str(run_dir), **params))
+            else:
+                self.save_run_result(result)
 
-                if self.agent_builder.compute_value_function:
-                    self.set_and_save_stats(best_V=new_score[2])
+        return runs
 
-                if self.agent_builder.compute_policy_entropy:
-                    self.set_and_save_stats(best_E=new_score[-1])
+    def stop_parallel(self, save_plot=True):
+        """
+        Complete the parallel execution of the experiment, once the results of all the runs are saved.
 
-                if new_agent is not None:
-                    self.logger.save_best_agent(new_agent)
+        Args:
+            save_plot (bool, True): select if a plot of the experiment should be saved to the log directory.
 
+        """
+        self.set_and_save_config()
         self.stop_timer()
 
         self.logger.info('Finished experiment.')
 
-        if save_plot:
+        if save_plot and self.has_results():
             self.save_plot()
 
+    def has_results(self):
+        """
+        Returns:
+            True if at least one run of the experiment was completed successfully, False otherwise, e.g. when
+            all the runs failed.
+
+        """
+        return self.logger.exists_J()
+
     def run_slurm(self, n_runs, n_runs_completed=0, aggregation_job=True, aggregate_hours=0,
                   aggregate_minutes=20, aggregate_seconds=0, only_print=False, **run_params):
         """
@@ -231,6 +287,14 @@ class BenchmarkExperiment:
         slurm_params = extract_arguments(run_params, create_slurm_script)
         slurm_params.update(extract_arguments(run_params, generate_slurm))
 
+        # Runs already saved in their own directory by a previous job array are not submitted again
+        seeds = [seed for seed in self._get_pending_seeds(n_runs, n_runs_completed)
+                 if not (self.logger.get_path('run_{}'.format(seed)) / 'stats.yaml').exists()]
+
+        if len(seeds) == 0:
+            self.logger.info('All the runs of the experiment are already completed.')
+            return
+
         # Create SLURM Script for experiment runs
         log_dir = str(self.logger.get_path().absolute())
         log_id = self.logger.get_log_id()
@@ -240,7 +304,7 @@ class BenchmarkExperiment:
             slurm_script_name='slurm_run.sh',
             exp_name=log_id, 
             exp_dir_slurm=log_dir,
-            n_exp=n_runs,
+            seeds=seeds,
             python_file=python_file,
             **slurm_params)
 
@@ -264,7 +328,7 @@ class BenchmarkExperiment:
 
         self.set_and_save_config(
             agent_type=self.agent_builder.__class__.__name__,
-            n_runs_completed=n_runs_completed,
+            n_runs_completed=n_runs - len(seeds),
             n_runs=n_runs,
             max_concurrent_runs=None,
             use_threading=False,
@@ -273,7 +337,7 @@ class BenchmarkExperiment:
             **exec_params
         )
 
-        # submit job array with n_exp runs
+        # submit job array with the pending runs
         command_line_arguments = make_arguments(
             log_dir=log_dir,
             **exec_params
@@ -309,13 +373,88 @@ class BenchmarkExperiment:
         self.V = list()
         self.R = list()
         self.entropy = list()
+        self.seeds = list()
+        self.epochs = list()
+        self.stats = dict(best_J=float("-inf"))
+
+    def resume(self, exec_type='sequential', **run_params):
+        """
+        Resume the experiment, executing only the runs whose results are missing in the log directory.
+        The run parameters saved in the experiment configuration are used, unless they are overridden. When
+        a parallel execution is resumed in parallel, its saved executor settings are used as well.
+
+        Args:
+            exec_type (str, 'sequential'): type of executing the experiment [sequential|parallel|slurm];
+            **run_params: parameters overriding the saved ones.
+
+        """
+        saved_params = {key: value for key, value in self.config.items() if key not in _CONFIG_STATE_KEYS}
+        if exec_type == 'parallel' and self.config.get('run_parallel', False):
+            saved_params['parallel'] = dict(threading=self.config.get('use_threading', False),
+                                            max_concurrent_runs=self.config.get('max_concurrent_runs'),
+                                            resources=self.config.get('resources'))
+            saved_params['parallel'].update(run_params.pop('parallel', None) or dict())
+        saved_params.update(run_params)
+
+        self.logger.info('Resuming BenchmarkExperiment: {} of {} runs completed'.format(
+            len(self.seeds), saved_params['n_runs']))
+        self.run(exec_type=exec_type, **saved_params)
+
+    def load(self):
+        """
+        Load the state of the experiment (configuration, statistics and results) from the log directory.
+
+        """
+        self.reset()
+
+        if self.logger.exists_config():
+            self.config = self.logger.load_config()
+
+        if self.logger.exists_stats():
+            self.stats.update(self.logger.load_stats())
 
-    def resume(self, logger):
+        if self.logger.exists_J():
+            self.J = self.logger.load_J()
+            self.R = self.logger.load_R()
+            if self.logger.exists_value_function():
+                self.V = self.logger.load_V()
+            if self.logger.exists_policy_entropy():
+                self.entropy = self.logger.load_entropy()
+
+            self.epochs = self.logger.load_epochs()
+            if self.logger.exists_seeds():
+                self.seeds = self.logger.load_seeds()
+            else:
+                # Old results were always saved in seed order
+                self.seeds = list(range(len(self.J)))
+
+    @classmethod
+    def from_logger(cls, logger):
+        """
+        Rebuild an experiment from its log directory, loading builders, configuration, statistics and results.
+
+        Args:
+            logger (BenchmarkLogger): logger of the experiment to rebuild.
+
+        Returns:
+            The rebuilt experiment.
+
+        """
+        agent_builder = logger.load_agent_builder()
+        env_builder = logger.load_environment_builder()
+
+        experiment = cls(agent_builder, env_builder, logger)
+        experiment.load()
+
+        return experiment
+
+    @classmethod
+    def from_path(cls, path):
         """
-        Resume an experiment from disk
+        Rebuild an experiment from the path of its log directory.
 
         """
-        raise NotImplementedError('This method was not yet implemented.')
+        return cls.from_logger(BenchmarkLogger.from_path(path))
 
     def start_timer(self):
         """
@@ -342,37 +481,220 @@ class BenchmarkExperiment:
         self.logger.save_agent_builder(self.agent_builder)
         self.logger.save_environment_builder(self.env_builder)
 
+    def _get_pending_seeds(self, n_runs, n_runs_completed):
+        completed_seeds = set(self.seeds)
+        return [seed for seed in range(n_runs_completed, n_runs) if seed not in completed_seeds]
+
+    def _get_run_params(self, seed, run_params):
+        """
+        Get the parameters of the run with the given seed. When checkpointing is enabled, each run is
+        checkpointed in its own directory, that also stores the disk-backed replay memory of the run.
+
+        Args:
+            seed (int): the seed of the run;
+            run_params (dict): parameters for executing a benchmark run.
+
+        Returns:
+            The parameters to pass to exec_run.
+
+        """
+        params = dict(seed=seed, **run_params)
+        if run_params.get('checkpoint_frequency', 0) > 0:
+            params['checkpoint_dir'] = str(self.logger.get_checkpoint_path(seed))
+        elif getattr(self.agent_builder, 'replay_memory', None) == 'disk':
+            params['replay_memory_dir'] = str(self.logger.get_checkpoint_path(seed))
+
+        return params
+
+    def _get_cached_run(self, seed, run_params):
+        """
+        Look up a run in the run cache, linking its files into the run directory on a hit. On a miss, the key
+        of the run is kept, to add the run to the cache when its result is saved.
+
+        Args:
+            seed (int): the seed of the run;
+            run_params (dict): the parameters of the run.
+
+        Returns:
+            The summary or the result of the cached run, or None if the run is not cached.
+
+        """
+        if self.run_cache is None:
+            return None
+
+        key = self.run_cache.get_key(self.agent_builder, self.env_builder, run_params)
+        if key is None:
+            return None
+
+        result = self.run_cache.get(key, self.logger.get_run_path(seed))
+        if result is None:
+            self._run_cache_keys[seed] = key
+        else:
+            self.logger.info('Run with seed {} found in the run cache'.format(seed))
+
+        return result
+
+    def save_run_result(self, result):
+        """
+        Save the result of a single run to the log directory, updating the best scores and the best agent.
+        The runs saved in their run directory are merged into the results of the experiment, and the failed
+        runs are recorded in the statistics, so that they are executed again when the experiment is resumed.
+        The run is also recorded in the results index and added to the run cache, if set. The run directory
+        of the run is removed once the run is merged.
+
+        Args:
+            result (dict): the dictionary returned by the execution of the run, the summary of a run saved
+                in its run directory or the failure record of a run.
+
+        """
+        run_cache_key = self._run_cache_keys.pop(result['seed'], None)
+        if is_failed_run(result):
+            self.save_run_failure(result)
+            return
+
+        if 'run_dir' in result:
+            result = load_run_result(result)
+
+        failed_runs = self.stats.get('failed_runs', dict())
+        if result['seed'] in failed_runs:
+            del failed_runs[result['seed']]
+            self.set_and_save_stats(failed_runs=failed_runs, n_runs_failed=len(failed_runs))
+
+        self.extend_and_save_seeds([result['seed']])
+        self.extend_and_save_epochs([result['epochs']])
+        self.extend_and_save_J([result['J']])
+        self.extend_and_save_R([result['R']])
+        if self.agent_builder.compute_value_function:
+            self.extend_and_save_V([result['V']])
+        if self.agent_builder.compute_policy_entropy:
+            self.extend_and_save_entropy([result['E']])
+
+        new_score = result['score']
+
+        if new_score[0] > self.stats['best_J']:
+            self.set_and_save_stats(best_J=new_score[0], best_R=new_score[1])
+
+            if self.agent_builder.compute_value_function:
+                self.set_and_save_stats(best_V=new_score[2])
+
+            if self.agent_builder.compute_policy_entropy:
+                self.set_and_save_stats(best_E=new_score[-1])
+
+            if 'agent' in result:
+                self.logger.save_best_agent(result['agent'])
+            elif 'agent_path' in result:
+                self.logger.copy_best_agent(result['agent_path'])
+
+        self.set_and_save_stats(
+            eval_time_sec=self.stats.get('eval_time_sec', 0.) + result['eval_time_sec'],
+            eval_time_saved_sec=self.stats.get('eval_time_saved_sec', 0.) + result['eval_time_saved_sec'],
+            peak_memory_mb=max(self.stats.get('peak_memory_mb', 0.), result['peak_memory_mb']))
+
+        if result.get('n_env_steps', 0) > 0:
+            n_env_steps = self.stats.get('n_env_steps', 0) + result['n_env_steps']
+            n_updates = self.stats.get('n_updates', 0) + result['n_updates']
+            self.set_and_save_stats(n_env_steps=n_env_steps, n_updates=n_updates,
+                                    update_to_data_ratio=n_updates / n_env_steps)
+
+        if run_cache_key is not None:
+            self.run_cache.put(run_cache_key, result, self.agent_builder.compute_policy_entropy)
+
+        # The run directory is no longer needed once the run is merged into the experiment and cached
+        if 'run_dir' in result:
+            self.logger.remove_run(result['seed'])
+            result = {key: value for key, value in result.items() if key not in ['run_dir', 'agent_path']}
+
+        if self.results_index is not None:
+            self.results_index.add_run(result, self.logger.get_path(), **self._index_key)
+
+        # The number of completed runs is persisted by the appended results, the config is saved at the end
+        self.config['n_runs_completed'] += 1
+
+    def save_run_failure(self, failure):
+        """
+        Record a failed run in the statistics of the experiment.
+
+        Args:
+            failure (dict): the failure record of the run.
+
+        """
+        error = failure['error'].strip().splitlines()
+        self.logger.error('Run with seed {} failed after {} attempts: {}'.format(
+            failure['seed'], failure['n_attempts'], error[-1] if len(error) > 0 else ''))
+
+        failed_runs = self.stats.get('failed_runs', dict())
+        failed_runs[failure['seed']] = dict(n_attempts=failure['n_attempts'], error=failure['error'])
+        self.set_and_save_stats(failed_runs=failed_runs, n_runs_failed=len(failed_runs))
+
+        if self.results_index is not None:
+            self.results_index.add_run_failure(failure, self.logger.get_path(), **self._index_key)
+
+    def extend_and_save_seeds(self, seeds):
+        """
+        Extend the seeds of the completed runs and append them to the log directory.
+
+        """
+        if len(self.seeds) == 0:
+            self.logger.save_seeds(seeds)
+        else:
+            self.logger.append_seeds(seeds)
+        self.seeds.extend(seeds)
+
+    def extend_and_save_epochs(self, epochs):
+        """
+        Extend the evaluated epochs with new runs and append them to the log directory.
+
+        """
+        if len(self.epochs) == 0 or not self.logger.exists_epochs():
+            # Logs created before the evaluated epochs were saved are rewritten as a whole
+            self.logger.save_epochs(self.epochs + epochs)
+        else:
+            self.logger.append_epochs(epochs)
+        self.epochs.extend(epochs)
+
     def extend_and_save_J(self, J):
         """
-        Extend J with another datapoint and save the current state to the log directory.
+        Extend J with new runs and append them to the log directory.
 
         """
+        if len(self.J) == 0:
+            self.logger.save_J(J)
+        else:
+            self.logger.append_J(J)
         self.J.extend(J)
-        self.logger.save_J(self.J)
 
     def extend_and_save_R(self, R):
         """
-        Extend R with another datapoint and save the current state to the log directory.
+        Extend R with new runs and append them to the log directory.
 
         """
+        if len(self.R) == 0:
+            self.logger.save_R(R)
+        else:
+            self.logger.append_R(R)
         self.R.extend(R)
-        self.logger.save_R(self.R)
 
     def extend_and_save_V(self, V):
         """
-        Extend V with another datapoint and save the current state to the log directory.
+        Extend V with new runs and append them to the log directory.
 
         """
+        if len(self.V) == 0:
+            self.logger.save_V(V)
+        else:
+            self.logger.append_V(V)
         self.V.extend(V)
-        self.logger.save_V(self.V)
 
     def extend_and_save_entropy(self, entropy):
         """
-        Extend entropy with another datapoint and save the current state to the log directory.
+        Extend entropy with new runs and append them to the log directory.
 
         """
+        if len(self.entropy) == 0:
+            self.logger.save_entropy(entropy)
+        else:
+            self.logger.append_entropy(entropy)
         self.entropy.extend(entropy)
-        self.logger.save_entropy(self.entropy)
 
     def set_and_save_config(self, **settings):
         """
@@ -406,3 +728,7 @@ class BenchmarkExperiment:
         visualizer = BenchmarkVisualizer(self.logger)
         visualizer.show_report()
 
+
+def _exec_run(resource_policy, agent_builder, env_builder, **run_params):
+    resource_policy.apply()
+    return exec_supervised_run(exec_run_to_dir, agent_builder, env_builder, **run_params)
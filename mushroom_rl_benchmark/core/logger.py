@@ -1,5 +1,7 @@
+import io
 import os
 import pickle
+import shutil
 import yaml
 from datetime import datetime
 
@@ -18,7 +20,7 @@ class BenchmarkLogger(ConsoleLogger):
     Class to handle all interactions with the log directory.
     """
 
-    def __init__(self, log_dir=None, log_id=None, use_timestamp=True):
+    def __init__(self, log_dir=None, log_id=None, use_timestamp=True, columnar=None):
         """
         Constructor.
 
@@ -26,13 +28,19 @@ class BenchmarkLogger(ConsoleLogger):
             log_dir (str, None): path to the log directory, if not specified defaults to ./logs or to
                 /work/scratch/$USER if the second directory exists;
             log_id (str, None): log id, if not specified defaults to: benchmark[_YY-mm-ddTHH:MM:SS.zzz]);
-            use_timestamp (bool, True): select if a timestamp should be appended to the log id.
+            use_timestamp (bool, True): select if a timestamp should be appended to the log id;
+            columnar (bool, None): select to save the metrics of the runs in the columnar format, i.e. one
+                memory-mappable (run x evaluation) array per metric, instead of pickled lists. By default,
+                the format of the metrics already in the log directory is kept, and new log directories
+                use the columnar format.
 
         """
         self._file_J = 'J.pkl'
         self._file_R = 'R.pkl'
         self._file_V = 'V.pkl'
         self._file_entropy = 'entropy.pkl'
+        self._file_seeds = 'seeds.pkl'
+        self._file_epochs = 'epochs.pkl'
         self._file_best_agent = 'best_agent.msh'
         self._file_last_agent = 'last_agent.msh'
         self._file_env_builder = 'environment_builder.pkl'
@@ -47,6 +55,10 @@ class BenchmarkLogger(ConsoleLogger):
         self.set_log_dir(log_dir)
         self.set_log_id(log_id, use_timestamp=use_timestamp)
 
+        if columnar is None:
+            columnar = not self.get_path(self._file_J).exists()
+        self._columnar = columnar
+
         super().__init__(self._log_id, self.get_path(), log_file_name='console')
 
     def set_log_dir(self, log_dir):
@@ -123,6 +135,19 @@ class BenchmarkLogger(ConsoleLogger):
         """
         return self._log_dir / self._log_id / filename
 
+    def get_run_path(self, seed):
+        """
+        Get the path of the directory where a run executed in parallel is saved.
+
+        Args:
+            seed (int): the seed of the run.
+
+        Returns:
+            The complete path of the run directory.
+
+        """
+        return self.get_path('run_{}'.format(seed))
+
     def get_params_path(self, filename=''):
         """
         Get the path of the parameters of the given file. If no filename is given, it returns the
@@ -163,12 +188,60 @@ class BenchmarkLogger(ConsoleLogger):
 
         return str(figure_dir / filename)
 
+    def get_checkpoint_path(self, seed):
+        """
+        Get the path of the checkpoint directory of a run.
+
+        Args:
+            seed (int): the seed of the run.
+
+        Returns:
+            The complete path of the checkpoint directory.
+
+        """
+        checkpoint_dir = self._log_dir / self._log_id / 'checkpoints'
+
+        if not checkpoint_dir.exists():
+            checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+        return checkpoint_dir / 'run_{}'.format(seed)
+
+    def remove_run(self, seed):
+        """
+        Remove the run directory of a run, once its results are merged into the ones of the experiment.
+
+        Args:
+            seed (int): the seed of the run.
+
+        """
+        run_dir = self.get_run_path(seed)
+
+        if run_dir.exists():
+            shutil.rmtree(run_dir)
+
+    def remove_checkpoints(self):
+        """
+        Remove the checkpoints of all the runs.
+
+        """
+        checkpoint_dir = self._log_dir / self._log_id / 'checkpoints'
+
+        if checkpoint_dir.exists():
+            shutil.rmtree(checkpoint_dir)
+
     def save_J(self, J):
         """
         Save the log of the cumulative discounted reward.
 
         """
-        self._save_pickle(self.get_path(self._file_J), J)
+        self._save_runs(self._file_J, J)
+
+    def append_J(self, J):
+        """
+        Append the log of the cumulative discounted reward of new runs to the saved one.
+
+        """
+        self._append_runs(self._file_J, J)
 
     def load_J(self):
         """
@@ -176,14 +249,21 @@ class BenchmarkLogger(ConsoleLogger):
             The log of the cumulative discounted reward.
 
         """
-        return self._load_pickle(self.get_path(self._file_J))
+        return self._load_runs(self._file_J)
 
     def save_R(self, R):
         """
         Save the log of the cumulative reward.
 
         """
-        self._save_pickle(self.get_path(self._file_R), R)
+        self._save_runs(self._file_R, R)
+
+    def append_R(self, R):
+        """
+        Append the log of the cumulative reward of new runs to the saved one.
+
+        """
+        self._append_runs(self._file_R, R)
 
     def load_R(self):
         """
@@ -191,14 +271,21 @@ class BenchmarkLogger(ConsoleLogger):
             The log of the cumulative reward.
 
         """
-        return self._load_pickle(self.get_path(self._file_R))
+        return self._load_runs(self._file_R)
 
     def save_V(self, V):
         """
         Save the log of the value function.
 
         """
-        self._save_pickle(self.get_path(self._file_V), V)
+        self._save_runs(self._file_V, V)
+
+    def append_V(self, V):
+        """
+        Append the log of the value function of new runs to the saved one.
+
+        """
+        self._append_runs(self._file_V, V)
 
     def load_V(self):
         """
@@ -206,14 +293,21 @@ class BenchmarkLogger(ConsoleLogger):
             The log of the value function.
 
         """
-        return self._load_pickle(self.get_path(self._file_V))
+        return self._load_runs(self._file_V)
 
     def save_entropy(self, entropy):
         """
         Save the log of the entropy function.
 
         """
-        self._save_pickle(self.get_path(self._file_entropy), entropy)
+        self._save_runs(self._file_entropy, entropy)
+
+    def append_entropy(self, entropy):
+        """
+        Append the log of the entropy function of new runs to the saved one.
+
+        """
+        self._append_runs(self._file_entropy, entropy)
 
     def load_entropy(self):
         """
@@ -221,19 +315,90 @@ class BenchmarkLogger(ConsoleLogger):
             The log of the entropy function.
 
         """
-        path = self.get_path(self._file_entropy)
-        if path.exists():
-            return self._load_pickle(path)
+        if self._exists_runs(self._file_entropy):
+            return self._load_runs(self._file_entropy)
         else:
             return None
 
+    def save_seeds(self, seeds):
+        """
+        Save the seeds of the completed runs, in the same order of the logged metrics.
+
+        """
+        self._save_runs(self._file_seeds, seeds)
+
+    def append_seeds(self, seeds):
+        """
+        Append the seeds of new completed runs to the saved ones.
+
+        """
+        self._append_runs(self._file_seeds, seeds)
+
+    def load_seeds(self):
+        """
+        Returns:
+            The seeds of the completed runs.
+
+        """
+        return _to_seeds(self._load_runs(self._file_seeds))
+
+    def exists_seeds(self):
+        """
+        Returns:
+            True if the log of the seeds exists, False otherwise.
+
+        """
+        return self._exists_runs(self._file_seeds)
+
+    def save_epochs(self, epochs):
+        """
+        Save the evaluated epochs of the completed runs, in the same order of the logged metrics.
+
+        """
+        self._save_runs(self._file_epochs, epochs)
+
+    def append_epochs(self, epochs):
+        """
+        Append the evaluated epochs of new completed runs to the saved ones.
+
+        """
+        self._append_runs(self._file_epochs, epochs)
+
+    def load_epochs(self):
+        """
+        Returns:
+            The evaluated epochs of the completed runs. Logs without evaluated epochs were evaluated
+            at every epoch.
+
+        """
+        if self._exists_runs(self._file_epochs):
+            return self._load_runs(self._file_epochs)
+        else:
+            return [np.arange(len(J)) for J in self.load_J()]
+
+    def exists_epochs(self):
+        """
+        Returns:
+            True if the log of the evaluated epochs exists, False otherwise.
+
+        """
+        return self._exists_runs(self._file_epochs)
+
+    def exists_J(self):
+        """
+        Returns:
+            True if the log of the cumulative discounted reward exists, False otherwise.
+
+        """
+        return self._exists_runs(self._file_J)
+
     def exists_policy_entropy(self):
         """
         Returns:
             True if the log of the entropy exists, False otherwise.
 
         """
-        return self.get_path(self._file_entropy).exists()
+        return self._exists_runs(self._file_entropy)
 
     def exists_value_function(self):
         """
@@ -241,7 +406,53 @@ class BenchmarkLogger(ConsoleLogger):
             True if the log of the value function exists, False otherwise.
 
         """
-        return self.get_path(self._file_V).exists()
+        return self._exists_runs(self._file_V)
+
+    def load_metric_array(self, metric):
+        """
+        Load a metric as a 2-D array of runs and evaluations. Runs with fewer evaluations than the longest
+        one are masked. With the columnar format, the values are memory mapped and not copied.
+
+        Args:
+            metric (str): the name of the metric, i.e. 'J', 'R', 'V', 'entropy' or 'epochs'.
+
+        Returns:
+            The masked array of the metric, with shape (n_runs, n_evaluations).
+
+        """
+        filename = getattr(self, '_file_{}'.format(metric))
+        columnar_path = self._get_columnar_path(filename)
+        if columnar_path.exists():
+            table = self._load_columnar(columnar_path)
+        else:
+            table = _to_columnar(_load_pickle_chunks(self.get_path(filename)))
+
+        return np.ma.masked_array(table['value'], mask=~table['valid'], copy=False)
+
+    def convert_to_columnar(self, remove_pickles=True):
+        """
+        Convert the logs of the metrics saved as pickles to the columnar format.
+
+        Args:
+            remove_pickles (bool, True): select to remove the pickle files once converted.
+
+        Returns:
+            The number of converted logs.
+
+        """
+        n_converted = 0
+        for filename in [self._file_J, self._file_R, self._file_V, self._file_entropy, self._file_seeds,
+                         self._file_epochs]:
+            path = self.get_path(filename)
+            if path.exists():
+                self._save_columnar(self._get_columnar_path(filename), _load_pickle_chunks(path))
+                if remove_pickles:
+                    path.unlink()
+                n_converted += 1
+
+        self._columnar = True
+
+        return n_converted
 
     def save_best_agent(self, agent):
         """
@@ -253,6 +464,16 @@ class BenchmarkLogger(ConsoleLogger):
         """
         agent.save(self.get_path(self._file_best_agent))
 
+    def copy_best_agent(self, path):
+        """
+        Copy a saved agent to the path of the best agent.
+
+        Args:
+            path (str): the file of the saved agent.
+
+        """
+        shutil.copyfile(path, self.get_path(self._file_best_agent))
+
     def save_last_agent(self, agent):
         """
         Save the last agent in the respective path.
@@ -341,6 +562,14 @@ class BenchmarkLogger(ConsoleLogger):
         """
         return self._load_yaml(self.get_path(self._file_config))
 
+    def exists_config(self):
+        """
+        Returns:
+            True if the config file exists, False otherwise.
+
+        """
+        return self.get_path(self._file_config).exists()
+
     def exists_stats(self):
         """
         Returns:
@@ -395,11 +624,97 @@ class BenchmarkLogger(ConsoleLogger):
         extension = '.pdf' if as_pdf else '.png'
         figure.savefig(self.get_figure_path(figname + extension, subfolder), transparent=transparent)
 
+    def _save_runs(self, filename, runs):
+        columnar_path = self._get_columnar_path(filename)
+        if self._columnar:
+            self._save_columnar(columnar_path, runs)
+        else:
+            self._save_pickle(self.get_path(filename), runs)
+            if columnar_path.exists():
+                columnar_path.unlink()
+
+    def _append_runs(self, filename, runs):
+        columnar_path = self._get_columnar_path(filename)
+        if columnar_path.exists():
+            self._append_columnar(columnar_path, runs)
+        elif self._columnar and not self.get_path(filename).exists():
+            self._save_columnar(columnar_path, runs)
+        else:
+            self._append_pickle(self.get_path(filename), runs)
+
+    def _load_runs(self, filename):
+        columnar_path = self._get_columnar_path(filename)
+        if columnar_path.exists():
+            return _split_columnar(self._load_columnar(columnar_path))
+        else:
+            return _load_pickle_chunks(self.get_path(filename))
+
+    def _exists_runs(self, filename):
+        return self._get_columnar_path(filename).exists() or self.get_path(filename).exists()
+
+    def _get_columnar_path(self, filename):
+        return self.get_path(Path(filename).stem + '.npy')
+
+    @classmethod
+    def _save_columnar(cls, path, runs):
+        # The table is replaced only when complete, so that readers never see a partial table
+        tmp_path = path.with_name(path.name + '.tmp')
+        with tmp_path.open('wb') as f:
+            np.save(f, _to_columnar(runs))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def _append_columnar(cls, path, runs):
+        # The new rows are written after the last complete row, then the shape in the header is updated in
+        # place, so that the table is never rewritten and readers never see a partial row. The header has
+        # room for the growth of the first axis
+        runs = [np.atleast_1d(np.asarray(run)) for run in runs]
+        with path.open('r+b') as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            offset = f.tell()
+
+            rows = _to_columnar(runs, n_evaluations=shape[1], dtype=dtype['value']) \
+                if _fits_columnar(runs, shape, fortran_order, dtype) else None
+            if rows is not None:
+                header = io.BytesIO()
+                header_data = dict(descr=np.lib.format.dtype_to_descr(dtype), fortran_order=False,
+                                   shape=(shape[0] + len(runs), shape[1]))
+                if version == (1, 0):
+                    np.lib.format.write_array_header_1_0(header, header_data)
+                else:
+                    np.lib.format.write_array_header_2_0(header, header_data)
+
+                if len(header.getvalue()) == offset:
+                    f.seek(offset + shape[0] * shape[1] * dtype.itemsize)
+                    f.write(rows.tobytes())
+                    f.truncate()
+                    f.flush()
+                    os.fsync(f.fileno())
+                    f.seek(0)
+                    f.write(header.getvalue())
+                    return
+
+        # The new runs are longer than the table, or of a different type
+        cls._save_columnar(path, _split_columnar(np.load(path)) + runs)
+
+    @staticmethod
+    def _load_columnar(path):
+        return np.load(path, mmap_mode='r')
+
     @staticmethod
     def _save_pickle(path, obj):
         with Path(path).open('wb') as f:
             pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
     
+    @staticmethod
+    def _append_pickle(path, obj):
+        with Path(path).open('ab') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
     @staticmethod
     def _save_numpy(path, obj):
         with Path(path).open('wb') as f:
@@ -441,3 +756,76 @@ class BenchmarkLogger(ConsoleLogger):
         """
         path = Path(path)
         return cls(path.parent, path.name, False)
+
+
+def convert_results_to_columnar(path, remove_pickles=True):
+    """
+    Convert the logs of the metrics saved as pickles to the columnar format, in all the experiment and run
+    directories of a results tree.
+
+    Args:
+        path (str): path of the results tree;
+        remove_pickles (bool, True): select to remove the pickle files once converted.
+
+    Returns:
+        The list of the converted directories.
+
+    """
+    converted = list()
+    for metric_path in sorted(Path(path).rglob('J.pkl')):
+        logger = BenchmarkLogger.from_path(metric_path.parent)
+        logger.convert_to_columnar(remove_pickles=remove_pickles)
+        converted.append(metric_path.parent)
+
+    return converted
+
+
+def _to_columnar(runs, n_evaluations=None, dtype=None):
+    runs = [np.atleast_1d(np.asarray(run)) for run in runs]
+    if n_evaluations is None:
+        n_evaluations = max([len(run) for run in runs], default=0)
+    if dtype is None:
+        dtype = np.result_type(*runs) if len(runs) > 0 else np.float64
+
+    table = np.zeros((len(runs), n_evaluations), dtype=[('value', dtype), ('valid', bool)])
+    for i, run in enumerate(runs):
+        table['value'][i, :len(run)] = run
+        table['valid'][i, :len(run)] = True
+
+    return table
+
+
+def _fits_columnar(runs, shape, fortran_order, dtype):
+    # Whether the runs can be appended to a table as new rows, without changing its columns or its type
+    if fortran_order or len(shape) != 2 or dtype.names != ('value', 'valid'):
+        return False
+
+    return all(len(run) <= shape[1] and np.can_cast(run.dtype, dtype['value']) for run in runs)
+
+
+def _split_columnar(table):
+    # The runs are views of the table, unless their valid evaluations are not contiguous
+    runs = list()
+    for values, valid in zip(table['value'], table['valid']):
+        n_valid = int(valid.sum())
+        runs.append(values[:n_valid] if valid[:n_valid].all() else values[valid])
+
+    return runs
+
+
+def _load_pickle_chunks(path):
+    # Each chunk is a list of runs: a file written with a single save is a file with a single chunk
+    data = list()
+    with path.open('rb') as f:
+        while True:
+            try:
+                data.extend(pickle.load(f))
+            except (EOFError, pickle.UnpicklingError):
+                # End of file, or a chunk truncated by an interrupted write
+                break
+    return data
+
+
+def _to_seeds(runs):
+    # In the columnar format, each seed is saved as a run with a single value
+    return [int(seed[0]) if np.ndim(seed) > 0 else seed for seed in runs]
@@ -0,0 +1,455 @@
+import os
+import pickle
+import yaml
+from pathlib import Path
+
+import numpy as np
+
+from mushroom_rl.core import Serializable
+
+from mushroom_rl_benchmark.core.logger import _to_columnar, _split_columnar, _load_pickle_chunks, _to_seeds
+from mushroom_rl_benchmark.core.sweep_store import SweepStore
+
+
+_EXPERIMENT_FILES = ['config.yaml', 'J.pkl', 'J.npy']
+
+
+class ExperimentReader:
+    """
+    Class to read the log directory of an experiment without modifying it, e.g. for analysis and plotting.
+    It has the same loading interface of the BenchmarkLogger, but it creates no directory and opens no file
+    for writing. The directory is listed once, and each metric is loaded only when requested, and then
+    cached.
+
+    """
+    def __init__(self, path, listing=None):
+        """
+        Constructor.
+
+        Args:
+            path (str): the log directory of the experiment;
+            listing (dict, None): the listing of the log directory, as returned by list_directory, if already
+                available. By default, the directory is listed when first needed.
+
+        """
+        self._path = Path(path)
+        self._listing = listing
+        self._runs = dict()
+
+    def get_path(self, filename=''):
+        """
+        Get the path of the given file. If no filename is given, it returns the path of the log directory.
+
+        Args:
+            filename (str, ''): the name of the file.
+
+        Returns:
+            The complete path of the file.
+
+        """
+        return self._path / filename
+
+    def get_log_id(self):
+        """
+        Returns:
+            The id of the log directory, i.e. its name.
+
+        """
+        return self._path.name
+
+    def refresh(self):
+        """
+        Discard the cached listing and metrics, to read the changes of a log directory still being written.
+
+        """
+        self._listing = None
+        self._runs = dict()
+
+    def load_J(self):
+        """
+        Returns:
+            The log of the cumulative discounted reward.
+
+        """
+        return self._load_runs('J')
+
+    def load_R(self):
+        """
+        Returns:
+            The log of the cumulative reward.
+
+        """
+        return self._load_runs('R')
+
+    def load_V(self):
+        """
+        Returns:
+            The log of the value function.
+
+        """
+        return self._load_runs('V')
+
+    def load_entropy(self):
+        """
+        Returns:
+            The log of the entropy function.
+
+        """
+        if self._exists_runs('entropy'):
+            return self._load_runs('entropy')
+        else:
+            return None
+
+    def load_seeds(self):
+        """
+        Returns:
+            The seeds of the completed runs.
+
+        """
+        return _to_seeds(self._load_runs('seeds'))
+
+    def load_epochs(self):
+        """
+        Returns:
+            The evaluated epochs of the completed runs. Logs without evaluated epochs were evaluated
+            at every epoch.
+
+        """
+        if self._exists_runs('epochs'):
+            return self._load_runs('epochs')
+        else:
+            return [np.arange(len(J)) for J in self.load_J()]
+
+    def load_metric_array(self, metric):
+        """
+        Load a metric as a 2-D array of runs and evaluations. Runs with fewer evaluations than the longest
+        one are masked. With the columnar format, the values are memory mapped and not copied.
+
+        Args:
+            metric (str): the name of the metric, i.e. 'J', 'R', 'V', 'entropy' or 'epochs'.
+
+        Returns:
+            The masked array of the metric, with shape (n_runs, n_evaluations).
+
+        """
+        if self._exists('{}.npy'.format(metric)):
+            table = np.load(self.get_path('{}.npy'.format(metric)), mmap_mode='r')
+        else:
+            table = _to_columnar(self._load_runs(metric))
+
+        return np.ma.masked_array(table['value'], mask=~table['valid'], copy=False)
+
+    def exists_J(self):
+        """
+        Returns:
+            True if the log of the cumulative discounted reward exists, False otherwise.
+
+        """
+        return self._exists_runs('J')
+
+    def exists_value_function(self):
+        """
+        Returns:
+            True if the log of the value function exists, False otherwise.
+
+        """
+        return self._exists_runs('V')
+
+    def exists_policy_entropy(self):
+        """
+        Returns:
+            True if the log of the entropy exists, False otherwise.
+
+        """
+        return self._exists_runs('entropy')
+
+    def exists_seeds(self):
+        """
+        Returns:
+            True if the log of the seeds exists, False otherwise.
+
+        """
+        return self._exists_runs('seeds')
+
+    def exists_epochs(self):
+        """
+        Returns:
+            True if the log of the evaluated epochs exists, False otherwise.
+
+        """
+        return self._exists_runs('epochs')
+
+    def exists_config(self):
+        """
+        Returns:
+            True if the config file exists, False otherwise.
+
+        """
+        return self._exists('config.yaml')
+
+    def exists_stats(self):
+        """
+        Returns:
+            True if the statistics file exists, False otherwise.
+
+        """
+        return self._exists('stats.yaml')
+
+    def exists_best_agent(self):
+        """
+        Returns:
+            True if the best agent file exists, False otherwise.
+
+        """
+        return self._exists('best_agent.msh')
+
+    def load_config(self):
+        """
+        Returns:
+            The config file.
+
+        """
+        return self._load_yaml('config.yaml')
+
+    def load_stats(self):
+        """
+        Returns:
+            The statistics file.
+
+        """
+        return self._load_yaml('stats.yaml')
+
+    def load_best_agent(self):
+        """
+        Returns:
+            The best agent.
+
+        """
+        return Serializable.load(self.get_path('best_agent.msh'))
+
+    def load_agent_builder(self):
+        """
+        Returns:
+            The agent builder.
+
+        """
+        return self._load_pickle('agent_builder.pkl')
+
+    def load_environment_builder(self):
+        """
+        Returns:
+            The environment builder.
+
+        """
+        return self._load_pickle('environment_builder.pkl')
+
+    def get_run_dirs(self):
+        """
+        Returns:
+            The run directories of the experiment, i.e. the directories of the runs executed in parallel or
+            with SLURM.
+
+        """
+        return [self.get_path(name) for name, is_dir in self._get_listing().items()
+                if is_dir and name.startswith('run_')]
+
+    def _load_runs(self, metric):
+        if metric not in self._runs:
+            if self._exists('{}.npy'.format(metric)):
+                table = np.load(self.get_path('{}.npy'.format(metric)), mmap_mode='r')
+                self._runs[metric] = _split_columnar(table)
+            else:
+                self._runs[metric] = _load_pickle_chunks(self.get_path('{}.pkl'.format(metric)))
+
+        return self._runs[metric]
+
+    def _exists_runs(self, metric):
+        return self._exists('{}.npy'.format(metric)) or self._exists('{}.pkl'.format(metric))
+
+    def _exists(self, filename):
+        return filename in self._get_listing()
+
+    def _get_listing(self):
+        if self._listing is None:
+            self._listing = list_directory(self._path)
+
+        return self._listing
+
+    def _load_yaml(self, filename):
+        with self.get_path(filename).open('r') as f:
+            return yaml.safe_load(f)
+
+    def _load_pickle(self, filename):
+        with self.get_path(filename).open('rb') as f:
+            return pickle.load(f)
+
+
+class SuiteReader:
+    """
+    Class to read the log directory of a benchmark suite without modifying it, e.g. for analysis and
+    plotting. Each directory of the suite is listed once, and the experiments are read by ExperimentReaders,
+    or by read-only SweepStores for the consolidated sweeps, so that no file is created or opened for writing,
+    and the metrics are loaded only when requested.
+
+    """
+    def __init__(self, path):
+        """
+        Constructor.
+
+        Args:
+            path (str): the log directory of the suite.
+
+        """
+        self._path = Path(path)
+        self._listings = dict()
+        self._experiments = dict()
+        self._stores = dict()
+
+    def get_path(self, filename=''):
+        """
+        Get the path of the given file. If no filename is given, it returns the path of the log directory.
+
+        Args:
+            filename (str, ''): the name of the file.
+
+        Returns:
+            The complete path of the file.
+
+        """
+        return self._path / filename
+
+    def refresh(self):
+        """
+        Discard the cached listings and experiments, to read the changes of a suite still being executed.
+
+        """
+        self._listings = dict()
+        self._experiments = dict()
+        self._stores = dict()
+
+    def get_environments(self):
+        """
+        Returns:
+            The environment ids of the suite.
+
+        """
+        return [name for name, is_dir in self._get_listing().items()
+                if is_dir and name not in ['plots', 'params']]
+
+    def get_agents(self, environment):
+        """
+        Args:
+            environment (str): the environment id.
+
+        Returns:
+            The names of the agents run on the environment.
+
+        """
+        return [name for name, is_dir in self._get_listing(environment).items() if is_dir]
+
+    def get_sweep_keys(self, environment, agent):
+        """
+        Args:
+            environment (str): the environment id;
+            agent (str): the agent name.
+
+        Returns:
+            The sweep keys of the agent on the environment. The list is empty if the agent is not swept.
+
+        """
+        if self._is_experiment(environment, agent):
+            return list()
+
+        store = self._get_store(environment, agent)
+        if store is not None:
+            return store.get_sweep_keys()
+
+        return [name for name, is_dir in self._get_listing(environment, agent).items()
+                if is_dir and self._is_experiment(environment, agent, name)]
+
+    def is_sweep(self):
+        """
+        Returns:
+            True if the suite is a parameter sweep, False otherwise.
+
+        """
+        return any(len(self.get_sweep_keys(environment, agent)) > 0
+                   for environment in self.get_environments() for agent in self.get_agents(environment))
+
+    def get_experiment(self, environment, agent, sweep_key=None):
+        """
+        Args:
+            environment (str): the environment id;
+            agent (str): the agent name;
+            sweep_key (str, None): the sweep key, if the experiment is part of a sweep.
+
+        Returns:
+            The reader of the experiment. The configurations of a consolidated sweep are read by the
+            SweepLogger of a read-only SweepStore.
+
+        """
+        key = (environment, agent) if sweep_key is None else (environment, agent, sweep_key)
+        if key not in self._experiments:
+            store = self._get_store(environment, agent) if sweep_key is not None else None
+            if store is not None:
+                self._experiments[key] = store.get_logger(sweep_key)
+            else:
+                self._experiments[key] = ExperimentReader(self.get_path('/'.join(key)), self._get_listing(*key))
+
+        return self._experiments[key]
+
+    def get_experiments(self):
+        """
+        Returns:
+            The list of the (environment, agent, sweep_key, reader) tuples of all the experiments of the suite,
+            where the sweep key is None for the experiments not part of a sweep.
+
+        """
+        experiments = list()
+        for environment in self.get_environments():
+            for agent in self.get_agents(environment):
+                if self._is_experiment(environment, agent):
+                    experiments.append((environment, agent, None, self.get_experiment(environment, agent)))
+                else:
+                    for sweep_key in self.get_sweep_keys(environment, agent):
+                        experiments.append((environment, agent, sweep_key,
+                                            self.get_experiment(environment, agent, sweep_key)))
+
+        return experiments
+
+    def _is_experiment(self, *key):
+        listing = self._get_listing(*key)
+        return any(listing.get(filename) is False for filename in _EXPERIMENT_FILES)
+
+    def _get_store(self, environment, agent):
+        if (environment, agent) not in self._stores:
+            has_store = self._get_listing(environment, agent).get('sweep.db') is False
+            self._stores[(environment, agent)] = SweepStore(self.get_path(environment + '/' + agent),
+                                                            read_only=True) if has_store else None
+
+        return self._stores[(environment, agent)]
+
+    def _get_listing(self, *key):
+        if key not in self._listings:
+            self._listings[key] = list_directory(self.get_path('/'.join(key)))
+
+        return self._listings[key]
+
+
+def list_directory(path):
+    """
+    List a directory with a single scan, without accessing its entries.
+
+    Args:
+        path (str): the directory to list.
+
+    Returns:
+        The dictionary with the names of the entries of the directory, and whether each one is a directory.
+        The dictionary is empty if the directory does not exist.
+
+    """
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name: entry.is_dir() for entry in entries}
+    except FileNotFoundError:
+        return dict()
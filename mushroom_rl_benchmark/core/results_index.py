@@ -0,0 +1,397 @@
+import os
+import time
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+
+from mushroom_rl_benchmark.core.reader import ExperimentReader, SuiteReader
+
+
+_METRICS = ['J', 'R', 'V', 'E']
+
+_COLUMNS = [
+    ('environment', 'TEXT NOT NULL'),
+    ('agent', 'TEXT NOT NULL'),
+    ('sweep_key', 'TEXT'),
+    ('seed', 'INTEGER NOT NULL'),
+    ('failed', 'INTEGER NOT NULL DEFAULT 0'),
+    ('n_epochs', 'INTEGER'),
+    *[('{}_{}'.format(kind, metric), 'REAL') for kind in ['best', 'final'] for metric in _METRICS],
+    ('run_time_sec', 'REAL'),
+    ('eval_time_sec', 'REAL'),
+    ('peak_memory_mb', 'REAL'),
+    ('experiment_dir', 'TEXT NOT NULL'),
+    ('run_dir', 'TEXT'),
+    ('agent_path', 'TEXT'),
+    ('indexed_at', 'REAL')
+]
+
+_COLUMN_NAMES = [name for name, _ in _COLUMNS]
+_PATH_COLUMNS = ['experiment_dir', 'run_dir', 'agent_path']
+_KEY_COLUMNS = ['environment', 'agent', 'sweep_key']
+_AGGREGATES = dict(mean='AVG', min='MIN', max='MAX', median=None)
+
+
+class ResultsIndex:
+    """
+    Class maintaining an SQLite index of the runs of a benchmark suite. Each run is recorded with its
+    environment, agent and sweep key, the best and final value of each metric, its timings and the location
+    of its files, so that the results of a suite can be filtered and ranked without loading the metrics of
+    the epochs. The paths are stored relative to the directory of the index, which can be moved with the
+    results.
+
+    """
+    def __init__(self, path):
+        """
+        Constructor.
+
+        Args:
+            path (str): path of the database file of the index, created if it does not exist.
+
+        """
+        self._path = Path(path)
+        self._root = self._path.parent
+        self._root.mkdir(parents=True, exist_ok=True)
+
+        # Several processes, e.g. the aggregation jobs of SLURM, may update the same index
+        self._connection = sqlite3.connect(str(self._path), timeout=60.)
+        self._connection.row_factory = sqlite3.Row
+
+        columns = ', '.join('{} {}'.format(name, definition) for name, definition in _COLUMNS)
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS runs ({}, UNIQUE(experiment_dir, seed))'.format(columns))
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS runs_key ON runs (environment, agent, sweep_key)')
+
+    @property
+    def path(self):
+        """
+        Returns:
+            The path of the database file of the index.
+
+        """
+        return self._path
+
+    def add_run(self, result, experiment_dir, environment, agent, sweep_key=None):
+        """
+        Record a completed run in the index, replacing the previous record of the same run.
+
+        Args:
+            result (dict): the result of the run, or the summary of a run saved in its run directory, with
+                the metrics of the epochs loaded;
+            experiment_dir (str): the log directory of the experiment of the run;
+            environment (str): the environment id of the experiment;
+            agent (str): the agent name of the experiment;
+            sweep_key (str, None): the sweep key of the experiment, if it is part of a sweep.
+
+        """
+        record = dict(
+            environment=environment,
+            agent=agent,
+            sweep_key=sweep_key,
+            seed=int(result['seed']),
+            n_epochs=_get_n_epochs(result.get('epochs')),
+            run_time_sec=result.get('run_time_sec'),
+            eval_time_sec=result.get('eval_time_sec'),
+            peak_memory_mb=result.get('peak_memory_mb'),
+            experiment_dir=self._relative(experiment_dir),
+            run_dir=self._relative(result.get('run_dir')),
+            agent_path=self._relative(result.get('agent_path'))
+        )
+
+        for metric in _METRICS:
+            record['best_' + metric], record['final_' + metric] = _summarize(result.get(metric))
+
+        self._insert([record])
+
+    def add_run_failure(self, failure, experiment_dir, environment, agent, sweep_key=None):
+        """
+        Record a failed run in the index, replacing the previous record of the same run.
+
+        Args:
+            failure (dict): the failure record of the run;
+            experiment_dir (str): the log directory of the experiment of the run;
+            environment (str): the environment id of the experiment;
+            agent (str): the agent name of the experiment;
+            sweep_key (str, None): the sweep key of the experiment, if it is part of a sweep.
+
+        """
+        self._insert([dict(environment=environment, agent=agent, sweep_key=sweep_key, seed=int(failure['seed']),
+                           failed=1, experiment_dir=self._relative(experiment_dir))])
+
+    def add_experiment(self, logger, environment, agent, sweep_key=None):
+        """
+        Record all the runs saved in the log directory of an experiment, replacing the previous records of
+        the experiment. The timings are available only for the runs saved in their own run directory.
+
+        Args:
+            logger (BenchmarkLogger): the logger of the experiment, or its ExperimentReader;
+            environment (str): the environment id of the experiment;
+            agent (str): the agent name of the experiment;
+            sweep_key (str, None): the sweep key of the experiment, if it is part of a sweep.
+
+        Returns:
+            The number of recorded runs.
+
+        """
+        experiment_dir = logger.get_path()
+
+        if not logger.exists_J():
+            self._insert(list(), replace_experiment=experiment_dir)
+            return 0
+
+        metrics = dict(J=logger.load_J(), R=logger.load_R())
+        if logger.exists_value_function():
+            metrics['V'] = logger.load_V()
+        if logger.exists_policy_entropy():
+            metrics['E'] = logger.load_entropy()
+        epochs = logger.load_epochs() if logger.exists_epochs() else [None] * len(metrics['J'])
+        seeds = logger.load_seeds() if logger.exists_seeds() else list(range(len(metrics['J'])))
+
+        records = list()
+        for i, seed in enumerate(seeds):
+            run_dir = experiment_dir / 'run_{}'.format(seed)
+            run_reader = ExperimentReader(run_dir)
+            run_stats = run_reader.load_stats() if run_reader.exists_stats() else dict()
+            record = dict(
+                environment=environment,
+                agent=agent,
+                sweep_key=sweep_key,
+                seed=int(seed),
+                n_epochs=_get_n_epochs(epochs[i]) if epochs[i] is not None else len(metrics['J'][i]) - 1,
+                run_time_sec=run_stats.get('run_time_sec'),
+                eval_time_sec=run_stats.get('eval_time_sec'),
+                peak_memory_mb=run_stats.get('peak_memory_mb'),
+                experiment_dir=self._relative(experiment_dir),
+                run_dir=self._relative(run_dir) if run_dir.exists() else None,
+                agent_path=self._relative(run_dir / 'best_agent.msh') if run_reader.exists_best_agent() else None
+            )
+            for metric in _METRICS:
+                values = metrics[metric][i] if metric in metrics else None
+                record['best_' + metric], record['final_' + metric] = _summarize(values)
+            records.append(record)
+
+        self._insert(records, replace_experiment=experiment_dir)
+
+        return len(records)
+
+    def add_suite(self, path):
+        """
+        Record all the experiments saved in the log directory of a benchmark suite, e.g. to index the
+        results of a suite executed before the index was maintained, or with SLURM.
+
+        Args:
+            path (str): the log directory of the suite.
+
+        Returns:
+            The number of recorded runs.
+
+        """
+        n_runs = 0
+        for environment, agent, sweep_key, reader in SuiteReader(path).get_experiments():
+            n_runs += self.add_experiment(reader, environment, agent, sweep_key)
+
+        return n_runs
+
+    def get_runs(self, order_by=None, descending=True, limit=None, include_failed=False, where=None,
+                 **filters):
+        """
+        Get the records of the runs.
+
+        Args:
+            order_by (str, None): the column used to sort the runs, e.g. best_J or final_J;
+            descending (bool, True): select to sort the runs in descending order;
+            limit (int, None): the maximum number of runs returned;
+            include_failed (bool, False): select to return also the failed runs;
+            where (str, None): additional SQL condition on the columns of the runs, e.g. 'n_epochs >= 50';
+            **filters: required values of the columns, e.g. environment='Pendulum-v0'. A list of values
+                selects the runs with any of them.
+
+        Returns:
+            The list of the records of the runs, as dictionaries. The paths are absolute.
+
+        """
+        condition, parameters = self._get_condition(include_failed, where, filters)
+        query = 'SELECT * FROM runs' + condition
+        if order_by is not None:
+            query += ' ORDER BY {} {}'.format(_check_column(order_by), 'DESC' if descending else 'ASC')
+        if limit is not None:
+            query += ' LIMIT {:d}'.format(limit)
+
+        return [self._to_record(row) for row in self._connection.execute(query, parameters)]
+
+    def rank(self, metric='final_J', aggregate='mean', descending=True, limit=None, where=None, **filters):
+        """
+        Rank the experiments, i.e. the combinations of environment, agent and sweep key, by a metric
+        aggregated over their runs. The failed runs are not considered.
+
+        Args:
+            metric (str, 'final_J'): the column of the metric, e.g. best_J or final_J;
+            aggregate (str, 'mean'): how the metric is aggregated over the runs [mean|median|min|max];
+            descending (bool, True): select to rank the experiments in descending order of the metric;
+            limit (int, None): the maximum number of experiments returned;
+            where (str, None): additional SQL condition on the columns of the runs;
+            **filters: required values of the columns of the runs, as in get_runs.
+
+        Returns:
+            The list of the experiments, as dictionaries with environment, agent, sweep_key, the aggregated
+            value, its standard deviation over the runs, the number of runs and the experiment directory.
+
+        """
+        return self._rank(metric, aggregate, descending, limit, where, filters, partition=None)
+
+    def top_k(self, k=1, metric='final_J', aggregate='mean', group_by='environment', descending=True, where=None,
+              **filters):
+        """
+        Get the k best experiments of each group, e.g. the best sweep configurations of each environment, or
+        of each agent on each environment.
+
+        Args:
+            k (int, 1): the number of experiments returned for each group;
+            metric (str, 'final_J'): the column of the metric, e.g. best_J or final_J;
+            aggregate (str, 'mean'): how the metric is aggregated over the runs [mean|median|min|max];
+            group_by (str or list, 'environment'): the columns defining the groups, among environment, agent
+                and sweep_key;
+            descending (bool, True): select to take the experiments with the highest value of the metric;
+            where (str, None): additional SQL condition on the columns of the runs;
+            **filters: required values of the columns of the runs, as in get_runs.
+
+        Returns:
+            The list of the experiments, as in rank, sorted by group and rank, with the rank in the group.
+
+        """
+        group_by = [group_by] if isinstance(group_by, str) else list(group_by)
+        for column in group_by:
+            assert column in _KEY_COLUMNS
+
+        experiments = self._rank(metric, aggregate, descending, None, where, filters, partition=group_by)
+
+        return [experiment for experiment in experiments if experiment['rank'] <= k]
+
+    def close(self):
+        """
+        Close the connection to the database.
+
+        """
+        self._connection.close()
+
+    def _rank(self, metric, aggregate, descending, limit, where, filters, partition):
+        metric = _check_column(metric)
+        condition, parameters = self._get_condition(False, where, filters)
+        condition += (' AND ' if condition else ' WHERE ') + '{} IS NOT NULL'.format(metric)
+        order = 'DESC' if descending else 'ASC'
+
+        # The variance of the metric is computed as E[x^2] - E[x]^2, as SQLite has no standard deviation
+        if aggregate == 'median':
+            source = ('(SELECT *, {metric} AS value, '
+                      'ROW_NUMBER() OVER (PARTITION BY experiment_dir ORDER BY {metric}) AS position, '
+                      'COUNT(*) OVER (PARTITION BY experiment_dir) AS n_group, '
+                      'AVG({metric}) OVER (PARTITION BY experiment_dir) AS mean_value, '
+                      'AVG({metric} * {metric}) OVER (PARTITION BY experiment_dir) AS mean_square '
+                      'FROM runs{condition}) '
+                      'WHERE position IN ((n_group + 1) / 2, (n_group + 2) / 2)').format(metric=metric,
+                                                                                        condition=condition)
+            statistics = ('AVG(value) AS value, MAX(mean_square - mean_value * mean_value) AS variance, '
+                          'MAX(n_group) AS n_runs')
+        else:
+            assert aggregate in _AGGREGATES, 'Unknown aggregate {}'.format(aggregate)
+            source = 'runs' + condition
+            statistics = ('{aggregate}({metric}) AS value, '
+                          'AVG({metric} * {metric}) - AVG({metric}) * AVG({metric}) AS variance, '
+                          'COUNT(*) AS n_runs').format(aggregate=_AGGREGATES[aggregate], metric=metric)
+
+        query = ('SELECT environment, agent, sweep_key, {statistics}, experiment_dir FROM {source} '
+                 'GROUP BY experiment_dir').format(statistics=statistics, source=source)
+
+        if partition is not None:
+            query = ('SELECT *, RANK() OVER (PARTITION BY {partition} ORDER BY value {order}) AS rank FROM ({query}) '
+                     'ORDER BY {partition}, rank').format(partition=', '.join(partition), order=order, query=query)
+        else:
+            query += ' ORDER BY value {}'.format(order)
+        if limit is not None:
+            query += ' LIMIT {:d}'.format(limit)
+
+        return [self._to_record(row) for row in self._connection.execute(query, parameters)]
+
+    @staticmethod
+    def _get_condition(include_failed, where, filters):
+        conditions = list()
+        parameters = list()
+
+        if not include_failed:
+            conditions.append('failed = 0')
+
+        for column, value in filters.items():
+            column = _check_column(column)
+            if value is None:
+                conditions.append('{} IS NULL'.format(column))
+            elif isinstance(value, (list, tuple, set)):
+                conditions.append('{} IN ({})'.format(column, ', '.join('?' * len(value))))
+                parameters += list(value)
+            else:
+                conditions.append('{} = ?'.format(column))
+                parameters.append(value)
+
+        if where is not None:
+            conditions.append('({})'.format(where))
+
+        condition = ' WHERE ' + ' AND '.join(conditions) if len(conditions) > 0 else ''
+
+        return condition, parameters
+
+    def _insert(self, records, replace_experiment=None):
+        now = time.time()
+        rows = [[record.get(name, 0 if name == 'failed' else None) for name in _COLUMN_NAMES[:-1]] + [now]
+                for record in records]
+        query = 'INSERT OR REPLACE INTO runs ({}) VALUES ({})'.format(', '.join(_COLUMN_NAMES),
+                                                                      ', '.join('?' * len(_COLUMN_NAMES)))
+        with self._connection:
+            if replace_experiment is not None:
+                self._connection.execute('DELETE FROM runs WHERE experiment_dir = ?',
+                                         (self._relative(replace_experiment),))
+            self._connection.executemany(query, rows)
+
+    def _relative(self, path):
+        if path is None:
+            return None
+
+        return Path(os.path.relpath(Path(path).absolute(), self._root.absolute())).as_posix()
+
+    def _to_record(self, row):
+        record = dict(row)
+        for column in _PATH_COLUMNS:
+            if record.get(column) is not None:
+                record[column] = str(self._root / record[column])
+        if 'failed' in record:
+            record['failed'] = bool(record['failed'])
+        if 'variance' in record:
+            record['std'] = float(np.sqrt(max(record.pop('variance'), 0.)))
+
+        return record
+
+
+def _check_column(column):
+    if column not in _COLUMN_NAMES:
+        raise ValueError('Unknown column {} of the results index'.format(column))
+
+    return column
+
+
+def _summarize(values):
+    if values is None:
+        return None, None
+
+    values = np.asarray(values, dtype=float)
+    if values.size == 0 or np.all(np.isnan(values)):
+        return None, None
+
+    return float(np.nanmax(values)), float(values[~np.isnan(values)][-1])
+
+
+def _get_n_epochs(epochs):
+    if epochs is None or len(epochs) == 0:
+        return None
+
+    return int(np.max(epochs))
@@ -0,0 +1,306 @@
+import os
+import json
+import time
+import types
+import pickle
+import shutil
+import sqlite3
+import hashlib
+import functools
+from pathlib import Path
+
+import numpy as np
+import torch
+import mushroom_rl
+
+from mushroom_rl_benchmark.core.logger import BenchmarkLogger
+from mushroom_rl_benchmark.experiment.run_artifacts import save_run_artifacts, load_run_result
+
+
+# Parameters of a run that do not change its results
+_EXCLUDED_RUN_PARAMS = ['quiet', 'run_dir', 'best_agent_path', 'checkpoint_dir', 'replay_memory_dir',
+                        'checkpoint_frequency', 'max_retries', 'run_timeout']
+
+_ARRAY_KEYS = ['epochs', 'J', 'R', 'V', 'E']
+
+
+class RunCache:
+    """
+    Class implementing a local cache of the results of the runs, addressed by the hash of the full
+    specification of each run: the agent builder with all its parameters, the environment builder, the
+    parameters of the run, the seed and the versions of MushroomRL, of the benchmark package, of numpy and
+    of torch. A run found in the cache is not executed again: its files are linked into the log directory
+    of the experiment, or copied when links are not supported.
+
+    The least recently used runs are evicted when the cache exceeds its size limits.
+
+    """
+    def __init__(self, path=None, max_size_mb=None, max_entries=None):
+        """
+        Constructor.
+
+        Args:
+            path (str, None): the directory of the cache. By default, ~/.cache/mushroom_rl_benchmark/runs;
+            max_size_mb (float, None): the maximum size of the cached runs in megabytes. If None, the size
+                is not limited;
+            max_entries (int, None): the maximum number of cached runs. If None, the number is not limited.
+
+        """
+        self._path = Path.home() / '.cache' / 'mushroom_rl_benchmark' / 'runs' if path is None else Path(path)
+        self._max_size = None if max_size_mb is None else max_size_mb * 1024 ** 2
+        self._max_entries = max_entries
+
+        (self._path / 'entries').mkdir(parents=True, exist_ok=True)
+
+        # Several suites may share the same cache
+        self._connection = sqlite3.connect(str(self._path / 'cache.db'), timeout=60.)
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, summary BLOB NOT NULL, '
+                                     'size INTEGER NOT NULL, created_at REAL NOT NULL, last_used_at REAL NOT NULL)')
+
+        # The limits may be lower than the ones of the previous uses of the cache
+        self.evict()
+
+    @property
+    def path(self):
+        """
+        Returns:
+            The directory of the cache.
+
+        """
+        return self._path
+
+    @staticmethod
+    def get_key(agent_builder, env_builder, run_params):
+        """
+        Compute the key of a run, i.e. the hash of its full specification.
+
+        Args:
+            agent_builder (AgentBuilder): the agent builder of the run;
+            env_builder (EnvironmentBuilder): the environment builder of the run;
+            run_params (dict): the parameters of the run, including the seed.
+
+        Returns:
+            The key of the run, or None if the run cannot be cached, i.e. it has no seed, it is continued
+            by later calls, as the rungs of a pruned sweep, or its specification contains objects that cannot
+            be serialized.
+
+        """
+        if run_params.get('seed') is None or run_params.get('keep_checkpoint', False):
+            return None
+
+        import mushroom_rl_benchmark
+
+        try:
+            specification = dict(
+                agent_builder=_to_specification(agent_builder),
+                env_builder=_to_specification(env_builder),
+                run_params=_to_specification({key: value for key, value in run_params.items()
+                                              if key not in _EXCLUDED_RUN_PARAMS}),
+                versions=dict(mushroom_rl=mushroom_rl.__version__,
+                              mushroom_rl_benchmark=mushroom_rl_benchmark.__version__,
+                              numpy=np.__version__, torch=torch.__version__)
+            )
+        except _UnserializableError:
+            return None
+        data = json.dumps(specification, sort_keys=True, separators=(',', ':'))
+
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def get(self, key, run_dir=None):
+        """
+        Look up a run in the cache.
+
+        Args:
+            key (str): the key of the run;
+            run_dir (str, None): the run directory where the files of the cached run are linked. If None, the
+                metrics of the run are loaded from the cache.
+
+        Returns:
+            None if the run is not in the cache. Otherwise, the summary of the run, as returned by
+            exec_run_to_dir, with its run directory, or the result of the run if no run directory is given.
+
+        """
+        row = self._connection.execute('SELECT summary FROM entries WHERE key = ?', (key,)).fetchone()
+        entry_dir = self._get_entry_dir(key)
+        if row is None or not entry_dir.exists():
+            return None
+
+        with self._connection:
+            self._connection.execute('UPDATE entries SET last_used_at = ? WHERE key = ?', (time.time(), key))
+
+        summary = pickle.loads(row[0])
+        summary['cached'] = True
+
+        if run_dir is None:
+            result = load_run_result(dict(summary, run_dir=str(entry_dir)))
+            del result['run_dir']
+            if (entry_dir / 'best_agent.msh').exists():
+                result['agent_path'] = str(entry_dir / 'best_agent.msh')
+            return result
+
+        _link_tree(entry_dir, Path(run_dir))
+        summary['run_dir'] = str(run_dir)
+        if (Path(run_dir) / 'best_agent.msh').exists():
+            summary['agent_path'] = str(Path(run_dir) / 'best_agent.msh')
+
+        return summary
+
+    def put(self, key, result, compute_policy_entropy):
+        """
+        Add a completed run to the cache, evicting the least recently used runs if the cache exceeds its
+        limits.
+
+        Args:
+            key (str): the key of the run;
+            result (dict): the result of the run, with the metrics of the epochs. If the run is saved in its
+                run directory, its files are linked into the cache;
+            compute_policy_entropy (bool): whether the policy entropy is computed or not.
+
+        """
+        if self._connection.execute('SELECT 1 FROM entries WHERE key = ?', (key,)).fetchone() is not None:
+            return
+
+        # A directory without an entry is left by an interrupted write
+        entry_dir = self._get_entry_dir(key)
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+
+        if 'run_dir' in result:
+            _link_tree(Path(result['run_dir']), entry_dir)
+        else:
+            logger = BenchmarkLogger(log_dir=entry_dir.parent, log_id=entry_dir.name, use_timestamp=False)
+            save_run_artifacts(logger, result, compute_policy_entropy)
+
+        summary = {name: value for name, value in result.items()
+                   if name not in _ARRAY_KEYS + ['agent', 'agent_path', 'run_dir', 'cached']}
+        size = sum(path.stat().st_size for path in entry_dir.rglob('*') if path.is_file())
+
+        now = time.time()
+        with self._connection:
+            self._connection.execute('INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?)',
+                                     (key, pickle.dumps(summary, protocol=pickle.HIGHEST_PROTOCOL), size, now, now))
+
+        self.evict()
+
+    def evict(self):
+        """
+        Evict the least recently used runs until the cache is within its limits.
+
+        Returns:
+            The number of evicted runs.
+
+        """
+        n_entries, size = self._connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+
+        evicted = list()
+        for key, entry_size in self._connection.execute('SELECT key, size FROM entries ORDER BY last_used_at'):
+            if (self._max_entries is None or n_entries <= self._max_entries) and \
+                    (self._max_size is None or size <= self._max_size):
+                break
+            evicted.append(key)
+            n_entries -= 1
+            size -= entry_size
+
+        # The runs linked into log directories are not affected, as their files are hard links
+        with self._connection:
+            self._connection.executemany('DELETE FROM entries WHERE key = ?', [(key,) for key in evicted])
+        for key in evicted:
+            shutil.rmtree(self._get_entry_dir(key), ignore_errors=True)
+
+        return len(evicted)
+
+    def clear(self):
+        """
+        Remove all the runs from the cache.
+
+        """
+        with self._connection:
+            self._connection.execute('DELETE FROM entries')
+        shutil.rmtree(self._path / 'entries', ignore_errors=True)
+        (self._path / 'entries').mkdir(parents=True, exist_ok=True)
+
+    def get_size(self):
+        """
+        Returns:
+            The number of cached runs and their total size in megabytes.
+
+        """
+        n_entries, size = self._connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+
+        return n_entries, size / 1024 ** 2
+
+    def _get_entry_dir(self, key):
+        return self._path / 'entries' / key
+
+
+class _UnserializableError(Exception):
+    pass
+
+
+def _to_specification(obj, visiting=None):
+    # Converts an object to a canonical, json serializable form, that does not depend on the process
+    visiting = set() if visiting is None else visiting
+
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return dict(dtype=str(obj.dtype), shape=list(obj.shape), data=obj.tolist())
+    if isinstance(obj, torch.Tensor):
+        return dict(tensor=_to_specification(obj.detach().cpu().numpy()))
+    if isinstance(obj, (type, types.FunctionType, types.BuiltinFunctionType, types.MethodType)):
+        return '{}.{}'.format(getattr(obj, '__module__', None), getattr(obj, '__qualname__', repr(obj)))
+
+    if id(obj) in visiting:
+        return '<cycle>'
+    visiting.add(id(obj))
+    try:
+        if isinstance(obj, dict):
+            return {str(key): _to_specification(value, visiting) for key, value in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [_to_specification(value, visiting) for value in obj]
+        if isinstance(obj, (set, frozenset)):
+            return sorted([_to_specification(value, visiting) for value in obj], key=repr)
+        if isinstance(obj, functools.partial):
+            return dict(func=_to_specification(obj.func, visiting), args=_to_specification(obj.args, visiting),
+                        keywords=_to_specification(obj.keywords, visiting))
+
+        cls = type(obj)
+        class_name = '{}.{}'.format(cls.__module__, cls.__qualname__)
+        state = dict(vars(obj)) if hasattr(obj, '__dict__') else dict()
+        for slots_cls in cls.__mro__:
+            slots = getattr(slots_cls, '__slots__', ())
+            for slot in [slots] if isinstance(slots, str) else slots:
+                if slot not in ['__dict__', '__weakref__'] and hasattr(obj, slot):
+                    state[slot] = getattr(obj, slot)
+
+        # The objects keeping their state elsewhere, e.g. in C extensions, are identified by their pickle
+        if len(state) == 0:
+            try:
+                data = pickle.dumps(obj, protocol=4)
+            except Exception as e:
+                raise _UnserializableError(class_name) from e
+            return {'class': class_name, 'pickle': hashlib.sha256(data).hexdigest()}
+
+        return {'class': class_name, 'state': _to_specification(state, visiting)}
+    finally:
+        visiting.discard(id(obj))
+
+
+def _link_tree(source, destination):
+    for source_path in source.rglob('*'):
+        destination_path = destination / source_path.relative_to(source)
+        if source_path.is_dir():
+            destination_path.mkdir(parents=True, exist_ok=True)
+            continue
+
+        destination_path.parent.mkdir(parents=True, exist_ok=True)
+        if destination_path.exists():
+            destination_path.unlink()
+        try:
+            os.link(source_path, destination_path)
+        except OSError:
+            shutil.copy2(source_path, destination_path)
+    destination.mkdir(parents=True, exist_ok=True)
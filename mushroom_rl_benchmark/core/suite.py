@@ -1,8 +1,22 @@
+import multiprocessing
+from collections import deque
+
+import numpy as np
+from joblib import delayed
+
 import mushroom_rl_benchmark.builders
 from mushroom_rl_benchmark.builders import EnvironmentBuilder
+from mushroom_rl_benchmark.core.asha import ASHAScheduler
 from mushroom_rl_benchmark.core.experiment import BenchmarkExperiment
 from mushroom_rl_benchmark.core.logger import BenchmarkLogger
+from mushroom_rl_benchmark.core.results_index import ResultsIndex
+from mushroom_rl_benchmark.core.run_cache import RunCache
 from mushroom_rl_benchmark.core.suite_visualizer import BenchmarkSuiteVisualizer
+from mushroom_rl_benchmark.core.sweep_store import SweepStore
+from mushroom_rl_benchmark.experiment import exec_run_to_dir, WorkerPool, ResourcePolicy
+from mushroom_rl_benchmark.experiment.supervisor import exec_supervised_run
+from mushroom_rl_benchmark.experiment.memory import MemoryAdmission, estimate_run_memory
+from mushroom_rl_benchmark.utils.tqdm_parallel import TqdmParallel
 
 
 class BenchmarkSuite:
@@ -10,7 +24,8 @@ class BenchmarkSuite:
     Class to orchestrate the execution of multiple experiments.
 
     """
-    def __init__(self, log_dir=None, log_id=None, use_timestamp=True, parallel=None, slurm=None):
+    def __init__(self, log_dir=None, log_id=None, use_timestamp=True, parallel=None, slurm=None, pruning=None,
+                 results_index=True, consolidate_sweeps=False, run_cache=None):
         """
         Constructor.
 
@@ -20,15 +35,33 @@ class BenchmarkSuite:
             use_timestamp (bool): select if a timestamp should be appended to the log id
             parallel (dict, None): parameters that are passed to the run_parallel method of the experiment
             slurm (dict, None): parameters that are passed to the run_slurm method of the experiment
+            pruning (dict, None): parameters of the ASHAScheduler used to prune the configurations of the
+                sweeps (min_fraction, reduction_factor). If None, all the configurations are fully executed
+            results_index (bool, True): select to record each completed run in the results index of the suite,
+                the results.db file in the log directory
+            consolidate_sweeps (bool, False): select to store all the configurations of each sweep in a single
+                SweepStore, instead of a log directory per configuration. Not supported with slurm
+            run_cache (dict, None): parameters of the RunCache (path, max_size_mb, max_entries) used to skip the
+                runs already executed with the same specification, by this or other suites. If None, all the
+                runs are executed. The cache is not used with slurm
         
         """
         self._experiment_structure = dict()
         self._environment_dict = dict()
         self._parameters_dict = dict()
+        self._sweep_dict = dict()
         self._parallel = parallel
         self._slurm = slurm
+        self._pruning = pruning
+        self._worker_pool = None
+        self._memory_admission = None
+        self._builder_ids = dict()
         self._is_sweep = None
+        self._consolidate_sweeps = consolidate_sweeps
+        self._sweep_stores = dict()
         self.logger = BenchmarkLogger(log_dir=log_dir, log_id=log_id, use_timestamp=use_timestamp)
+        self.results_index = ResultsIndex(self.logger.get_path('results.db')) if results_index else None
+        self.run_cache = RunCache(**run_cache) if run_cache is not None else None
 
     def add_experiments(self, environment_name, environment_builder_params, agent_names_list,
                         agent_builders_params, **run_params):
@@ -95,6 +128,7 @@ class BenchmarkSuite:
         )
 
         self._experiment_structure[environment_name] = dict()
+        self._sweep_dict[environment_name] = dict()
 
     def add_agent(self, environment_name, agent_name, agent_params):
         """
@@ -154,6 +188,7 @@ class BenchmarkSuite:
                 exp = self._create_experiment_sweep(environment_name, environment_builder_params,
                                                     agent_name, agent_params, sweep_key, sweep_params)
                 self._experiment_structure[environment_name][sweep_name] = exp
+                self._sweep_dict[environment_name].setdefault(agent_name, list()).append(sweep_name)
             except AttributeError as e:
                 self.logger.error(
                     f'Unable to create sweep for environment {environment_name}, agent {agent_name} '
@@ -163,15 +198,46 @@ class BenchmarkSuite:
 
     def run(self, exec_type='sequential'):
         """
-        Run all experiments in the suite.
+        Run all experiments in the suite. With the parallel execution, the runs of all the experiments are
+        executed by a single pool of workers, which is kept alive until the suite is closed or the interpreter
+        exits.
 
         """
+        if exec_type == 'slurm' and len(self._sweep_stores) > 0:
+            raise ValueError('The consolidated sweeps cannot be executed with slurm')
+
+        if self._is_sweep and self._pruning is not None:
+            if exec_type == 'slurm':
+                self.logger.warning('Pruning is not supported with slurm, the sweeps are fully executed')
+            else:
+                self._run_pruned_sweeps(exec_type)
+                return
+
+        if exec_type == 'parallel':
+            experiments = list()
+            for environment, agents in self._experiment_structure.items():
+                run_params = self._environment_dict[environment]['run_params']
+                for agent, exp in agents.items():
+                    self.logger.info(f'Starting Experiment for {agent} on {environment}')
+                    experiments.append((exp, run_params))
+            self._run_pool(experiments)
+            return
+
         for environment, agents in self._experiment_structure.items():
             for agent, exp in agents.items():
                 self.logger.info(f'Starting Experiment for {agent} on {environment}')
                 run_params = self._environment_dict[environment]['run_params']
                 exp.run(exec_type=exec_type, parallel=self._parallel, slurm=self._slurm, **run_params)
 
+    def close(self):
+        """
+        Stop the worker processes used by the parallel execution.
+
+        """
+        if self._worker_pool is not None:
+            self._worker_pool.close()
+            self._worker_pool = None
+
     def print_experiments(self):
         """
         Print the experiments in the suite.
@@ -232,17 +298,31 @@ class BenchmarkSuite:
                                  sweep_params):
         environment_id = self._get_env_id(environment)
 
-        logger = BenchmarkLogger(
-            log_dir=self.logger.get_path(),
-            log_id=f'{environment_id}/{agent_name}/{sweep_key}',
-            use_timestamp=False
-        )
+        if self._consolidate_sweeps:
+            logger = self._get_sweep_store(environment_id, agent_name).get_logger(sweep_key)
+        else:
+            logger = BenchmarkLogger(
+                log_dir=self.logger.get_path(),
+                log_id=f'{environment_id}/{agent_name}/{sweep_key}',
+                use_timestamp=False
+            )
 
         agent_sweep_params = agent_builder_params.copy()
         agent_sweep_params.update(sweep_params)
 
-        return self._create_experiment_base(agent_sweep_params, agent_name, environment,
-                                            environment_id, environment_params, logger, sweep_key)
+        experiment = self._create_experiment_base(agent_sweep_params, agent_name, environment,
+                                                  environment_id, environment_params, logger, sweep_key)
+        if self._consolidate_sweeps:
+            logger.save_parameters(self._parameters_dict[environment_id][agent_name][sweep_key])
+
+        return experiment
+
+    def _get_sweep_store(self, environment_id, agent_name):
+        if (environment_id, agent_name) not in self._sweep_stores:
+            self._sweep_stores[(environment_id, agent_name)] = SweepStore(
+                self.logger.get_path(f'{environment_id}/{agent_name}'))
+
+        return self._sweep_stores[(environment_id, agent_name)]
 
     def _create_experiment_base(self, agent_builder_params, agent_name, environment, environment_id,
                                 environment_params, logger, sweep_key=None):
@@ -250,7 +330,12 @@ class BenchmarkSuite:
         agent_builder, agent_params = builder.default(get_default_dict=True, **agent_builder_params)
         env_builder = EnvironmentBuilder(environment, environment_params)
         self._add_parameters(agent_name, sweep_key, environment_id, agent_params)
-        return BenchmarkExperiment(agent_builder, env_builder, logger)
+        experiment = BenchmarkExperiment(agent_builder, env_builder, logger)
+        if self.results_index is not None:
+            experiment.set_results_index(self.results_index, environment_id, agent_name, sweep_key)
+        if self.run_cache is not None:
+            experiment.set_run_cache(self.run_cache)
+        return experiment
 
     def _add_parameters(self, agent_name, sweep_key, environment_id, params):
 
@@ -269,6 +354,169 @@ class BenchmarkSuite:
                 self._parameters_dict[environment_id][agent_name] = dict()
             self._parameters_dict[environment_id][agent_name][sweep_key] = params
 
+    def _run_pool(self, experiments, on_completed=None):
+        parallel_params = dict() if self._parallel is None else dict(self._parallel)
+        threading = parallel_params.pop('threading', False)
+        save_plot = parallel_params.pop('save_plot', True)
+        max_concurrent_runs = parallel_params.pop('max_concurrent_runs', -1)
+        resources = parallel_params.pop('resources', None)
+        memory = parallel_params.pop('memory', None)
+
+        used_cores = max_concurrent_runs if max_concurrent_runs > 0 else multiprocessing.cpu_count()
+        resource_policy = ResourcePolicy(used_cores, **(dict() if resources is None else resources))
+
+        runs = list()
+        pending = dict()
+
+        # The experiments returned by on_completed are started while the runs of the others are executed
+        def start_experiments(new_experiments):
+            new_experiments = deque(new_experiments)
+            while len(new_experiments) > 0:
+                exp, run_params = new_experiments.popleft()
+                exp_runs = exp.start_parallel(threading=threading, max_concurrent_runs=max_concurrent_runs,
+                                              resources=resource_policy.get_config(), **parallel_params,
+                                              **run_params)
+                if len(exp_runs) == 0:
+                    exp.stop_parallel(save_plot)
+                    if on_completed is not None:
+                        new_experiments.extend(on_completed(exp))
+                else:
+                    pending[exp] = len(exp_runs)
+                    runs.extend((exp, run) for run in exp_runs)
+
+        start_experiments(experiments)
+
+        if threading:
+            resource_policy.apply()
+            results = self._run_threads(runs, max_concurrent_runs)
+        else:
+            results = self._run_workers(runs, max_concurrent_runs, resource_policy, memory)
+
+        # Each experiment is completed as soon as its last run is saved
+        for i, result in results:
+            exp = runs[i][0]
+            exp.save_run_result(result)
+            pending[exp] -= 1
+            if pending[exp] == 0:
+                exp.stop_parallel(save_plot)
+                if on_completed is not None:
+                    start_experiments(on_completed(exp))
+
+    def _run_workers(self, runs, max_concurrent_runs, resource_policy, memory):
+        if self._worker_pool is None:
+            self._worker_pool = WorkerPool(max_concurrent_runs, resources=resource_policy)
+            self._memory_admission = MemoryAdmission(**(dict() if memory is None else memory))
+            self._builder_ids = dict()
+        self.logger.info(f'Running {len(runs)} runs on {self._worker_pool.n_workers} workers')
+
+        # The runs added to the suite runs while the results are consumed are passed on to the pool
+        pool_runs = list()
+        self._add_pool_runs(runs, pool_runs)
+        for i, result in self._worker_pool.run(pool_runs, admission=self._memory_admission):
+            yield i, result
+            self._add_pool_runs(runs, pool_runs)
+
+    def _add_pool_runs(self, runs, pool_runs):
+        for exp, run in runs[len(pool_runs):]:
+            if exp not in self._builder_ids:
+                builder_id = self._worker_pool.register(exp.agent_builder, exp.env_builder)
+                self._builder_ids[exp] = builder_id
+
+                # The peak memory measured by previous runs of the experiment is preferred to the estimate
+                peak_memory = exp.stats.get('peak_memory_mb')
+                if peak_memory is None:
+                    peak_memory = estimate_run_memory(exp.agent_builder, exp.env_builder)
+                self._memory_admission.set_estimate(builder_id, peak_memory)
+
+            pool_runs.append((self._builder_ids[exp], run))
+
+    def _run_threads(self, runs, max_concurrent_runs):
+        used_cores = max_concurrent_runs if max_concurrent_runs > 0 else multiprocessing.cpu_count()
+        self.logger.info(f'Running {len(runs)} runs on {min(used_cores, max(len(runs), 1))} threads')
+
+        # The runs added while the results are consumed are executed by the next batch of threads
+        n_executed = 0
+        while n_executed < len(runs):
+            batch = range(n_executed, len(runs))
+            n_executed = len(runs)
+            with TqdmParallel(return_as='generator_unordered', n_jobs=max_concurrent_runs,
+                              prefer='threads') as parallel:
+                yield from parallel((delayed(_exec_suite_run)(i, runs[i][0].agent_builder.copy(),
+                                                              runs[i][0].env_builder.copy(), **runs[i][1])
+                                     for i in batch), total=len(batch))
+
+    def _run_pruned_sweeps(self, exec_type):
+        for environment, sweeps in self._experiment_structure.items():
+            run_params = self._environment_dict[environment]['run_params']
+
+            for agent, configurations in self._sweep_dict[environment].items():
+                self.logger.info(f'Starting pruned sweep for {agent} on {environment}')
+                scheduler = ASHAScheduler(configurations, run_params['n_epochs'], **self._pruning)
+                self.logger.info(f'Epochs of the rungs: {scheduler.rungs}')
+
+                if exec_type == 'parallel':
+                    self._run_pruned_sweep_pool(sweeps, scheduler, run_params)
+                else:
+                    job = scheduler.next_job()
+                    while job is not None:
+                        sweep_name, rung = job
+                        exp = sweeps[sweep_name]
+                        exp.reset()
+                        exp.run(exec_type=exec_type, **self._get_rung_params(scheduler.rungs, rung, run_params))
+                        self._report_rung(scheduler, sweep_name, rung, exp)
+                        job = scheduler.next_job()
+
+                for sweep_name, decision in scheduler.get_decisions().items():
+                    exp = sweeps[sweep_name]
+                    exp.set_and_save_stats(pruned=decision['pruned'])
+                    if decision['pruned']:
+                        exp.logger.remove_checkpoints()
+
+    def _run_pruned_sweep_pool(self, sweeps, scheduler, run_params):
+        # The jobs are started as soon as the scheduler provides them, and reported as soon as their runs are
+        # completed, so that the workers are not idle while the slowest job of a rung is running
+        jobs = dict()
+
+        def start_jobs():
+            experiments = list()
+            job = scheduler.next_job()
+            while job is not None:
+                sweep_name, rung = job
+                exp = sweeps[sweep_name]
+                exp.reset()
+                jobs[exp] = job
+                experiments.append((exp, self._get_rung_params(scheduler.rungs, rung, run_params)))
+                job = scheduler.next_job()
+
+            return experiments
+
+        def complete_job(exp):
+            sweep_name, rung = jobs.pop(exp)
+            self._report_rung(scheduler, sweep_name, rung, exp)
+
+            return start_jobs()
+
+        self._run_pool(start_jobs(), on_completed=complete_job)
+
+    @staticmethod
+    def _get_rung_params(rungs, rung, run_params):
+        is_last_rung = rung == len(rungs) - 1
+
+        # Each rung continues the runs of the previous one from their checkpoint
+        rung_params = dict(run_params)
+        rung_params['n_epochs'] = rungs[rung]
+        rung_params['keep_checkpoint'] = not is_last_rung
+        if rung_params.get('checkpoint_frequency', 0) <= 0:
+            rung_params['checkpoint_frequency'] = rungs[-1]
+
+        return rung_params
+
+    def _report_rung(self, scheduler, sweep_name, rung, exp):
+        score = float(np.mean([J[-1] for J in exp.J]))
+        exp.set_and_save_stats(pruning_rung=rung, pruning_epochs=scheduler.rungs[rung], pruning_score=score)
+        self.logger.info(f'{sweep_name} completed {scheduler.rungs[rung]} epochs with score {score}')
+        scheduler.report(sweep_name, rung, score)
+
     @staticmethod
     def _get_env_id(environment):
         separator = '.'
@@ -278,3 +526,7 @@ class BenchmarkSuite:
             return '_'.join(splitted[1:])
         else:
             return environment
+
+
+def _exec_suite_run(run_id, agent_builder, env_builder, **run_params):
+    return run_id, exec_supervised_run(exec_run_to_dir, agent_builder, env_builder, **run_params)
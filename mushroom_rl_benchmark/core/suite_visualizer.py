@@ -5,8 +5,8 @@ import matplotlib.pyplot as plt
 
 from itertools import cycle
 
-from mushroom_rl.utils.plot import plot_mean_conf
-from mushroom_rl_benchmark.core.logger import BenchmarkLogger
+from mushroom_rl_benchmark.core.reader import SuiteReader
+from mushroom_rl_benchmark.utils.plot import plot_mean_conf
 import mushroom_rl_benchmark.utils.metrics as metrics
 
 import warnings
@@ -25,7 +25,8 @@ class BenchmarkSuiteVisualizer(object):
         Constructor.
 
         Args:
-            logger (BenchmarkLogger): logger to be used;
+            logger (BenchmarkLogger): logger to be used. A SuiteReader can be used instead to only get and show
+                the reports, without writing to the log directory;
             is_sweep (bool): whether the benchmark is a parameter sweep.
             color_cycle (dict, None): dictionary with colors to be used for each algorithm;
             y_limit (dict, None): dictionary with environment specific plot limits.
@@ -50,47 +51,54 @@ class BenchmarkSuiteVisualizer(object):
         else:
             self._load_benchmark(path)
 
+        self._logger_dict = {env: loggers for env, loggers in self._logger_dict.items() if len(loggers) > 0}
+
     def _load_benchmark(self, path):
+        # The experiments are only read, without creating files in their log directories
+        reader = SuiteReader(path)
         alg_count = 0
-        for env_dir in path.iterdir():
-            if env_dir.is_dir() and env_dir.name not in ['plots', 'params']:
-                env = env_dir.name
-                self._logger_dict[env] = dict()
+        for env in reader.get_environments():
+            self._logger_dict[env] = dict()
 
-                for alg_dir in env_dir.iterdir():
-                    if alg_dir.is_dir():
-                        alg = alg_dir.name
+            for alg in reader.get_agents(env):
+                # The experiments without successful runs are not plotted
+                experiment = reader.get_experiment(env, alg)
+                if not experiment.exists_J():
+                    continue
 
-                        if alg not in self._color_cycle:
-                            self._color_cycle[alg] = 'C' + str(alg_count)
+                if alg not in self._color_cycle:
+                    self._color_cycle[alg] = 'C' + str(alg_count)
 
-                        alg_logger = BenchmarkLogger.from_path(alg_dir)
-                        self._logger_dict[env][alg] = alg_logger
-                        alg_count += 1
+                self._logger_dict[env][alg] = experiment
+                alg_count += 1
 
     def _load_sweep(self, path):
+        reader = SuiteReader(path)
         alg_count = 0
-        for env_dir in path.iterdir():
-            if env_dir.is_dir() and env_dir.name not in ['plots', 'params']:
-                env = env_dir.name
-                self._logger_dict[env] = dict()
+        for env in reader.get_environments():
+            self._logger_dict[env] = dict()
 
-                for alg_dir in env_dir.iterdir():
-                    if alg_dir.is_dir():
-                        alg = alg_dir.name
+            for alg in reader.get_agents(env):
+                line_cycler = cycle(self._lines)
+                for sweep_key in reader.get_sweep_keys(env, alg):
+                    experiment = reader.get_experiment(env, alg, sweep_key)
+                    if not experiment.exists_J():
+                        continue
+
+                    sweep_name = alg + '_' + sweep_key
 
-                        line_cycler = cycle(self._lines)
-                        for sweep_dir in alg_dir.iterdir():
-                            if sweep_dir.is_dir():
-                                sweep_name = alg + '_' + sweep_dir.name
+                    if sweep_name not in self._color_cycle:
+                        self._color_cycle[sweep_name] = 'C' + str(alg_count)
+                        self._line_cycle[sweep_name] = next(line_cycler)
 
-                                if sweep_name not in self._color_cycle:
-                                    self._color_cycle[sweep_name] = 'C' + str(alg_count)
-                                    self._line_cycle[sweep_name] = next(line_cycler)
+                    self._logger_dict[env][sweep_name] = experiment
+                alg_count += 1
 
-                                sweep_logger = BenchmarkLogger.from_path(sweep_dir)
-                                self._logger_dict[env][sweep_name] = sweep_logger
-                        alg_count += 1
+    @staticmethod
+    def _get_label(alg, logger):
+        if logger.exists_stats() and logger.load_stats().get('pruned', False):
+            return alg + ' (pruned)'
+        return alg
 
     def _legend(self, ax, env, data_type):
         if env in self._legend_dict and data_type in self._legend_dict[env]:
@@ -103,7 +111,7 @@ class BenchmarkSuiteVisualizer(object):
         loc = legend_dict.pop('loc', 'center')
         default_bbox = (0.5, -0.25) if data_type == 'entropy' else (0.5, -0.25)
         bbox_to_anchor = legend_dict.pop('bbox_to_anchor', default_bbox)
-        ncol = legend_dict.pop('ncol', len(self._logger_dict[env]) // 2)
+        ncol = legend_dict.pop('ncol', max(len(self._logger_dict[env]) // 2, 1))
         ax.legend(fontsize=fontsize, ncol=ncol, frameon=frameon,
                   loc=loc, bbox_to_anchor=bbox_to_anchor, **legend_dict)
 
@@ -155,8 +163,9 @@ class BenchmarkSuiteVisualizer(object):
                 data = getattr(logger, 'load_' + data_type)()
 
                 if data is not None:
-                    plot_mean_conf(data, ax, color=color, line=line, label=alg)
-                    max_epochs = max(max_epochs, len(data[0]))
+                    epochs = logger.load_epochs()[0]
+                    plot_mean_conf(data, ax, x=epochs, color=color, line=line, label=self._get_label(alg, logger))
+                    max_epochs = max(max_epochs, epochs[-1] + 1)
 
         if env in self._y_limit and data_type in self._y_limit[env]:
             ax.set_ylim(**self._y_limit[env][data_type])
@@ -205,7 +214,7 @@ class BenchmarkSuiteVisualizer(object):
                 data = getattr(logger, f'load_{data_type}')()
                 if data is not None:
                     boxplot_data.append(metric_function(data))
-                    boxplot_labels.append(alg)
+                    boxplot_labels.append(self._get_label(alg, logger))
 
         if len(boxplot_data) == 0:
             return None
@@ -0,0 +1,787 @@
+import pickle
+import shutil
+import sqlite3
+import hashlib
+import yaml
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+
+from mushroom_rl.core.logger import ConsoleLogger
+
+from mushroom_rl_benchmark.core.logger import _to_columnar
+from mushroom_rl_benchmark.experiment.snapshot import save_agent_snapshot, load_agent_snapshot
+from mushroom_rl_benchmark.utils import dictionary_to_primitive
+
+
+_CONTENT_ADDRESSED_FIELDS = ['agent_builder', 'environment_builder', 'config', 'best_agent']
+
+_SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS objects (hash TEXT PRIMARY KEY, data BLOB NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS configurations (sweep_key TEXT PRIMARY KEY, parameters TEXT, agent_builder TEXT, '
+    'environment_builder TEXT, config TEXT, stats TEXT, best_agent TEXT)',
+    'CREATE TABLE IF NOT EXISTS runs (sweep_key TEXT NOT NULL, metric TEXT NOT NULL, position INTEGER NOT NULL, '
+    'data BLOB NOT NULL, PRIMARY KEY (sweep_key, metric, position))'
+]
+
+
+class SweepStore:
+    """
+    Class storing all the configurations of a parameter sweep in a single SQLite container, sweep.db, instead
+    of a log directory per configuration. The builders, the environment configurations, the run
+    configurations and the best agents are stored once per distinct content, addressed by their hash, the
+    parameters and the statistics of each configuration are rows of a table, and the metrics of each run are
+    rows of a shared table. The console messages of all the configurations are written to a single log file.
+
+    A configuration is accessed through its SweepLogger, which has the same interface of the
+    BenchmarkLogger, so that it can be used by a BenchmarkExperiment, e.g.
+    BenchmarkExperiment.from_logger(SweepStore(path).get_logger(sweep_key)).
+
+    """
+    def __init__(self, path, read_only=False):
+        """
+        Constructor.
+
+        Args:
+            path (str): the directory of the sweep;
+            read_only (bool, False): select to open the store only for reading. A read-only store creates no
+                file, and can be used on result trees being written by other processes.
+
+        """
+        self._path = Path(path)
+        self._read_only = read_only
+        self._console = None
+
+        db_path = self._path / 'sweep.db'
+        if read_only:
+            self._connection = sqlite3.connect('{}?mode=ro'.format(db_path.absolute().as_uri()), uri=True)
+        else:
+            self._path.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(db_path), timeout=60.)
+            with self._connection:
+                for statement in _SCHEMA:
+                    self._connection.execute(statement)
+
+    @property
+    def path(self):
+        """
+        Returns:
+            The directory of the sweep.
+
+        """
+        return self._path
+
+    @property
+    def console(self):
+        """
+        Returns:
+            The console logger shared by all the configurations, writing to the console.log file of the sweep.
+
+        """
+        if self._console is None:
+            log_dir = None if self._read_only else self._path
+            self._console = ConsoleLogger(str(self._path), log_dir, log_file_name='console')
+
+        return self._console
+
+    @staticmethod
+    def exists(path):
+        """
+        Args:
+            path (str): a directory.
+
+        Returns:
+            True if the directory contains a sweep store, False otherwise.
+
+        """
+        return (Path(path) / 'sweep.db').exists()
+
+    def get_logger(self, sweep_key):
+        """
+        Args:
+            sweep_key (str): the sweep key of the configuration.
+
+        Returns:
+            The logger of the configuration.
+
+        """
+        if not self._read_only:
+            with self._connection:
+                self._connection.execute('INSERT OR IGNORE INTO configurations (sweep_key) VALUES (?)', (sweep_key,))
+
+        return SweepLogger(self, sweep_key)
+
+    def get_sweep_keys(self):
+        """
+        Returns:
+            The sweep keys of the configurations in the store.
+
+        """
+        return [row[0] for row in self._connection.execute('SELECT sweep_key FROM configurations ORDER BY rowid')]
+
+    def save_runs(self, sweep_key, metric, runs):
+        """
+        Save the values of a metric for the runs of a configuration, replacing the saved ones.
+
+        Args:
+            sweep_key (str): the sweep key of the configuration;
+            metric (str): the name of the metric;
+            runs (list): the values of the metric for each run.
+
+        """
+        with self._connection:
+            self._connection.execute('DELETE FROM runs WHERE sweep_key = ? AND metric = ?', (sweep_key, metric))
+            self._insert_runs(sweep_key, metric, runs, 0)
+
+    def append_runs(self, sweep_key, metric, runs):
+        """
+        Append the values of a metric for new runs of a configuration to the saved ones.
+
+        Args:
+            sweep_key (str): the sweep key of the configuration;
+            metric (str): the name of the metric;
+            runs (list): the values of the metric for each new run.
+
+        """
+        with self._connection:
+            n_runs = self._connection.execute('SELECT COUNT(*) FROM runs WHERE sweep_key = ? AND metric = ?',
+                                              (sweep_key, metric)).fetchone()[0]
+            self._insert_runs(sweep_key, metric, runs, n_runs)
+
+    def load_runs(self, sweep_key, metric):
+        """
+        Args:
+            sweep_key (str): the sweep key of the configuration;
+            metric (str): the name of the metric.
+
+        Returns:
+            The values of the metric for each run of the configuration, in the order they were saved.
+
+        """
+        rows = self._connection.execute('SELECT data FROM runs WHERE sweep_key = ? AND metric = ? ORDER BY position',
+                                        (sweep_key, metric))
+        return [np.load(BytesIO(row[0]), allow_pickle=False) for row in rows]
+
+    def exists_runs(self, sweep_key, metric):
+        """
+        Args:
+            sweep_key (str): the sweep key of the configuration;
+            metric (str): the name of the metric.
+
+        Returns:
+            True if the values of the metric are saved for the configuration, False otherwise.
+
+        """
+        row = self._connection.execute('SELECT 1 FROM runs WHERE sweep_key = ? AND metric = ? LIMIT 1',
+                                       (sweep_key, metric)).fetchone()
+        return row is not None
+
+    def save_field(self, sweep_key, field, value, content_addressed=False):
+        """
+        Save a field of a configuration.
+
+        Args:
+            sweep_key (str): the sweep key of the configuration;
+            field (str): the name of the field, i.e. parameters, agent_builder, environment_builder, config,
+                stats or best_agent;
+            value: the serialized value of the field, as text or bytes;
+            content_addressed (bool, False): select to store the value once per distinct content, and to save
+                its hash in the field.
+
+        """
+        previous_hash = self.load_field(sweep_key, field) if content_addressed else None
+        if content_addressed:
+            value = self._put_object(value)
+
+        with self._connection:
+            self._connection.execute('UPDATE configurations SET {} = ? WHERE sweep_key = ?'.format(field),
+                                     (value, sweep_key))
+
+            # The replaced objects, e.g. the previous best agents, are removed once no configuration uses them
+            if previous_hash is not None and previous_hash != value:
+                references = ' OR '.join('{} = ?'.format(name) for name in _CONTENT_ADDRESSED_FIELDS)
+                self._connection.execute(
+                    'DELETE FROM objects WHERE hash = ? AND NOT EXISTS (SELECT 1 FROM configurations WHERE {})'.format(
+                        references), [previous_hash] * (len(_CONTENT_ADDRESSED_FIELDS) + 1))
+
+    def load_field(self, sweep_key, field, content_addressed=False):
+        """
+        Args:
+            sweep_key (str): the sweep key of the configuration;
+            field (str): the name of the field;
+            content_addressed (bool, False): whether the value of the field is content addressed.
+
+        Returns:
+            The serialized value of the field, or None if it is not saved.
+
+        """
+        row = self._connection.execute('SELECT {} FROM configurations WHERE sweep_key = ?'.format(field),
+                                       (sweep_key,)).fetchone()
+        value = None if row is None else row[0]
+        if content_addressed and value is not None:
+            value = self._connection.execute('SELECT data FROM objects WHERE hash = ?', (value,)).fetchone()[0]
+
+        return value
+
+    def close(self):
+        """
+        Close the connection to the container.
+
+        """
+        self._connection.close()
+
+    def _insert_runs(self, sweep_key, metric, runs, start):
+        rows = list()
+        for i, run in enumerate(runs):
+            buffer = BytesIO()
+            np.save(buffer, np.asarray(run), allow_pickle=False)
+            rows.append((sweep_key, metric, start + i, buffer.getvalue()))
+
+        self._connection.executemany('INSERT INTO runs VALUES (?, ?, ?, ?)', rows)
+
+    def _put_object(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        object_hash = hashlib.sha256(data).hexdigest()
+        with self._connection:
+            self._connection.execute('INSERT OR IGNORE INTO objects VALUES (?, ?)', (object_hash, data))
+
+        return object_hash
+
+
+class SweepLogger:
+    """
+    Class to handle the interactions of an experiment with a configuration of a SweepStore. It has the same
+    interface of the BenchmarkLogger, storing the data of the configuration in the container of the sweep.
+    The only files written per configuration are the checkpoints of the runs, removed when the runs are
+    completed, and the figures, written to the plots directory of the sweep.
+
+    """
+    def __init__(self, store, sweep_key):
+        """
+        Constructor.
+
+        Args:
+            store (SweepStore): the store of the sweep;
+            sweep_key (str): the sweep key of the configuration.
+
+        """
+        self._store = store
+        self._sweep_key = sweep_key
+
+    def get_log_dir(self):
+        """
+        Returns:
+            The directory of the sweep.
+
+        """
+        return str(self._store.path)
+
+    def get_log_id(self):
+        """
+        Returns:
+            The sweep key of the configuration.
+
+        """
+        return self._sweep_key
+
+    def get_path(self, filename=''):
+        """
+        Get the path identifying the configuration, or a file of the configuration, in the sweep directory.
+        No directory is created for the configuration.
+
+        Args:
+            filename (str, ''): the name of the file.
+
+        Returns:
+            The path of the configuration in the sweep directory.
+
+        """
+        return self._store.path / self._sweep_key / filename
+
+    def get_run_path(self, seed):
+        """
+        The runs of a configuration are saved in the container of the sweep, and not in run directories.
+
+        Args:
+            seed (int): the seed of the run.
+
+        Returns:
+            None.
+
+        """
+        return None
+
+    def get_figure_path(self, filename='', subfolder=None):
+        """
+        Get the path of the figures of the given file, in the plots directory of the sweep.
+
+        Args:
+            filename (str, ''): the name of the file;
+            subfolder (None): the name of a subfolder to add.
+
+        Returns:
+            The complete path of the figure.
+
+        """
+        figure_dir = self._store.path / 'plots'
+        if subfolder is not None:
+            figure_dir = figure_dir / subfolder
+        figure_dir.mkdir(parents=True, exist_ok=True)
+
+        return str(figure_dir / '{}_{}'.format(self._sweep_key, filename))
+
+    def get_checkpoint_path(self, seed):
+        """
+        Get the path of the checkpoint directory of a run.
+
+        Args:
+            seed (int): the seed of the run.
+
+        Returns:
+            The complete path of the checkpoint directory.
+
+        """
+        checkpoint_dir = self._store.path / 'checkpoints' / self._sweep_key
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+        return checkpoint_dir / 'run_{}'.format(seed)
+
+    def remove_run(self, seed):
+        """
+        The runs of a configuration are saved in the container of the sweep, so there is no run directory to
+        remove.
+
+        Args:
+            seed (int): the seed of the run.
+
+        """
+        pass
+
+    def remove_checkpoints(self):
+        """
+        Remove the checkpoints of all the runs.
+
+        """
+        checkpoint_dir = self._store.path / 'checkpoints' / self._sweep_key
+
+        if checkpoint_dir.exists():
+            shutil.rmtree(checkpoint_dir)
+
+    def save_J(self, J):
+        """
+        Save the log of the cumulative discounted reward.
+
+        """
+        self._store.save_runs(self._sweep_key, 'J', J)
+
+    def append_J(self, J):
+        """
+        Append the log of the cumulative discounted reward of new runs to the saved one.
+
+        """
+        self._store.append_runs(self._sweep_key, 'J', J)
+
+    def load_J(self):
+        """
+        Returns:
+            The log of the cumulative discounted reward.
+
+        """
+        return self._store.load_runs(self._sweep_key, 'J')
+
+    def save_R(self, R):
+        """
+        Save the log of the cumulative reward.
+
+        """
+        self._store.save_runs(self._sweep_key, 'R', R)
+
+    def append_R(self, R):
+        """
+        Append the log of the cumulative reward of new runs to the saved one.
+
+        """
+        self._store.append_runs(self._sweep_key, 'R', R)
+
+    def load_R(self):
+        """
+        Returns:
+            The log of the cumulative reward.
+
+        """
+        return self._store.load_runs(self._sweep_key, 'R')
+
+    def save_V(self, V):
+        """
+        Save the log of the value function.
+
+        """
+        self._store.save_runs(self._sweep_key, 'V', V)
+
+    def append_V(self, V):
+        """
+        Append the log of the value function of new runs to the saved one.
+
+        """
+        self._store.append_runs(self._sweep_key, 'V', V)
+
+    def load_V(self):
+        """
+        Returns:
+            The log of the value function.
+
+        """
+        return self._store.load_runs(self._sweep_key, 'V')
+
+    def save_entropy(self, entropy):
+        """
+        Save the log of the entropy function.
+
+        """
+        self._store.save_runs(self._sweep_key, 'entropy', entropy)
+
+    def append_entropy(self, entropy):
+        """
+        Append the log of the entropy function of new runs to the saved one.
+
+        """
+        self._store.append_runs(self._sweep_key, 'entropy', entropy)
+
+    def load_entropy(self):
+        """
+        Returns:
+            The log of the entropy function.
+
+        """
+        if self.exists_policy_entropy():
+            return self._store.load_runs(self._sweep_key, 'entropy')
+        else:
+            return None
+
+    def save_seeds(self, seeds):
+        """
+        Save the seeds of the completed runs, in the same order of the logged metrics.
+
+        """
+        self._store.save_runs(self._sweep_key, 'seeds', seeds)
+
+    def append_seeds(self, seeds):
+        """
+        Append the seeds of new completed runs to the saved ones.
+
+        """
+        self._store.append_runs(self._sweep_key, 'seeds', seeds)
+
+    def load_seeds(self):
+        """
+        Returns:
+            The seeds of the completed runs.
+
+        """
+        return [int(seed) for seed in self._store.load_runs(self._sweep_key, 'seeds')]
+
+    def exists_seeds(self):
+        """
+        Returns:
+            True if the log of the seeds exists, False otherwise.
+
+        """
+        return self._store.exists_runs(self._sweep_key, 'seeds')
+
+    def save_epochs(self, epochs):
+        """
+        Save the evaluated epochs of the completed runs, in the same order of the logged metrics.
+
+        """
+        self._store.save_runs(self._sweep_key, 'epochs', epochs)
+
+    def append_epochs(self, epochs):
+        """
+        Append the evaluated epochs of new completed runs to the saved ones.
+
+        """
+        self._store.append_runs(self._sweep_key, 'epochs', epochs)
+
+    def load_epochs(self):
+        """
+        Returns:
+            The evaluated epochs of the completed runs.
+
+        """
+        return self._store.load_runs(self._sweep_key, 'epochs')
+
+    def exists_epochs(self):
+        """
+        Returns:
+            True if the log of the evaluated epochs exists, False otherwise.
+
+        """
+        return self._store.exists_runs(self._sweep_key, 'epochs')
+
+    def exists_J(self):
+        """
+        Returns:
+            True if the log of the cumulative discounted reward exists, False otherwise.
+
+        """
+        return self._store.exists_runs(self._sweep_key, 'J')
+
+    def exists_policy_entropy(self):
+        """
+        Returns:
+            True if the log of the entropy exists, False otherwise.
+
+        """
+        return self._store.exists_runs(self._sweep_key, 'entropy')
+
+    def exists_value_function(self):
+        """
+        Returns:
+            True if the log of the value function exists, False otherwise.
+
+        """
+        return self._store.exists_runs(self._sweep_key, 'V')
+
+    def load_metric_array(self, metric):
+        """
+        Load a metric as a 2-D array of runs and evaluations. Runs with fewer evaluations than the longest
+        one are masked.
+
+        Args:
+            metric (str): the name of the metric, i.e. 'J', 'R', 'V', 'entropy' or 'epochs'.
+
+        Returns:
+            The masked array of the metric, with shape (n_runs, n_evaluations).
+
+        """
+        table = _to_columnar(self._store.load_runs(self._sweep_key, metric))
+
+        return np.ma.masked_array(table['value'], mask=~table['valid'], copy=False)
+
+    def save_best_agent(self, agent):
+        """
+        Save the best agent, as a snapshot for evaluation.
+
+        Args:
+            agent (object): the agent to save.
+
+        """
+        self._store.save_field(self._sweep_key, 'best_agent', save_agent_snapshot(agent), content_addressed=True)
+
+    def copy_best_agent(self, path):
+        """
+        Copy a saved agent to the best agent.
+
+        Args:
+            path (str): the file of the saved agent.
+
+        """
+        self._store.save_field(self._sweep_key, 'best_agent', Path(path).read_bytes(), content_addressed=True)
+
+    def exists_best_agent(self):
+        """
+        Returns:
+            True if the best agent is saved, False otherwise.
+
+        """
+        return self._store.load_field(self._sweep_key, 'best_agent') is not None
+
+    def load_best_agent(self):
+        """
+        Returns:
+            The best agent.
+
+        """
+        return load_agent_snapshot(self._store.load_field(self._sweep_key, 'best_agent', content_addressed=True))
+
+    def save_environment_builder(self, env_builder):
+        """
+        Save the environment builder, shared by the configurations with the same one.
+
+        Args:
+            env_builder (str): the environment builder to save.
+
+        """
+        self._store.save_field(self._sweep_key, 'environment_builder',
+                               pickle.dumps(env_builder, protocol=pickle.HIGHEST_PROTOCOL), content_addressed=True)
+
+    def load_environment_builder(self):
+        """
+        Returns:
+            The environment builder.
+
+        """
+        return pickle.loads(self._store.load_field(self._sweep_key, 'environment_builder', content_addressed=True))
+
+    def save_agent_builder(self, agent_builder):
+        """
+        Save the agent builder, shared by the configurations with the same one.
+
+        Args:
+            agent_builder (str): the agent builder to save.
+
+        """
+        self._store.save_field(self._sweep_key, 'agent_builder',
+                               pickle.dumps(agent_builder, protocol=pickle.HIGHEST_PROTOCOL), content_addressed=True)
+
+    def load_agent_builder(self):
+        """
+        Returns:
+            The agent builder.
+
+        """
+        return pickle.loads(self._store.load_field(self._sweep_key, 'agent_builder', content_addressed=True))
+
+    def save_parameters(self, params):
+        """
+        Save the parameters of the agent builder of the configuration.
+
+        Args:
+            params (dict): the parameters to save.
+
+        """
+        self._store.save_field(self._sweep_key, 'parameters', _dump_yaml(dictionary_to_primitive(params)))
+
+    def load_parameters(self):
+        """
+        Returns:
+            The parameters of the agent builder of the configuration.
+
+        """
+        return _load_yaml(self._store.load_field(self._sweep_key, 'parameters'))
+
+    def save_config(self, config):
+        """
+        Save the config of the configuration, shared by the configurations with the same one.
+
+        Args:
+            config (dict): the config to save.
+
+        """
+        self._store.save_field(self._sweep_key, 'config', _dump_yaml(config), content_addressed=True)
+
+    def load_config(self):
+        """
+        Returns:
+            The config.
+
+        """
+        return _load_yaml(self._store.load_field(self._sweep_key, 'config', content_addressed=True))
+
+    def exists_config(self):
+        """
+        Returns:
+            True if the config exists, False otherwise.
+
+        """
+        return self._store.load_field(self._sweep_key, 'config') is not None
+
+    def save_stats(self, stats):
+        """
+        Save the statistics of the configuration.
+
+        Args:
+            stats (dict): the statistics to save.
+
+        """
+        self._store.save_field(self._sweep_key, 'stats', _dump_yaml(stats))
+
+    def load_stats(self):
+        """
+        Returns:
+            The statistics.
+
+        """
+        return _load_yaml(self._store.load_field(self._sweep_key, 'stats'))
+
+    def exists_stats(self):
+        """
+        Returns:
+            True if the statistics exist, False otherwise.
+
+        """
+        return self._store.load_field(self._sweep_key, 'stats') is not None
+
+    def save_figure(self, figure, figname, subfolder=None, as_pdf=False, transparent=True):
+        """
+        Save the figure file in the plots directory of the sweep.
+
+        Args:
+            figure (object): the figure to save;
+            figname (str): the name of the figure;
+            subfolder (str, None): optional subfolder where to save the figure;
+            as_pdf (bool, False): whether to save the figure in PDF or not;
+            transparent (bool, True): whether the figure should be transparent or not.
+
+        """
+        extension = '.pdf' if as_pdf else '.png'
+        figure.savefig(self.get_figure_path(figname + extension, subfolder), transparent=transparent)
+
+    def debug(self, msg):
+        """
+        Log a message with DEBUG level.
+
+        """
+        self._store.console.debug(self._format(msg))
+
+    def info(self, msg):
+        """
+        Log a message with INFO level.
+
+        """
+        self._store.console.info(self._format(msg))
+
+    def warning(self, msg):
+        """
+        Log a message with WARNING level.
+
+        """
+        self._store.console.warning(self._format(msg))
+
+    def error(self, msg):
+        """
+        Log a message with ERROR level.
+
+        """
+        self._store.console.error(self._format(msg))
+
+    def critical(self, msg):
+        """
+        Log a message with CRITICAL level.
+
+        """
+        self._store.console.critical(self._format(msg))
+
+    def exception(self, msg):
+        """
+        Log a message with ERROR level, with the information of the exception being handled.
+
+        """
+        self._store.console.exception(self._format(msg))
+
+    def strong_line(self):
+        """
+        Log a line of #
+
+        """
+        self._store.console.strong_line()
+
+    def weak_line(self):
+        """
+        Log a line of -
+
+        """
+        self._store.console.weak_line()
+
+    def _format(self, msg):
+        return '[{}] {}'.format(self._sweep_key, msg)
+
+
+def _dump_yaml(obj):
+    return yaml.dump(obj, version=(1, 2), default_flow_style=False)
+
+
+def _load_yaml(text):
+    return None if text is None else yaml.safe_load(text)
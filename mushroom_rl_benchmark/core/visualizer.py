@@ -6,8 +6,8 @@ import matplotlib.pyplot as plt
 from pathlib import Path
 from mushroom_rl.core import Core
 
-from mushroom_rl.utils.plot import plot_mean_conf
 from mushroom_rl_benchmark.core.logger import BenchmarkLogger
+from mushroom_rl_benchmark.utils.plot import plot_mean_conf
 
 import warnings
 warnings.filterwarnings(action='ignore', category=RuntimeWarning, module='scipy')
@@ -60,6 +60,19 @@ class BenchmarkVisualizer(object):
         """
         return self.data is None
     
+    def get_epochs(self):
+        """
+        Get the evaluated epochs of the first run from dictionary or log directory.
+        All the runs of an experiment share the same evaluation schedule.
+
+        """
+        if self.is_data_persisted:
+            return self.logger.load_epochs()[0]
+        elif 'epochs' in self.data:
+            return self.data['epochs'][0]
+        else:
+            return None
+
     def get_J(self):
         """
         Get J from dictionary or log directory.
@@ -125,32 +138,34 @@ class BenchmarkVisualizer(object):
         q_pos += rows + cols
         e_pos += rows + cols
 
+        epochs = self.get_epochs()
+
         fig = plt.figure(plot_cnt * 10 + self.id, figsize=(24,6), dpi=80)
         j_ax = fig.add_subplot(j_pos, 
             ylabel='J', 
             xlabel='epochs')
         j_ax.grid()
-        plot_mean_conf(self.get_J(), j_ax)
+        plot_mean_conf(self.get_J(), j_ax, x=epochs)
 
         r_ax = fig.add_subplot(r_pos,
             ylabel='R', 
             xlabel='epochs')
         r_ax.grid()
-        plot_mean_conf(self.get_R(), r_ax)
+        plot_mean_conf(self.get_R(), r_ax, x=epochs)
 
         if self.has_value:
             v_ax = fig.add_subplot(q_pos,
                 ylabel='V',
                 xlabel='epochs')
             v_ax.grid()
-            plot_mean_conf(self.get_V(), v_ax)
+            plot_mean_conf(self.get_V(), v_ax, x=epochs)
 
         if self.has_entropy:
             e_ax = fig.add_subplot(e_pos,
                 ylabel='policy_entropy', 
                 xlabel='epochs')
             e_ax.grid()
-            plot_mean_conf(self.get_entropy(), e_ax)
+            plot_mean_conf(self.get_entropy(), e_ax, x=epochs)
 
         fig.tight_layout()
 
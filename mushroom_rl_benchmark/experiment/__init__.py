@@ -1,3 +1,12 @@
 from .run import exec_run
+from .run_artifacts import exec_run_to_dir, save_run_artifacts, load_run_result
+from .supervisor import exec_supervised_run
+from .checkpoint import RunCheckpoint
+from .evaluation import VectorizedEvaluator, AsyncEvaluator
+from .snapshot import save_agent_snapshot, load_agent_snapshot, SnapshotWriter
+from .worker_pool import WorkerPool
+from .resources import ResourcePolicy
 
-__all__ = ['exec_run']
\ No newline at end of file
+__all__ = ['exec_run', 'exec_run_to_dir', 'save_run_artifacts', 'load_run_result', 'exec_supervised_run',
+           'RunCheckpoint', 'VectorizedEvaluator', 'AsyncEvaluator', 'save_agent_snapshot', 'load_agent_snapshot',
+           'SnapshotWriter', 'WorkerPool', 'ResourcePolicy']
\ No newline at end of file
@@ -0,0 +1,474 @@
+import os
+import pickle
+import random
+import shutil
+from pathlib import Path
+
+import torch
+import numpy as np
+
+from mushroom_rl.core import Serializable
+from mushroom_rl.utils.replay_memory import ReplayMemory, PrioritizedReplayMemory
+
+
+class RunCheckpoint:
+    """
+    Class to save and restore the state of an experiment run at the end of an epoch. The agent is saved
+    without the content of its replay memory, which is stored by a ReplayMemorySnapshot.
+
+    """
+    _file_state = 'state.pkl'
+
+    def __init__(self, path):
+        """
+        Constructor.
+
+        Args:
+            path (str): path of the checkpoint directory of the run.
+
+        """
+        self._path = Path(path)
+        self._replay_memory_snapshot = ReplayMemorySnapshot(self._path)
+
+    def exists(self):
+        """
+        Returns:
+            True if a checkpoint of the run exists, False otherwise.
+
+        """
+        return (self._path / self._file_state).exists()
+
+    def save(self, epoch, agent, agent_builder, preprocessors, metrics, best_agent=None, n_new_steps=None,
+             environments=None):
+        """
+        Save the checkpoint of the run.
+
+        Args:
+            epoch (int): number of completed epochs;
+            agent (Agent): the agent to save;
+            agent_builder (AgentBuilder): the agent builder, holding the state of the exploration parameters;
+            preprocessors (list): the preprocessors used by the core;
+            metrics (RunMetrics): the metrics collected so far;
+            best_agent (bytes, None): the snapshot of the best agent, if it changed since the previous
+                checkpoint;
+            n_new_steps (int, None): number of environment steps since the previous checkpoint, used to
+                find the new transitions in the replay memory. If None, the full replay memory is saved;
+            environments (list, None): the environments of the run, whose random number generators are saved.
+
+        """
+        self._path.mkdir(parents=True, exist_ok=True)
+        previous_state = self._load_pickle(self._path / self._file_state) if self.exists() else None
+
+        replay_memory = get_replay_memory(agent)
+        replay_memory_state = None
+        if replay_memory is not None:
+            replay_memory_state = self._replay_memory_snapshot.save(replay_memory, n_new_steps)
+
+        # Agents are saved in new files, so that an interrupted checkpoint leaves the previous one valid
+        agent_file = 'agent_{}.msh'.format(epoch)
+        agent.save(self._path / agent_file, full_save=False)
+
+        if best_agent is not None:
+            best_agent_file = 'best_agent_{}.msh'.format(epoch)
+            with (self._path / best_agent_file).open('wb') as f:
+                f.write(best_agent)
+        else:
+            best_agent_file = None if previous_state is None else previous_state['best_agent_file']
+
+        state = dict(
+            epoch=epoch,
+            metrics=metrics,
+            agent_builder=agent_builder,
+            preprocessors=preprocessors,
+            random_state=get_random_state(),
+            environment_random_states=None if environments is None
+            else [get_environment_random_state(env) for env in environments],
+            agent_file=agent_file,
+            best_agent_file=best_agent_file,
+            replay_memory=replay_memory_state
+        )
+
+        # The state is written last: it marks the checkpoint as complete
+        tmp_path = self._path / (self._file_state + '.tmp')
+        self._save_pickle(tmp_path, state)
+        os.replace(tmp_path, self._path / self._file_state)
+
+        self._remove_unused_files(state)
+
+    def load(self):
+        """
+        Load the checkpoint of the run. The random number generators are restored by restore_random_state,
+        once the run is set up again.
+
+        Returns:
+            The checkpoint state, with the restored agent and the snapshot of the best agent (None if not
+            saved).
+
+        """
+        state = self._load_pickle(self._path / self._file_state)
+
+        agent = Serializable.load(self._path / state['agent_file'])
+        if state['replay_memory'] is not None:
+            self._replay_memory_snapshot.load(get_replay_memory(agent), state['replay_memory'])
+
+        state['agent'] = agent
+        state['best_agent'] = None if state['best_agent_file'] is None \
+            else (self._path / state['best_agent_file']).read_bytes()
+
+        self._remove_unused_files(state)
+
+        return state
+
+    @staticmethod
+    def restore_random_state(state, environments=None):
+        """
+        Restore the random number generators saved in the checkpoint.
+
+        Args:
+            state (dict): the checkpoint state returned by the load method;
+            environments (list, None): the environments of the run, in the same order used to save the
+                checkpoint.
+
+        """
+        set_random_state(state['random_state'])
+
+        environment_random_states = state.get('environment_random_states')
+        if environments is not None and environment_random_states is not None:
+            for env, random_state in zip(environments, environment_random_states):
+                set_environment_random_state(env, random_state)
+
+    def remove(self):
+        """
+        Remove the checkpoint of the run.
+
+        """
+        if self._path.exists():
+            shutil.rmtree(self._path)
+
+    def _remove_unused_files(self, state):
+        used_files = [self._file_state, state['agent_file'], state['best_agent_file']]
+        if state['replay_memory'] is not None:
+            used_files.append(state['replay_memory']['file'])
+
+        for path in self._path.iterdir():
+            if path.is_file() and path.name not in used_files:
+                path.unlink()
+
+    @staticmethod
+    def _save_pickle(path, obj):
+        with Path(path).open('wb') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _load_pickle(path):
+        with Path(path).open('rb') as f:
+            return pickle.load(f)
+
+
+class ReplayMemorySnapshot:
+    """
+    Class to save the content of a replay memory incrementally. The first snapshot writes the full memory,
+    the following ones append only the slots written since the previous snapshot. When the appended slots
+    exceed the size of the memory, the file is compacted into a new full snapshot.
+
+    The slots are found through the ring buffers of the memory, see get_snapshot_rings. The attributes that
+    are not part of a ring, e.g. the arrays of a sum tree, are saved fully at every snapshot. Memories without
+    ring buffers are saved fully at every snapshot. Memories storing their content in files provide the
+    ``get_snapshot`` and ``set_snapshot`` methods, and only their state is saved, with the paths relative to
+    the snapshot directory.
+
+    """
+    def __init__(self, path):
+        """
+        Constructor.
+
+        Args:
+            path (str): path of the directory containing the snapshot files.
+
+        """
+        self._path = Path(path)
+        self._generation = 0
+        self._rings = None
+        self._n_appended = 0
+
+    def save(self, replay_memory, n_new_steps=None):
+        """
+        Save the content of the replay memory.
+
+        Args:
+            replay_memory (object): the replay memory to save;
+            n_new_steps (int, None): number of environment steps since the previous snapshot. If None,
+                the full replay memory is saved.
+
+        Returns:
+            The state of the snapshot, to be passed to the load method.
+
+        """
+        rings = get_snapshot_rings(replay_memory)
+
+        if hasattr(replay_memory, 'get_snapshot'):
+            self._generation += 1
+            with self._get_file().open('wb') as f:
+                pickle.dump(('state', replay_memory.get_snapshot(self._path)), f, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            positions = self._get_new_positions(rings, n_new_steps)
+            n_new = 0 if positions is None else sum(len(ring_positions) for ring_positions in positions.values())
+            if positions is None or self._n_appended + n_new >= sum(ring['capacity'] for ring in rings):
+                self._generation += 1
+                self._n_appended = 0
+                with self._get_file().open('wb') as f:
+                    pickle.dump(('full', vars(replay_memory)), f, protocol=pickle.HIGHEST_PROTOCOL)
+            else:
+                slots = dict()
+                attributes = dict()
+                owners = [ring['path'] for ring in rings]
+                for ring in rings:
+                    owner = _get_owner(replay_memory, ring['path'])
+                    slots[ring['path']] = (positions[ring['path']],
+                                           {field: _get_slots(getattr(owner, field), positions[ring['path']])
+                                            for field in ring['fields']})
+                for path in set(owners) | {''}:
+                    excluded = [field for ring in rings if ring['path'] == path for field in ring['fields']]
+                    if path == '':
+                        excluded += owners
+                    attributes[path] = {key: value for key, value in vars(_get_owner(replay_memory, path)).items()
+                                        if key not in excluded}
+                self._n_appended += n_new
+                with self._get_file().open('ab') as f:
+                    pickle.dump(('append', slots, attributes), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._rings = _get_ring_positions(rings)
+
+        return dict(generation=self._generation, file=self._get_file().name, size=self._get_file().stat().st_size)
+
+    def load(self, replay_memory, state):
+        """
+        Restore the content of the replay memory. Data appended after the given state, e.g. by a
+        checkpoint interrupted before completion, is discarded.
+
+        Args:
+            replay_memory (object): the replay memory to restore;
+            state (dict): the state of the snapshot returned by the save method.
+
+        Returns:
+            The restored replay memory.
+
+        """
+        self._generation = state['generation']
+        path = self._get_file()
+
+        with path.open('r+b') as f:
+            f.truncate(state['size'])
+            while f.tell() < state['size']:
+                chunk = pickle.load(f)
+                if chunk[0] == 'full':
+                    replay_memory.__dict__.update(chunk[1])
+                    self._n_appended = 0
+                elif chunk[0] == 'state':
+                    replay_memory.set_snapshot(chunk[1], self._path)
+                else:
+                    _, slots, attributes = chunk
+                    for owner_path, owner_attributes in attributes.items():
+                        _get_owner(replay_memory, owner_path).__dict__.update(owner_attributes)
+                    for owner_path, (positions, values) in slots.items():
+                        owner = _get_owner(replay_memory, owner_path)
+                        for field, field_values in values.items():
+                            _set_slots(getattr(owner, field), positions, field_values)
+                        self._n_appended += len(positions)
+
+        self._rings = _get_ring_positions(get_snapshot_rings(replay_memory))
+
+        return replay_memory
+
+    def _get_new_positions(self, rings, n_new_steps):
+        # The positions written in each ring since the previous snapshot, None if they cannot be found
+        if rings is None or self._rings is None or n_new_steps is None:
+            return None
+
+        positions = dict()
+        for ring in rings:
+            owner = ring['path']
+            previous = self._rings.get(owner)
+            if previous is None or previous['capacity'] != ring['capacity'] or not previous['allocated'] \
+                    or not ring['allocated']:
+                return None
+
+            capacity = ring['capacity']
+            if ring['n_written'] is not None:
+                n_new = ring['n_written'] - previous['n_written']
+                start = previous['n_written']
+            else:
+                # Each environment step adds at most one transition
+                n_new = (ring['idx'] - previous['idx']) % capacity if n_new_steps < capacity else capacity
+                start = previous['idx']
+            if n_new >= capacity:
+                return None
+
+            positions[owner] = (start + np.arange(n_new)) % capacity
+
+        return positions
+
+    def _get_file(self):
+        return self._path / 'replay_memory_{}.pkl'.format(self._generation)
+
+
+def get_snapshot_rings(replay_memory):
+    """
+    Find the ring buffers of a replay memory, i.e. the attributes storing one element per slot, written in
+    circular order. Replay memories can describe their ring buffers with the ``get_snapshot_rings`` method.
+
+    Args:
+        replay_memory (object): the replay memory.
+
+    Returns:
+        The list of the ring buffers of the memory, None if they are not known. Each ring buffer is a dictionary
+        with the path of the object holding it ('' for the memory itself, or the name of an attribute of the
+        memory), the list of its fields, the index of the next slot, its capacity, whether its fields are
+        allocated and, if available, the total number of slots written, used instead of the index.
+
+    """
+    if hasattr(replay_memory, 'get_snapshot_rings'):
+        return replay_memory.get_snapshot_rings()
+    elif type(replay_memory) is ReplayMemory:
+        return [dict(path='', fields=['_states', '_actions', '_rewards', '_next_states', '_absorbing', '_last'],
+                     idx=replay_memory._idx, capacity=replay_memory._max_size, allocated=True, n_written=None)]
+    elif type(replay_memory) is PrioritizedReplayMemory:
+        tree = replay_memory._tree
+        return [dict(path='_tree', fields=['_data'], idx=tree._idx, capacity=tree._max_size, allocated=True,
+                     n_written=None)]
+    else:
+        return None
+
+
+def get_replay_memory(agent):
+    """
+    Args:
+        agent (Agent): the agent.
+
+    Returns:
+        The replay memory of the agent, None if the agent has no replay memory. When the replay memory is
+        wrapped by a prefetching sampler, the pending prefetch is completed and the wrapped memory is returned.
+
+    """
+    replay_memory = getattr(agent, '_replay_memory', None)
+
+    return replay_memory.unwrap() if hasattr(replay_memory, 'unwrap') else replay_memory
+
+
+def get_random_state():
+    """
+    Returns:
+        The state of the random number generators of python, numpy and torch.
+
+    """
+    random_state = dict(
+        python=random.getstate(),
+        numpy=np.random.get_state(),
+        torch=torch.get_rng_state()
+    )
+
+    if torch.cuda.is_available():
+        random_state['torch_cuda'] = torch.cuda.get_rng_state_all()
+
+    return random_state
+
+
+def set_random_state(random_state):
+    """
+    Restore the state of the random number generators of python, numpy and torch.
+
+    Args:
+        random_state (dict): the state returned by get_random_state.
+
+    """
+    random.setstate(random_state['python'])
+    np.random.set_state(random_state['numpy'])
+    torch.set_rng_state(random_state['torch'])
+
+    if 'torch_cuda' in random_state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(random_state['torch_cuda'])
+
+
+def get_environment_random_state(env):
+    """
+    Args:
+        env (Environment): the environment.
+
+    Returns:
+        The random number generators of the Gym environment wrapped by the environment and of its spaces, None
+        if the environment does not wrap a Gym environment. Random number generators not exposed by Gym, e.g.
+        the one of the Arcade Learning Environment, are not included.
+
+    """
+    if not hasattr(env, 'env'):
+        return None
+
+    random_state = dict()
+    for name, (owner, attribute) in _get_random_owners(env).items():
+        generator = getattr(owner, attribute)
+        random_state[name] = generator.bit_generator.state if hasattr(generator, 'bit_generator') \
+            else generator.get_state()
+
+    return random_state
+
+
+def set_environment_random_state(env, random_state):
+    """
+    Restore the random number generators of an environment.
+
+    Args:
+        env (Environment): the environment;
+        random_state (dict): the state returned by get_environment_random_state.
+
+    """
+    if random_state is None:
+        return
+
+    for name, (owner, attribute) in _get_random_owners(env).items():
+        if name in random_state:
+            generator = getattr(owner, attribute)
+            if hasattr(generator, 'bit_generator'):
+                generator.bit_generator.state = random_state[name]
+            else:
+                generator.set_state(random_state[name])
+
+
+def _get_random_owners(env):
+    gym_env = getattr(env.env, 'unwrapped', env.env)
+
+    owners = dict()
+    for name, owner in [('env', gym_env), ('action_space', getattr(gym_env, 'action_space', None)),
+                        ('observation_space', getattr(gym_env, 'observation_space', None))]:
+        # The generators are created lazily by recent versions of Gym
+        for attribute in ['_np_random', 'np_random']:
+            if owner is not None and attribute in vars(owner) and vars(owner)[attribute] is not None:
+                owners[name] = (owner, attribute)
+                break
+
+    return owners
+
+
+def _get_slots(field, positions):
+    if isinstance(field, np.ndarray):
+        return field[positions]
+    return [field[i] for i in positions]
+
+
+def _set_slots(field, positions, values):
+    if isinstance(field, np.ndarray):
+        field[positions] = values
+    else:
+        for i, value in zip(positions, values):
+            field[i] = value
+
+
+def _get_owner(replay_memory, path):
+    return replay_memory if path == '' else getattr(replay_memory, path)
+
+
+def _get_ring_positions(rings):
+    if rings is None:
+        return None
+
+    return {ring['path']: dict(idx=ring['idx'], capacity=ring['capacity'], allocated=ring['allocated'],
+                               n_written=ring['n_written']) for ring in rings}
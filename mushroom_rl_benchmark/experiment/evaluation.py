@@ -0,0 +1,414 @@
+import time
+import queue
+import traceback
+import multiprocessing
+from collections import deque
+
+import torch
+import numpy as np
+
+from mushroom_rl.core import Core
+from mushroom_rl.utils.dataset import compute_J, parse_dataset, get_init_states
+
+from tqdm import tqdm
+
+from .snapshot import save_agent_snapshot, load_agent_snapshot
+
+
+class VectorizedEvaluator:
+    """
+    Class to evaluate an agent on multiple copies of the environment stepped together. At each step, the
+    states of all the running environments are passed to the agent builder as a single batch, so that
+    agents with a batched implementation of ``draw_actions`` select all the actions with one forward pass.
+
+    The evaluation assumes that the policy used in evaluation mode has no internal state across the steps
+    of an episode.
+
+    """
+    def __init__(self, env_builder, n_envs, preprocessors=None, seed=None):
+        """
+        Constructor.
+
+        Args:
+            env_builder (EnvironmentBuilder): environment builder to spawn the environments;
+            n_envs (int): number of environments evaluated together;
+            preprocessors (list, None): preprocessors applied to the states, shared with the training core;
+            seed (int, None): the seed of the run. The environment i is seeded with seed + i + 1.
+
+        """
+        self._envs = list()
+        for i in range(n_envs):
+            env = env_builder.build()
+            if hasattr(env, 'env'):
+                env.env.seed(None if seed is None else seed + i + 1)
+            env_builder.set_eval_mode(env, True)
+            self._envs.append(env)
+
+        self._preprocessors = preprocessors if preprocessors is not None else list()
+
+    @property
+    def environments(self):
+        """
+        Returns:
+            The list of the environments evaluated together.
+
+        """
+        return self._envs
+
+    def set_preprocessors(self, preprocessors):
+        """
+        Set the preprocessors applied to the states.
+
+        Args:
+            preprocessors (list): the preprocessors.
+
+        """
+        self._preprocessors = preprocessors
+
+    def evaluate(self, agent, agent_builder, n_steps=None, n_episodes=None, render=False, quiet=True):
+        """
+        Evaluate the agent for the given number of steps or episodes. The steps are split evenly among the
+        environments, while the episodes are assigned to the environments as they become free.
+
+        Args:
+            agent (Agent): the agent to evaluate;
+            agent_builder (AgentBuilder): the agent builder, used to draw the actions of a batch of states;
+            n_steps (int, None): number of evaluation steps;
+            n_episodes (int, None): number of evaluation episodes;
+            render (bool, False): whether to render the environments or not;
+            quiet (bool, True): whether to hide the progress bar or not.
+
+        Returns:
+            The dataset of the evaluation, where the episodes of each environment are contiguous. As with
+            Core.evaluate, at most one episode, the last one, is truncated by the number of steps: the
+            unfinished episodes of the other environments are discarded. The last transition of the dataset
+            always terminates an episode.
+
+        """
+        assert (n_steps is None) != (n_episodes is None)
+
+        n_envs = len(self._envs)
+        datasets = [list() for _ in range(n_envs)]
+        states = [None] * n_envs
+        episode_steps = [0] * n_envs
+        running = [False] * n_envs
+
+        if n_steps is not None:
+            budgets = [n_steps // n_envs + (1 if i < n_steps % n_envs else 0) for i in range(n_envs)]
+            total = n_steps
+        else:
+            total = n_episodes
+        n_started_episodes = 0
+
+        def start_episode(i):
+            states[i] = self._preprocess(self._envs[i].reset().copy())
+            episode_steps[i] = 0
+            running[i] = True
+            agent.episode_start()
+
+        for i in range(n_envs):
+            if (n_steps is not None and budgets[i] > 0) or (n_episodes is not None and n_started_episodes < n_episodes):
+                start_episode(i)
+                n_started_episodes += 1
+
+        with tqdm(total=total, dynamic_ncols=True, disable=quiet, leave=False) as progress_bar:
+            while any(running):
+                idxs = [i for i in range(n_envs) if running[i]]
+                actions = agent_builder.draw_actions(agent, np.array([states[i] for i in idxs]))
+
+                for i, action in zip(idxs, actions):
+                    env = self._envs[i]
+                    next_state, reward, absorbing, _ = env.step(action)
+                    episode_steps[i] += 1
+                    if render:
+                        env.render()
+
+                    last = not (episode_steps[i] < env.info.horizon and not absorbing)
+                    next_state = self._preprocess(next_state.copy())
+                    datasets[i].append((states[i], action, reward, next_state, absorbing, last))
+                    states[i] = next_state
+
+                    if n_steps is not None:
+                        progress_bar.update(1)
+                        if len(datasets[i]) == budgets[i]:
+                            running[i] = False
+                        elif last:
+                            start_episode(i)
+                    elif last:
+                        progress_bar.update(1)
+                        if n_started_episodes < n_episodes:
+                            start_episode(i)
+                            n_started_episodes += 1
+                        else:
+                            running[i] = False
+
+        dataset = list()
+        truncated_episode = None
+        for env_dataset in datasets:
+            if len(env_dataset) > 0 and not env_dataset[-1][5]:
+                episode_start = max([t + 1 for t, transition in enumerate(env_dataset) if transition[5]], default=0)
+                if truncated_episode is None:
+                    truncated_episode = env_dataset[episode_start:]
+                env_dataset = env_dataset[:episode_start]
+            dataset += env_dataset
+
+        if truncated_episode is not None:
+            truncated_episode[-1] = truncated_episode[-1][:5] + (True,)
+            dataset += truncated_episode
+
+        return dataset
+
+    def _preprocess(self, state):
+        for p in self._preprocessors:
+            state = p(state)
+
+        return state
+
+
+def compute_metrics(core, eval_params, agent_builder, env_builder, evaluator=None):
+    """
+    Function to compute the metrics.
+
+    Args:
+        eval_params (dict): parameters for running the evaluation;
+        agent_builder (AgentBuilder): the agent builder;
+        env_builder (EnvironmentBuilder): environment builder to spawn an environment;
+        evaluator (VectorizedEvaluator, None): evaluator stepping multiple environments together. If None,
+            the evaluation runs on the training environment.
+
+    """
+
+    agent_builder.set_eval_mode(core.agent, True)
+    if evaluator is not None:
+        dataset = evaluator.evaluate(core.agent, agent_builder, **eval_params)
+    else:
+        env_builder.set_eval_mode(core.mdp, True)
+        dataset = core.evaluate(**eval_params)
+        env_builder.set_eval_mode(core.mdp, False)
+    agent_builder.set_eval_mode(core.agent, False)
+
+    # Compute J
+    J = np.mean(compute_J(dataset, core.mdp.info.gamma))
+
+    if hasattr(J, 'item'):
+        J = J.item()
+
+    # Compute R
+    R = np.mean(compute_J(dataset))
+
+    if hasattr(R, 'item'):
+        R = R.item()
+    
+    # Compute V
+    V = None
+    if agent_builder.compute_value_function:
+        states = get_init_states(dataset)
+        V = agent_builder.compute_Q(
+            agent=core.agent,
+            states=states)
+
+        if hasattr(V, 'item'):
+            V = V.item()
+    
+    # Compute Policy Entropy
+    E = None
+    if agent_builder.compute_policy_entropy:
+        if agent_builder.compute_entropy_with_states:
+            E = core.agent.policy.entropy(parse_dataset(dataset)[0])
+        else:
+            E = core.agent.policy.entropy()
+
+    if hasattr(E, 'item'):
+        E = E.item()
+    
+    return J, R, V, E
+
+
+class AsyncEvaluator:
+    """
+    Class to evaluate snapshots of an agent in a separate process, with its own environment instances,
+    while the training continues. The snapshots are evaluated in the order they are submitted.
+
+    """
+    def __init__(self, agent_builder, env_builder, eval_params, n_envs=1, seed=None):
+        """
+        Constructor.
+
+        Args:
+            agent_builder (AgentBuilder): the agent builder, already used to build the agent;
+            env_builder (EnvironmentBuilder): environment builder to spawn the evaluation environments;
+            eval_params (dict): parameters for running the evaluation;
+            n_envs (int, 1): number of environments stepped together by a VectorizedEvaluator. If 1, the
+                snapshots are evaluated with a core on a single environment;
+            seed (int, None): the seed of the run.
+
+        """
+        # Forking a process that already uses torch is not safe. The process is daemonic, so that it does not
+        # outlive a run that fails without closing it
+        context = multiprocessing.get_context('spawn')
+        self._snapshot_queue = context.Queue()
+        self._result_queue = context.Queue()
+        self._process = context.Process(
+            target=_evaluation_worker,
+            args=(self._snapshot_queue, self._result_queue, agent_builder, env_builder, eval_params, n_envs, seed),
+            daemon=True
+        )
+        self._process.start()
+
+        self._snapshots = deque()
+
+    def submit(self, epoch, agent, preprocessors, eval_params=None):
+        """
+        Submit a snapshot of the agent for evaluation.
+
+        Args:
+            epoch (int): the epoch of the snapshot;
+            agent (Agent): the agent to evaluate;
+            preprocessors (list): the preprocessors used by the training core;
+            eval_params (dict, None): parameters for running this evaluation. If None, the parameters
+                given to the constructor are used.
+
+        """
+        snapshot = save_agent_snapshot(agent)
+        self._snapshots.append(snapshot)
+        self._snapshot_queue.put((epoch, snapshot, preprocessors, eval_params))
+
+    def collect(self, wait=False):
+        """
+        Collect the results of the completed evaluations.
+
+        Args:
+            wait (bool, False): select to wait for all the submitted evaluations to complete.
+
+        Returns:
+            The list of (epoch, metrics, snapshot, evaluation time) tuples of the completed evaluations, in
+            order of submission.
+
+        Raises:
+            RuntimeError: if an evaluation failed or the evaluation process terminated. The evaluation process
+                is terminated before raising.
+
+        """
+        results = list()
+        while len(self._snapshots) > 0:
+            try:
+                epoch, metrics, eval_time, error = self._result_queue.get(block=wait, timeout=1 if wait else None)
+            except queue.Empty:
+                if wait and self._process.is_alive():
+                    continue
+                elif wait:
+                    self.terminate()
+                    raise RuntimeError('The evaluation process terminated unexpectedly')
+                break
+
+            if error is not None:
+                self.terminate()
+                raise RuntimeError('Evaluation of epoch {} failed:\n{}'.format(epoch, error))
+
+            results.append((epoch, metrics, self._snapshots.popleft(), eval_time))
+
+        return results
+
+    def close(self):
+        """
+        Stop the evaluation process, once the submitted evaluations are completed.
+
+        """
+        if self._process.is_alive():
+            self._snapshot_queue.put(None)
+        self._process.join()
+
+    def terminate(self):
+        """
+        Stop the evaluation process immediately, discarding the pending evaluations.
+
+        """
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process.join()
+
+
+def _evaluation_worker(snapshot_queue, result_queue, agent_builder, env_builder, eval_params, n_envs, seed):
+    if seed is not None:
+        np.random.seed(seed)
+        torch.manual_seed(seed)
+
+    mdp = env_builder.build()
+    if hasattr(mdp, 'env'):
+        mdp.env.seed(seed)
+    vectorized_evaluator = VectorizedEvaluator(env_builder, n_envs, seed=seed) if n_envs > 1 else None
+
+    while True:
+        message = snapshot_queue.get()
+        if message is None:
+            break
+
+        epoch, snapshot, preprocessors, snapshot_eval_params = message
+        try:
+            start_time = time.time()
+            agent = load_agent_snapshot(snapshot)
+            core = Core(agent, mdp, preprocessors=preprocessors)
+            if vectorized_evaluator is not None:
+                vectorized_evaluator.set_preprocessors(preprocessors)
+            metrics = compute_metrics(core, eval_params if snapshot_eval_params is None else snapshot_eval_params,
+                                      agent_builder, env_builder, vectorized_evaluator)
+            result_queue.put((epoch, metrics, time.time() - start_time, None))
+        except Exception:
+            result_queue.put((epoch, None, None, traceback.format_exc()))
+
+
+def get_evaluation_schedule(n_epochs, mode='every', k=1, ratio=2., proxy_fraction=1., n_final=1):
+    """
+    Compute the epochs at which the agent is evaluated, together with the fraction of the evaluation budget
+    used at each of them. The initial epoch is always evaluated, and the last n_final epochs are always
+    evaluated with the full budget.
+
+    Args:
+        n_epochs (int): number of epochs of the run;
+        mode (str, 'every'): how to space the evaluations [every|geometric];
+        k (int, 1): number of epochs between two evaluations, used by the 'every' mode;
+        ratio (float, 2.): ratio between the epochs of two consecutive evaluations, used by the
+            'geometric' mode;
+        proxy_fraction (float, 1.): fraction of the evaluation budget used for the intermediate evaluations;
+        n_final (int, 1): number of final epochs evaluated with the full budget.
+
+    Returns:
+        A dictionary mapping each evaluated epoch to the fraction of the evaluation budget to use.
+
+    """
+    if mode == 'every':
+        epochs = set(range(0, n_epochs + 1, k))
+    elif mode == 'geometric':
+        assert ratio > 1.
+        epochs = {0}
+        epoch = 1.
+        while epoch <= n_epochs:
+            epochs.add(int(epoch))
+            epoch *= ratio
+    else:
+        raise ValueError("Evaluation schedule mode must be 'every' or 'geometric'")
+
+    schedule = {epoch: proxy_fraction for epoch in epochs}
+    schedule.update({epoch: 1. for epoch in range(max(n_epochs - n_final + 1, 0), n_epochs + 1)})
+
+    return dict(sorted(schedule.items()))
+
+
+def scale_eval_params(eval_params, fraction):
+    """
+    Scale the budget of the evaluation.
+
+    Args:
+        eval_params (dict): parameters for running the evaluation;
+        fraction (float): fraction of the budget to use.
+
+    Returns:
+        The parameters for running the evaluation with the scaled budget.
+
+    """
+    scaled_params = dict(eval_params)
+    for key in ['n_steps', 'n_episodes']:
+        if key in scaled_params:
+            scaled_params[key] = max(1, int(round(scaled_params[key] * fraction)))
+
+    return scaled_params
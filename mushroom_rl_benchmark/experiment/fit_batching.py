@@ -0,0 +1,48 @@
+from mushroom_rl.utils.replay_memory import PrioritizedReplayMemory
+
+from mushroom_rl_benchmark.builders.memory import BatchedReplayMemory
+
+
+class FitBatching:
+    """
+    Fit callback of the core counting the updates of an agent with a replay memory, and implementing the fit
+    batching mode. In the fit batching mode, the core collects the steps of several fits before fitting the
+    agent, and the callback runs the remaining updates back-to-back, fitting the agent without new transitions.
+    The minibatches of the updates are drawn together, except for prioritized replay memories, whose priorities
+    change after each update.
+
+    """
+    def __init__(self, agent, run_metrics, n_updates_per_fit=1):
+        """
+        Constructor.
+
+        Args:
+            agent (Agent): the agent, with a replay memory;
+            run_metrics (RunMetrics): the metrics of the run, where the steps and updates are counted;
+            n_updates_per_fit (int, 1): number of updates after each fit of the core.
+
+        """
+        self._agent = agent
+        self._run_metrics = run_metrics
+        self._n_updates_per_fit = n_updates_per_fit
+
+        replay_memory = agent._replay_memory
+        if n_updates_per_fit > 1 and not isinstance(replay_memory, (PrioritizedReplayMemory, BatchedReplayMemory)):
+            agent._replay_memory = BatchedReplayMemory(replay_memory, n_updates_per_fit)
+
+    def __call__(self, dataset):
+        """
+        Run the remaining updates of the fit and count the steps and updates.
+
+        Args:
+            dataset (list): the dataset of the fit.
+
+        """
+        # The agent is updated at each fit once its replay memory is initialized
+        n_updates = 0
+        if self._agent._replay_memory.initialized:
+            for _ in range(self._n_updates_per_fit - 1):
+                self._agent.fit(list())
+            n_updates = self._n_updates_per_fit
+
+        self._run_metrics.add_updates(len(dataset), n_updates)
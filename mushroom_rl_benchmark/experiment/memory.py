@@ -0,0 +1,187 @@
+import os
+import sys
+import resource
+
+import numpy as np
+
+from mushroom_rl_benchmark.builders.memory import DiskReplayMemory
+
+
+_MB = 2 ** 20
+
+# Memory of a worker process before building the run, with torch and MushroomRL imported
+_process_memory_mb = 600.
+
+# Memory of the python objects wrapping each element of a transition stored in a replay memory
+_transition_overhead_bytes = 6 * 112
+
+
+def get_memory_usage():
+    """
+    Returns:
+        The resident memory of the current process in MB. Where the current resident memory is not available,
+        the peak resident memory is returned.
+
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / _MB
+    except (OSError, ValueError):
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss / _MB if sys.platform == 'darwin' else max_rss / 1024
+
+
+def get_system_memory():
+    """
+    Returns:
+        The (total, available) memory of the system in MB, or (None, None) if not available.
+
+    """
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            meminfo = {line.split(':')[0]: float(line.split()[1]) / 1024 for line in f}
+        return meminfo['MemTotal'], meminfo['MemAvailable']
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def estimate_run_memory(agent_builder, env_builder):
+    """
+    Estimate the peak memory of a run, from the size of the replay memory of the agent and the observations
+    of the environment.
+
+    Args:
+        agent_builder (AgentBuilder): the agent builder of the run;
+        env_builder (EnvironmentBuilder): the environment builder of the run.
+
+    Returns:
+        The estimated peak memory in MB.
+
+    """
+    alg_params = getattr(agent_builder, 'alg_params', dict())
+    max_replay_size = alg_params.get('max_replay_size', 0) if isinstance(alg_params, dict) else 0
+
+    if max_replay_size == 0:
+        return _process_memory_mb
+
+    if getattr(agent_builder, 'replay_memory', None) == 'disk':
+        # Only the hot window of the disk-backed replay memory is kept in memory
+        max_replay_size = min(max_replay_size, DiskReplayMemory._default_hot_size)
+
+    mdp = env_builder.build()
+    state = mdp.reset()
+    mdp.stop()
+
+    frames = getattr(state, '_frames', None)
+    if getattr(agent_builder, 'replay_memory', None) == 'compact':
+        # Only one new frame is stored at each step, with the references of the frames of the stacks
+        state = np.asarray(state)
+        transition_bytes = state[-1].nbytes + 2 * len(state) * np.dtype(np.int64).itemsize
+        return _process_memory_mb + 1.1 * max_replay_size * transition_bytes / _MB
+    elif frames is not None:
+        # Stacked frames are shared among consecutive states, only one new frame is stored at each step
+        transition_bytes = np.asarray(frames[-1]).nbytes
+    else:
+        transition_bytes = 2 * np.asarray(state).nbytes
+
+    return _process_memory_mb + max_replay_size * (transition_bytes + _transition_overhead_bytes) / _MB
+
+
+class MemoryAdmission:
+    """
+    Class to admit new runs only while the estimated peak memory of all the running ones fits a memory
+    budget. The estimates of the runs of an experiment are replaced by the peak memory measured on its
+    completed runs. New runs are also held back while the memory available on the system is low.
+
+    """
+    def __init__(self, budget=None, min_available=1024., safety_factor=1.2):
+        """
+        Constructor.
+
+        Args:
+            budget (float, None): memory budget of the concurrent runs in MB. By default, 90% of the memory
+                of the system;
+            min_available (float, 1024.): minimum memory in MB that must stay available on the system after
+                admitting a run;
+            safety_factor (float, 1.2): factor multiplying the estimated peak memory of the runs.
+
+        """
+        total, _ = get_system_memory()
+        if budget is None:
+            budget = np.inf if total is None else .9 * total
+
+        self._budget = budget
+        self._min_available = min_available
+        self._safety_factor = safety_factor
+
+        self._estimates = dict()
+        self._measured = dict()
+        self._running = dict()
+
+    def set_estimate(self, key, memory):
+        """
+        Set the estimated peak memory of the runs of an experiment.
+
+        Args:
+            key (object): the key of the experiment;
+            memory (float): the estimated peak memory in MB.
+
+        """
+        self._estimates[key] = memory
+
+    def get_estimate(self, key):
+        """
+        Args:
+            key (object): the key of the experiment.
+
+        Returns:
+            The peak memory of a run of the experiment in MB, measured if available, estimated otherwise.
+
+        """
+        if key in self._measured:
+            return self._measured[key]
+        return self._estimates.get(key, _process_memory_mb)
+
+    def can_admit(self, key):
+        """
+        Args:
+            key (object): the key of the experiment of the run.
+
+        Returns:
+            True if the run fits the memory budget and the available memory, or if no run is running.
+
+        """
+        if len(self._running) == 0:
+            return True
+
+        required = self._safety_factor * self.get_estimate(key)
+        if sum(self._running.values()) + required > self._budget:
+            return False
+
+        _, available = get_system_memory()
+        return available is None or available - required >= self._min_available
+
+    def admit(self, run_id, key):
+        """
+        Register a run as running.
+
+        Args:
+            run_id (object): the id of the run;
+            key (object): the key of the experiment of the run.
+
+        """
+        self._running[run_id] = self._safety_factor * self.get_estimate(key)
+
+    def release(self, run_id, key, peak_memory=None):
+        """
+        Register a run as completed.
+
+        Args:
+            run_id (object): the id of the run;
+            key (object): the key of the experiment of the run;
+            peak_memory (float, None): the measured peak memory of the run in MB.
+
+        """
+        self._running.pop(run_id, None)
+        if peak_memory is not None:
+            self._measured[key] = max(peak_memory, self._measured.get(key, 0.))
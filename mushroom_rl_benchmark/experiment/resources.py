@@ -0,0 +1,102 @@
+import os
+import multiprocessing
+
+import torch
+
+
+class ResourcePolicy:
+    """
+    Class describing the resources assigned to each worker of a parallel execution: the number of threads
+    used by torch and by the BLAS libraries, and optionally a set of cores to which the worker is pinned.
+    By default, the cores are split evenly among the workers, so that concurrent runs do not oversubscribe
+    the machine.
+
+    """
+    _blas_variables = ['OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS',
+                       'NUMEXPR_NUM_THREADS']
+
+    def __init__(self, n_workers, n_threads=None, n_interop_threads=None, blas_threads=None, pin_cores=False):
+        """
+        Constructor.
+
+        Args:
+            n_workers (int): number of concurrent workers;
+            n_threads (int, None): number of intra-op threads of torch. By default, the number of cores divided
+                by the number of workers;
+            n_interop_threads (int, None): number of inter-op threads of torch. By default, the same as the
+                intra-op threads;
+            blas_threads (int, None): maximum number of threads of the BLAS libraries. By default, the same as
+                the intra-op threads;
+            pin_cores (bool, False): select to pin each worker to a disjoint set of cores.
+
+        """
+        self._cores = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') \
+            else list(range(multiprocessing.cpu_count()))
+        self._n_workers = max(n_workers, 1)
+
+        cores_per_worker = max(len(self._cores) // self._n_workers, 1)
+        self._n_threads = cores_per_worker if n_threads is None else n_threads
+        self._n_interop_threads = self._n_threads if n_interop_threads is None else n_interop_threads
+        self._blas_threads = self._n_threads if blas_threads is None else blas_threads
+        self._pin_cores = pin_cores and hasattr(os, 'sched_setaffinity')
+
+    def get_environment(self):
+        """
+        Returns:
+            The environment variables limiting the threads of the BLAS libraries. They must be set before
+            the libraries are loaded.
+
+        """
+        return {variable: str(self._blas_threads) for variable in self._blas_variables}
+
+    def get_cores(self, worker):
+        """
+        Args:
+            worker (int): the index of the worker.
+
+        Returns:
+            The list of cores assigned to the worker, or None if the workers are not pinned.
+
+        """
+        if not self._pin_cores:
+            return None
+
+        cores_per_worker = max(len(self._cores) // self._n_workers, 1)
+        start = (worker * cores_per_worker) % len(self._cores)
+
+        return self._cores[start:start + cores_per_worker]
+
+    def apply(self, worker=None):
+        """
+        Apply the policy to the current process.
+
+        Args:
+            worker (int, None): the index of the worker, used to select its cores. If None, the process is
+                not pinned.
+
+        """
+        os.environ.update(self.get_environment())
+
+        torch.set_num_threads(self._n_threads)
+        try:
+            torch.set_num_interop_threads(self._n_interop_threads)
+        except RuntimeError:
+            # The inter-op threads can be set only before any parallel work is started in the process
+            pass
+
+        cores = None if worker is None else self.get_cores(worker)
+        if cores is not None:
+            os.sched_setaffinity(0, cores)
+
+    def get_config(self):
+        """
+        Returns:
+            A dictionary with the settings of the policy, to be saved in the experiment configuration.
+
+        """
+        return dict(
+            n_threads=self._n_threads,
+            n_interop_threads=self._n_interop_threads,
+            blas_threads=self._blas_threads,
+            pin_cores=self._pin_cores
+        )
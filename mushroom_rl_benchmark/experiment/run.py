@@ -1,16 +1,24 @@
-import sys
+import time
 import torch
+from pathlib import Path
 import numpy as np
-from copy import deepcopy
 
 from mushroom_rl.core import Core, Logger
-from mushroom_rl.utils.dataset import compute_J, parse_dataset, get_init_states
 
 from tqdm import trange
 
+from .checkpoint import RunCheckpoint, get_replay_memory
+from .memory import get_memory_usage
+from .fit_batching import FitBatching
+from .evaluation import compute_metrics, get_evaluation_schedule, scale_eval_params, VectorizedEvaluator, \
+    AsyncEvaluator
+from .snapshot import save_agent_snapshot, load_agent_snapshot, SnapshotWriter
+
 
 def exec_run(agent_builder, env_builder, n_epochs, n_steps=None, n_episodes=None, n_steps_test=None,
-             n_episodes_test=None, seed=None, save_agent=False, quiet=True, **kwargs):
+             n_episodes_test=None, seed=None, save_agent=False, quiet=True, checkpoint_dir=None,
+             checkpoint_frequency=1, keep_checkpoint=False, n_eval_envs=1, async_eval=False, eval_schedule=None,
+             replay_memory_dir=None, best_agent_path=None, **kwargs):
     """
     Function that handles the execution of an experiment run.
 
@@ -23,10 +31,31 @@ def exec_run(agent_builder, env_builder, n_epochs, n_steps=None, n_episodes=None
         n_steps_test (int, None): number of steps for testing;
         n_episodes_test (int, None): number of episodes for testing;
         seed (int, None): the seed;
-        save_agent (bool, False): select if the agent should be logged or not;
-        quiet (bool, True): select if run should print execution information.
+        save_agent (bool, False): select if the best agent should be saved or not. The best agent is saved as a
+            snapshot, without its replay memory, the state of its optimizers and its target networks;
+        quiet (bool, True): select if run should print execution information;
+        checkpoint_dir (str, None): directory where the run is checkpointed. If a checkpoint exists, the run
+            continues from the last checkpointed epoch, as the uninterrupted run would. The continued run is not
+            identical with the asynchronous evaluation, or with environments using random number generators
+            not exposed by Gym, e.g. the Atari ones. The checkpoint is removed when the run is completed;
+        checkpoint_frequency (int, 1): number of epochs between two checkpoints;
+        keep_checkpoint (bool, False): select to checkpoint the last epoch and keep the checkpoint when the run
+            is completed, so that a later call with more epochs continues the run;
+        n_eval_envs (int, 1): number of environments stepped together during evaluation. If greater than 1,
+            the evaluation runs on dedicated environments, with the actions of all of them drawn in a batch;
+        async_eval (bool, False): select to evaluate a snapshot of the agent after each epoch in a separate
+            process, while the training continues with the next epoch;
+        eval_schedule (dict, None): parameters of the evaluation schedule, see get_evaluation_schedule. If None,
+            the agent is evaluated after every epoch with the full budget;
+        replay_memory_dir (str, None): directory of the files of the disk-backed replay memories. By default,
+            the checkpoint directory is used. The files are removed when the run is completed, unless the
+            checkpoint is kept;
+        best_agent_path (str, None): file where the snapshots of the best agent are written in background,
+            while the run continues. If None, the best agent is returned in the result.
 
     """
+    start_time = time.time()
+
     if seed is not None:
         np.random.seed(seed)
         torch.manual_seed(seed)
@@ -38,6 +67,22 @@ def exec_run(agent_builder, env_builder, n_epochs, n_steps=None, n_episodes=None
     preprocessors = [prepro(mdp.info) for prepro in agent_builder.get_preprocessors()]
 
     logger = Logger(agent.__class__.__name__, use_timestamp=True, seed=seed, results_dir=None)
+
+    checkpoint = RunCheckpoint(checkpoint_dir) if checkpoint_dir is not None else None
+    checkpoint_state = None
+    if checkpoint is not None and checkpoint.exists():
+        checkpoint_state = checkpoint.load()
+        agent_builder = checkpoint_state['agent_builder']
+        agent = checkpoint_state['agent']
+        preprocessors = checkpoint_state['preprocessors']
+        agent_builder.set_eval_mode(agent, False)
+
+    # The disk-backed replay memories are stored with the checkpoint, that is their snapshot
+    replay_memory = get_replay_memory(agent)
+    replay_memory_dir = checkpoint_dir if replay_memory_dir is None else replay_memory_dir
+    if replay_memory_dir is not None and hasattr(replay_memory, 'set_path'):
+        replay_memory.set_path(Path(replay_memory_dir) / 'replay_memory')
+
     core = Core(agent, mdp, preprocessors=preprocessors)
 
     learn_params = dict(
@@ -68,121 +113,307 @@ def exec_run(agent_builder, env_builder, n_epochs, n_steps=None, n_episodes=None
         logger.info('Starting experiment with seed {}'.format(seed))
         logger.strong_line()
 
-    if save_agent:
-        best_agent = deepcopy(agent)
-    J, R, V, E = compute_metrics(core, eval_params, agent_builder, env_builder)
-    best_J, best_R, best_V, best_E = J, R, V, E
-    epoch_J = [J]  # discounted reward
-    epoch_R = [R]  # total reward
-    epoch_V = [V]  # Value function
-    epoch_E = [E]  # policy entropy
-    
-    if not quiet:
-        print_metrics(logger, 0, J, R, V, E)
-
-    for epoch in trange(n_epochs, disable=quiet, leave=False):
-        try:
-            core.learn(**learn_params, **agent_builder.get_fit_params())
-        except:
-            e = sys.exc_info()
-            logger.error('EXECUTION FAILED: EPOCH {} SEED {}'.format(epoch, seed))
-            logger.exception(e)
-            sys.exit()
-
-        J, R, V, E = compute_metrics(core, eval_params, agent_builder, env_builder)
-
-        epoch_J.append(J)
-        epoch_R.append(R)
-        if agent_builder.compute_value_function:
-            epoch_V.append(V)
-        if agent_builder.compute_policy_entropy:
-            epoch_E.append(E)
-
-        # Save if best Agent
-        if J > best_J:
-            best_J = float(J)
-            best_R = float(R)
-            if agent_builder.compute_value_function:
-                best_V = float(V)
-            if agent_builder.compute_policy_entropy:
-                best_E = float(E)
-            if save_agent:
-                best_agent = deepcopy(agent)
+    if checkpoint_state is not None:
+        start_epoch = checkpoint_state['epoch']
+        run_metrics = checkpoint_state['metrics']
+        best_agent = checkpoint_state['best_agent']
 
         if not quiet:
-            print_metrics(logger, epoch+1, J, R, V, E)
+            logger.info('Restored checkpoint at epoch {}'.format(start_epoch))
+    else:
+        start_epoch = 0
+        run_metrics = RunMetrics(agent_builder.compute_value_function, agent_builder.compute_policy_entropy)
+        best_agent = None
+
+    snapshot_writer = None
+    if save_agent and best_agent_path is not None:
+        snapshot_writer = SnapshotWriter(best_agent_path)
+        if best_agent is not None:
+            snapshot_writer.submit(best_agent)
+
+    # The updates of the agents with a replay memory are counted, and batched in the fit batching mode
+    fit_params = agent_builder.get_fit_params()
+    if getattr(agent, '_replay_memory', None) is not None:
+        fit_batch = agent_builder.get_fit_batch()
+        if fit_batch is not None and fit_params['n_steps_per_fit'] is not None:
+            fit_params['n_steps_per_fit'] *= fit_batch
+        core.callbacks_fit.append(FitBatching(agent, run_metrics, n_updates_per_fit=fit_batch or 1))
+
+    vectorized_evaluator = None
+    if async_eval:
+        async_evaluator = AsyncEvaluator(agent_builder, env_builder, eval_params, n_eval_envs, seed)
+    else:
+        async_evaluator = None
+        if n_eval_envs > 1:
+            vectorized_evaluator = VectorizedEvaluator(env_builder, n_eval_envs, preprocessors=preprocessors,
+                                                       seed=seed)
 
-    result = dict(
-        J=np.array(epoch_J),
-        R=np.array(epoch_R),
-        score=[best_J, best_R, best_V])
+    environments = [mdp] + (vectorized_evaluator.environments if vectorized_evaluator is not None else list())
 
-    if save_agent:
-        result['agent'] = best_agent
+    schedule = get_evaluation_schedule(n_epochs, **(eval_schedule if eval_schedule is not None else dict()))
 
-    if agent_builder.compute_value_function:
-        result['V'] = np.array(epoch_V)
-        result['score'].append(best_V)
-    
-    if agent_builder.compute_policy_entropy:
-        result['E'] = np.array(epoch_E)
-        result['score'].append(best_E)
+    def evaluate(epoch, wait=False):
+        if epoch is not None and epoch in schedule:
+            epoch_eval_params = scale_eval_params(eval_params, schedule[epoch])
+            run_metrics.add_eval_budget(schedule[epoch])
+        else:
+            epoch_eval_params = None
+
+        if async_evaluator is not None:
+            if epoch_eval_params is not None:
+                async_evaluator.submit(epoch, agent, preprocessors, epoch_eval_params)
+            return async_evaluator.collect(wait=wait)
+        elif epoch_eval_params is not None:
+            start_time = time.time()
+            metrics = compute_metrics(core, epoch_eval_params, agent_builder, env_builder, vectorized_evaluator)
+            return [(epoch, metrics, None, time.time() - start_time)]
+        else:
+            return list()
+
+    def add_results(results):
+        new_best_agent = None
+        for epoch, metrics, snapshot, eval_time in results:
+            run_metrics.add_eval_time(eval_time)
+            if run_metrics.add(epoch, *metrics) and save_agent:
+                new_best_agent = save_agent_snapshot(agent) if snapshot is None else snapshot
+            if not quiet:
+                print_metrics(logger, epoch, *metrics)
+
+        if new_best_agent is not None and snapshot_writer is not None:
+            snapshot_writer.submit(new_best_agent)
+
+        return new_best_agent
+
+    # The random number generators are restored once the run is set up, as they were at the checkpoint
+    if checkpoint_state is not None:
+        checkpoint.restore_random_state(checkpoint_state, environments)
+
+    # The evaluation process is stopped also when the run fails
+    try:
+        if start_epoch == 0:
+            best_agent = add_results(evaluate(0))
+        best_agent_changed = save_agent
+        last_checkpoint_epoch = start_epoch
+        peak_memory = get_memory_usage()
+
+        for epoch in trange(start_epoch, n_epochs, initial=start_epoch, total=n_epochs, disable=quiet, leave=False):
+            try:
+                core.learn(**learn_params, **fit_params)
+            except Exception:
+                logger.error('EXECUTION FAILED: EPOCH {} SEED {}'.format(epoch, seed))
+                raise
+
+            peak_memory = max(peak_memory, get_memory_usage())
+
+            save_checkpoint = checkpoint is not None and (
+                ((epoch + 1) % checkpoint_frequency == 0 and epoch + 1 < n_epochs)
+                or (keep_checkpoint and epoch + 1 == n_epochs))
+
+            # Before a checkpoint, the pending evaluations are completed to store the metrics of all the epochs
+            new_best_agent = add_results(evaluate(epoch + 1, wait=save_checkpoint))
+            if new_best_agent is not None:
+                best_agent = new_best_agent
+                best_agent_changed = True
+
+            if save_checkpoint:
+                n_new_steps = (epoch + 1 - last_checkpoint_epoch) * n_steps if n_steps is not None else None
+                checkpoint.save(
+                    epoch=epoch + 1,
+                    agent=agent,
+                    agent_builder=agent_builder,
+                    preprocessors=preprocessors,
+                    metrics=run_metrics,
+                    best_agent=best_agent if best_agent_changed else None,
+                    n_new_steps=n_new_steps,
+                    environments=environments
+                )
+                best_agent_changed = False
+                last_checkpoint_epoch = epoch + 1
+
+        if async_evaluator is not None:
+            new_best_agent = add_results(evaluate(None, wait=True))
+            if new_best_agent is not None:
+                best_agent = new_best_agent
+            async_evaluator.close()
+    finally:
+        if async_evaluator is not None:
+            async_evaluator.terminate()
+
+    if checkpoint is not None and not keep_checkpoint:
+        checkpoint.remove()
+    if hasattr(replay_memory, 'remove') and not keep_checkpoint:
+        replay_memory.remove()
+
+    result = run_metrics.get_result()
+    result['seed'] = seed
+    result['run_time_sec'] = time.time() - start_time
+    result['eval_time_sec'] = run_metrics.eval_time
+    result['eval_time_saved_sec'] = run_metrics.get_eval_time_saved(n_epochs + 1)
+    result['peak_memory_mb'] = peak_memory
+    result['n_env_steps'] = run_metrics.n_env_steps
+    result['n_updates'] = run_metrics.n_updates
+    result['update_to_data_ratio'] = run_metrics.get_update_to_data_ratio()
+
+    if snapshot_writer is not None:
+        snapshot_writer.close()
+        result['agent_path'] = str(snapshot_writer.path)
+    elif save_agent:
+        result['agent'] = load_agent_snapshot(best_agent)
 
     return result
 
 
-def compute_metrics(core, eval_params, agent_builder, env_builder):
+class RunMetrics:
     """
-    Function to compute the metrics.
-
-    Args:
-        eval_params (dict): parameters for running the evaluation;
-        agent_builder (AgentBuilder): the agent builder;
-        env_builder (EnvironmentBuilder): environment builder to spawn an environment;
+    Class to collect the metrics of the epochs of a run and the best metrics obtained so far.
 
     """
+    def __init__(self, compute_value_function, compute_policy_entropy):
+        """
+        Constructor.
+
+        Args:
+            compute_value_function (bool): whether the value function is computed or not;
+            compute_policy_entropy (bool): whether the policy entropy is computed or not.
+
+        """
+        self._compute_value_function = compute_value_function
+        self._compute_policy_entropy = compute_policy_entropy
+
+        self.epochs = list()  # evaluated epochs
+        self.J = list()  # discounted reward
+        self.R = list()  # total reward
+        self.V = list()  # Value function
+        self.E = list()  # policy entropy
+        self.best_J, self.best_R, self.best_V, self.best_E = None, None, None, None
 
-    agent_builder.set_eval_mode(core.agent, True)
-    env_builder.set_eval_mode(core.mdp, True)
-    dataset = core.evaluate(**eval_params)
-    agent_builder.set_eval_mode(core.agent, False)
-    env_builder.set_eval_mode(core.mdp, False)
-
-    # Compute J
-    J = np.mean(compute_J(dataset, core.mdp.info.gamma))
-
-    if hasattr(J, 'item'):
-        J = J.item()
-
-    # Compute R
-    R = np.mean(compute_J(dataset))
-
-    if hasattr(R, 'item'):
-        R = R.item()
-    
-    # Compute V
-    V = None
-    if agent_builder.compute_value_function:
-        states = get_init_states(dataset)
-        V = agent_builder.compute_Q(
-            agent=core.agent,
-            states=states)
-
-        if hasattr(V, 'item'):
-            V = V.item()
-    
-    # Compute Policy Entropy
-    E = None
-    if agent_builder.compute_policy_entropy:
-        if agent_builder.compute_entropy_with_states:
-            E = core.agent.policy.entropy(parse_dataset(dataset)[0])
-        else:
-            E = core.agent.policy.entropy()
+        self.eval_time = 0.
+        self.eval_budget = 0.
+
+        self.n_env_steps = 0
+        self.n_updates = 0
+
+    def add(self, epoch, J, R, V, E):
+        """
+        Add the metrics of the next evaluated epoch.
+
+        Args:
+            epoch (int): the evaluated epoch;
+            J (float): the value of J;
+            R (float): the value of R;
+            V (float): the value of V;
+            E (float): the value of E.
+
+        Returns:
+            True if the metrics are the best obtained so far, False otherwise.
+
+        """
+        if len(self.J) == 0:
+            self.epochs, self.J, self.R, self.V, self.E = [epoch], [J], [R], [V], [E]
+            self.best_J, self.best_R, self.best_V, self.best_E = J, R, V, E
+
+            return True
+
+        self.epochs.append(epoch)
+        self.J.append(J)
+        self.R.append(R)
+        if self._compute_value_function:
+            self.V.append(V)
+        if self._compute_policy_entropy:
+            self.E.append(E)
+
+        if J > self.best_J:
+            self.best_J = float(J)
+            self.best_R = float(R)
+            if self._compute_value_function:
+                self.best_V = float(V)
+            if self._compute_policy_entropy:
+                self.best_E = float(E)
+
+            return True
+
+        return False
+
+    def add_eval_budget(self, fraction):
+        """
+        Add the budget of a scheduled evaluation.
+
+        Args:
+            fraction (float): fraction of the full evaluation budget.
+
+        """
+        self.eval_budget += fraction
+
+    def add_eval_time(self, eval_time):
+        """
+        Add the time spent in a completed evaluation.
+
+        Args:
+            eval_time (float): the evaluation time in seconds.
+
+        """
+        self.eval_time += eval_time
+
+    def add_updates(self, n_env_steps, n_updates):
+        """
+        Add the environment steps and the updates of a fit of the agent.
+
+        Args:
+            n_env_steps (int): the number of environment steps of the fit;
+            n_updates (int): the number of updates of the agent.
+
+        """
+        self.n_env_steps += n_env_steps
+        self.n_updates += n_updates
+
+    def get_update_to_data_ratio(self):
+        """
+        Returns:
+            The number of updates of the agent per environment step, None if no step is counted.
+
+        """
+        if self.n_env_steps == 0:
+            return None
+
+        return self.n_updates / self.n_env_steps
+
+    def get_eval_time_saved(self, n_full_evaluations):
+        """
+        Estimate the evaluation time saved with respect to evaluating with the full budget every epoch.
+
+        Args:
+            n_full_evaluations (int): number of full evaluations of the run without a schedule.
+
+        Returns:
+            The estimated time saved in seconds.
+
+        """
+        if self.eval_budget == 0:
+            return 0.
+
+        return self.eval_time / self.eval_budget * (n_full_evaluations - self.eval_budget)
+
+    def get_result(self):
+        """
+        Returns:
+            The dictionary with the metrics of the epochs and the score of the run.
+
+        """
+        result = dict(
+            epochs=np.array(self.epochs),
+            J=np.array(self.J),
+            R=np.array(self.R),
+            score=[self.best_J, self.best_R, self.best_V])
+
+        if self._compute_value_function:
+            result['V'] = np.array(self.V)
+            result['score'].append(self.best_V)
+
+        if self._compute_policy_entropy:
+            result['E'] = np.array(self.E)
+            result['score'].append(self.best_E)
 
-    if hasattr(E, 'item'):
-        E = E.item()
-    
-    return J, R, V, E
+        return result
 
 
 def print_metrics(logger, epoch, J, R, V, E):
@@ -0,0 +1,110 @@
+from pathlib import Path
+
+from mushroom_rl_benchmark.core.logger import BenchmarkLogger
+
+from .run import exec_run
+
+
+_array_keys = ['epochs', 'J', 'R', 'V', 'E']
+
+
+def exec_run_to_dir(agent_builder, env_builder, run_dir=None, **run_params):
+    """
+    Execute a run and save its results in its own run directory, as done by the runs executed with SLURM.
+    The best agent is written to the run directory during the run.
+
+    Args:
+        agent_builder (AgentBuilder): agent builder to spawn an agent;
+        env_builder (EnvironmentBuilder): environment builder to spawn an environment;
+        run_dir (str, None): the run directory. If None, the results are not saved and the whole result of
+            the run is returned;
+        **run_params: parameters of exec_run.
+
+    Returns:
+        The summary of the run, i.e. the result without the metrics of the epochs and the best agent, with
+        the run directory.
+
+    """
+    if run_dir is None:
+        return exec_run(agent_builder, env_builder, **run_params)
+
+    run_dir = Path(run_dir)
+    logger = BenchmarkLogger(log_dir=run_dir.parent, log_id=run_dir.name, use_timestamp=False)
+    if run_params.get('save_agent', False):
+        run_params['best_agent_path'] = str(logger.get_path('best_agent.msh'))
+
+    result = exec_run(agent_builder, env_builder, **run_params)
+    save_run_artifacts(logger, result, agent_builder.compute_policy_entropy)
+
+    summary = {key: value for key, value in result.items() if key not in _array_keys + ['agent']}
+    summary['run_dir'] = str(run_dir)
+
+    return summary
+
+
+def save_run_artifacts(logger, result, compute_policy_entropy):
+    """
+    Save the result of a run in its run directory.
+
+    Args:
+        logger (BenchmarkLogger): the logger of the run directory;
+        result (dict): the dictionary returned by the execution of the run;
+        compute_policy_entropy (bool): whether the policy entropy is computed or not.
+
+    """
+    logger.save_seeds([result['seed']])
+    logger.save_epochs([result['epochs']])
+    logger.save_J([result['J']])
+    logger.save_R([result['R']])
+    if 'V' in result:
+        logger.save_V([result['V']])
+    if compute_policy_entropy:
+        logger.save_entropy([result['E']])
+    new_score = result['score']
+
+    stats = dict(
+        best_J=new_score[0],
+        best_R=new_score[1],
+        best_Q=new_score[2],
+        run_time_sec=result['run_time_sec'],
+        eval_time_sec=result['eval_time_sec'],
+        eval_time_saved_sec=result['eval_time_saved_sec'],
+        peak_memory_mb=result['peak_memory_mb'])
+
+    if result['n_env_steps'] > 0:
+        stats.update(dict(n_env_steps=result['n_env_steps'], n_updates=result['n_updates'],
+                          update_to_data_ratio=result['update_to_data_ratio']))
+
+    if compute_policy_entropy:
+        stats.update(dict(best_E=new_score[-1]))
+    logger.save_stats(stats=stats)
+
+    if 'agent' in result:
+        logger.save_best_agent(result['agent'])
+
+
+def load_run_result(summary):
+    """
+    Rebuild the result of a run from its summary, loading the metrics of the epochs from its run directory.
+    The best agent is not loaded, its path is kept in the result.
+
+    Args:
+        summary (dict): the summary returned by exec_run_to_dir.
+
+    Returns:
+        The result of the run.
+
+    """
+    run_dir = Path(summary['run_dir'])
+    logger = BenchmarkLogger(log_dir=run_dir.parent, log_id=run_dir.name, use_timestamp=False)
+
+    result = dict(summary)
+    result['epochs'] = logger.load_epochs()[0]
+    result['J'] = logger.load_J()[0]
+    result['R'] = logger.load_R()[0]
+    if logger.exists_value_function():
+        result['V'] = logger.load_V()[0]
+    if logger.exists_policy_entropy():
+        result['E'] = logger.load_entropy()[0]
+
+    return result
@@ -4,6 +4,7 @@ from pathlib import Path
 
 from mushroom_rl.core import Logger
 from mushroom_rl_benchmark import BenchmarkLogger, BenchmarkVisualizer
+from mushroom_rl_benchmark.core.reader import ExperimentReader
 from mushroom_rl_benchmark.experiment.slurm import read_arguments_aggregate
 
 
@@ -30,12 +31,14 @@ def aggregate_results(res_dir, res_id, console_log_dir=None):
 
     run_dirs = list(work_dir.glob('{}_*'.format(dir_name)))
 
-    has_entropy = (work_dir / f'{dir_name}_0/entropy.pkl').exists()
+    has_entropy = any((work_dir / f'{dir_name}_0' / file).exists() for file in ['entropy.pkl', 'entropy.npy'])
     console.info(f'has entropy: {has_entropy}')
 
-    has_value = (work_dir / f'{dir_name}_0/V.pkl').exists()
+    has_value = any((work_dir / f'{dir_name}_0' / file).exists() for file in ['V.pkl', 'V.npy'])
     console.info(f'has value function: {has_value}')
 
+    seeds = list()
+    epochs = list()
     J = list()
     R = list()
     V = list()
@@ -43,14 +46,24 @@ def aggregate_results(res_dir, res_id, console_log_dir=None):
     best_J = float("-inf")
     best_stats = None
     best_agent = None
+    eval_time = dict(eval_time_sec=0., eval_time_saved_sec=0.)
+    peak_memory_mb = 0.
+    updates = dict(n_env_steps=0, n_updates=0)
 
     skip_cnt = 0
 
     for run_dir in run_dirs: 
-        logger = BenchmarkLogger(log_dir=str(run_dir.parent), log_id=str(run_dir.name), use_timestamp=False)
+        logger = ExperimentReader(run_dir)
 
         try:
-            J.extend(logger.load_J())
+            run_J = logger.load_J()
+            if logger.exists_seeds():
+                run_seeds = logger.load_seeds()
+            else:
+                run_seeds = [int(run_dir.name.split('_')[-1])]
+            J.extend(run_J)
+            seeds.extend(run_seeds)
+            epochs.extend(logger.load_epochs())
             R.extend(logger.load_R())
             if has_value:
                 V.extend(logger.load_V())
@@ -58,6 +71,11 @@ def aggregate_results(res_dir, res_id, console_log_dir=None):
                 E.extend(logger.load_entropy())
             if logger.exists_stats():
                 stats = logger.load_stats()
+                for key in eval_time:
+                    eval_time[key] += stats.get(key, 0.)
+                peak_memory_mb = max(peak_memory_mb, stats.get('peak_memory_mb', 0.))
+                for key in updates:
+                    updates[key] += stats.get(key, 0)
                 if stats['best_J'] > best_J:
                     best_stats = stats
                     if logger.exists_best_agent():
@@ -74,6 +92,8 @@ def aggregate_results(res_dir, res_id, console_log_dir=None):
 
         logger = BenchmarkLogger(log_dir=res_dir, log_id=res_id, use_timestamp=False)
 
+        logger.save_seeds(seeds)
+        logger.save_epochs(epochs)
         logger.save_J(J)
         logger.save_R(R)
         if has_value:
@@ -81,6 +101,11 @@ def aggregate_results(res_dir, res_id, console_log_dir=None):
         if has_entropy:
             logger.save_entropy(E)
         if best_stats is not None:
+            best_stats.update(eval_time)
+            best_stats['peak_memory_mb'] = peak_memory_mb
+            if updates['n_env_steps'] > 0:
+                best_stats.update(updates)
+                best_stats['update_to_data_ratio'] = updates['n_updates'] / updates['n_env_steps']
             logger.save_stats(best_stats)
         if best_agent is not None:
             logger.save_best_agent(best_agent)
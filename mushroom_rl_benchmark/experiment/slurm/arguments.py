@@ -1,3 +1,4 @@
+import yaml
 import argparse
 
 
@@ -29,6 +30,11 @@ def read_arguments_run(arg_string=None):
     exp_args.add_argument('--n_steps_test', type=int, default=None)
     exp_args.add_argument("--n_episodes_test", type=int, default=None)
     exp_args.add_argument('--seed', type=int, default=None)
+    exp_args.add_argument('--checkpoint_frequency', type=int, default=0)
+    exp_args.add_argument('--keep_checkpoint', type=_to_bool, default=False)
+    exp_args.add_argument('--n_eval_envs', type=int, default=1)
+    exp_args.add_argument('--async_eval', type=_to_bool, default=False)
+    exp_args.add_argument('--eval_schedule', type=yaml.safe_load, default=None)
 
     if arg_string is not None:
         args = vars(parser.parse_args(arg_string))
@@ -41,6 +47,10 @@ def read_arguments_run(arg_string=None):
     return log_dir, args
 
 
+def _to_bool(value):
+    return value in ['True', 'true', '1']
+
+
 def read_arguments_aggregate(arg_string=None):
     """
     Parse the arguments for the aggregate script.
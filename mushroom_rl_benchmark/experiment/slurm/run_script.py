@@ -1,7 +1,7 @@
 from pathlib import Path
 
 from mushroom_rl_benchmark import BenchmarkLogger
-from mushroom_rl_benchmark.experiment import exec_run
+from mushroom_rl_benchmark.experiment import exec_run_to_dir
 from mushroom_rl_benchmark.experiment.slurm import read_arguments_run
 
 if __name__ == '__main__':
@@ -20,32 +20,13 @@ if __name__ == '__main__':
         use_timestamp=False
     )
 
-    logger.info('Starting experiment.')
-
-    result = exec_run(agent_builder, env_builder, **run_args)
-
-    logger.info('Saving result.')
-
-    cmp_E = agent_builder.compute_policy_entropy
+    if run_args['checkpoint_frequency'] > 0:
+        run_args['checkpoint_dir'] = str(logger.get_checkpoint_path(run_args['seed']))
+    elif getattr(agent_builder, 'replay_memory', None) == 'disk':
+        run_args['replay_memory_dir'] = str(logger.get_checkpoint_path(run_args['seed']))
 
-    logger.save_J([result['J']])
-    logger.save_R([result['R']])
-    logger.save_V([result['V']])
-    if cmp_E:
-        logger.save_entropy([result['E']])
-    new_score = result['score']
-
-    stats = dict(
-        best_J=new_score[0],
-        best_R=new_score[1],
-        best_Q=new_score[2])
-
-    if cmp_E:
-        stats.update(dict(best_E=new_score[3]))
-    logger.save_stats(stats=stats)
+    logger.info('Starting experiment.')
 
-    if 'agent' in result:
-        new_agent = result['agent']
-        logger.save_best_agent(new_agent)
+    exec_run_to_dir(agent_builder, env_builder, run_dir=str(logger.get_path()), **run_args)
 
     logger.info('Finished execution.')
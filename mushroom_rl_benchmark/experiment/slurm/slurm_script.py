@@ -27,7 +27,7 @@ def create_slurm_script(slurm_path, slurm_script_name='slurm.sh', **slurm_params
 
 
 def generate_slurm(exp_name, exp_dir_slurm, python_file, gres=None, project_name=None, partition=None, n_exp=1,
-                   max_concurrent_runs=None, memory=2000, hours=24, minutes=0, seconds=0):
+                   seeds=None, max_concurrent_runs=None, memory=2000, hours=24, minutes=0, seconds=0):
     """
     Function to generate the slurm file content.
 
@@ -39,6 +39,8 @@ def generate_slurm(exp_name, exp_dir_slurm, python_file, gres=None, project_name
         project_name (str, None): name of the slurm project;
         partition (str, None): name of the partition to be used.
         n_exp (int, 1): number of experiments in the slurm array;
+        seeds (list, None): seeds of the experiments in the slurm array. If specified, n_exp is ignored,
+            otherwise the seeds from 0 to n_exp - 1 are used;
         max_concurrent_runs (int, None): maximum number of runs that should be executed
             in parallel on the SLURM cluster;
         memory (int, 2000): memory limit in mega bytes (MB) for the slurm jobs;
@@ -64,8 +66,11 @@ def generate_slurm(exp_name, exp_dir_slurm, python_file, gres=None, project_name
     if gres:
         gres_option = f'#SBATCH --gres={gres}\n'
 
-    if n_exp > 1:
-        job_array_option += '#SBATCH -a 0-' + str(n_exp - 1) + (
+    if seeds is None:
+        seeds = list(range(n_exp))
+
+    if len(seeds) > 1:
+        job_array_option += '#SBATCH -a ' + to_array_indexes(seeds) + (
             '%{}'.format(max_concurrent_runs) if max_concurrent_runs is not None else '') + '\n'
 
         text_output_file = '#SBATCH -o ' + exp_dir_slurm + '/%A_%a.out\n'
@@ -74,7 +79,7 @@ def generate_slurm(exp_name, exp_dir_slurm, python_file, gres=None, project_name
     else:
         text_output_file = '#SBATCH -o ' + exp_dir_slurm + '/%A.out\n'
         text_output_file += '#SBATCH -e ' + exp_dir_slurm + '/%A.err\n'
-        seed_specification = '--seed 0'
+        seed_specification = '--seed {}'.format(seeds[0])
 
     code = f"""\
 #!/usr/bin/env bash
@@ -113,3 +118,27 @@ def to_duration(hours, minutes, seconds):
     s = "0" + str(seconds) if seconds < 10 else str(seconds)
 
     return h + ":" + m + ":" + s
+
+
+def to_array_indexes(seeds):
+    """
+    Convert a list of seeds into the compact index specification of a slurm job array, e.g. "0-3,5,7-8".
+
+    Args:
+        seeds (list): the seeds of the job array.
+
+    Returns:
+        The index specification as string.
+
+    """
+    seeds = sorted(set(seeds))
+    ranges = list()
+    start = prev = seeds[0]
+
+    for seed in seeds[1:] + [None]:
+        if seed is None or seed != prev + 1:
+            ranges.append(str(start) if start == prev else '{}-{}'.format(start, prev))
+            start = seed
+        prev = seed
+
+    return ','.join(ranges)
@@ -0,0 +1,124 @@
+import os
+from io import BytesIO
+from pathlib import Path
+from zipfile import ZipFile
+from concurrent.futures import ThreadPoolExecutor
+
+from mushroom_rl.core import Serializable
+
+
+_excluded_attributes = ['_replay_memory', '_optimizer', '_alpha_optim', 'target_approximator',
+                        '_target_actor_approximator', '_target_critic_approximator']
+
+
+def save_agent_snapshot(agent):
+    """
+    Serialize the agent, keeping only the data needed to evaluate it. The replay memory, the state of the
+    optimizers and the target networks are not saved, and are set to None when the snapshot is loaded.
+
+    Args:
+        agent (Agent): the agent to save.
+
+    Returns:
+        The serialized agent, in the format of the files saved by MushroomRL.
+
+    """
+    excluded = list()
+    _exclude_attributes(agent, excluded)
+
+    try:
+        buffer = BytesIO()
+        with ZipFile(buffer, 'w') as zip_file:
+            agent.save_zip(zip_file, full_save=False)
+    finally:
+        for obj, save_attributes in excluded:
+            obj._save_attributes = save_attributes
+
+    return buffer.getvalue()
+
+
+def load_agent_snapshot(snapshot):
+    """
+    Args:
+        snapshot (bytes): the serialized agent.
+
+    Returns:
+        The agent loaded from the snapshot.
+
+    """
+    with ZipFile(BytesIO(snapshot), 'r') as zip_file:
+        return Serializable.load_zip(zip_file)
+
+
+class SnapshotWriter:
+    """
+    Class writing the snapshots of an agent to a file in a background thread, while the run continues.
+    Each snapshot replaces the previous one, and a snapshot submitted while another is being written is
+    written afterwards.
+
+    """
+    def __init__(self, path):
+        """
+        Constructor.
+
+        Args:
+            path (str): path of the file of the snapshots.
+
+        """
+        self._path = Path(path)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._futures = list()
+
+    @property
+    def path(self):
+        """
+        Returns:
+            The path of the file of the snapshots.
+
+        """
+        return self._path
+
+    def submit(self, snapshot):
+        """
+        Submit a snapshot to be written.
+
+        Args:
+            snapshot (bytes): the serialized agent.
+
+        """
+        self._futures = [future for future in self._futures if not future.done() or future.exception()]
+        self._futures.append(self._executor.submit(self._write, snapshot))
+
+    def close(self):
+        """
+        Wait for the pending snapshots to be written, and stop the background thread.
+
+        """
+        self._executor.shutdown(wait=True)
+        for future in self._futures:
+            future.result()
+        self._futures = list()
+
+    def _write(self, snapshot):
+        # The file is replaced only when complete, so that it always holds a valid snapshot
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_name(self._path.name + '.tmp')
+        with tmp_path.open('wb') as f:
+            f.write(snapshot)
+        os.replace(tmp_path, self._path)
+
+
+def _exclude_attributes(obj, excluded):
+    if not isinstance(obj, Serializable) or any(obj is excluded_obj for excluded_obj, _ in excluded):
+        return
+
+    save_attributes = obj._save_attributes
+    excluded.append((obj, save_attributes))
+    obj._save_attributes = {att: 'none' if att in _excluded_attributes else method
+                            for att, method in save_attributes.items()}
+
+    for att, method in obj._save_attributes.items():
+        if method.rstrip('!') == 'mushroom':
+            value = getattr(obj, att, None)
+            for element in value if isinstance(value, list) else [value]:
+                _exclude_attributes(element, excluded)
@@ -0,0 +1,107 @@
+import os
+import time
+import signal
+import traceback
+import multiprocessing
+
+
+def exec_supervised_run(run_fn, agent_builder, env_builder, max_retries=0, run_timeout=None, **run_params):
+    """
+    Execute a run, isolating its failures from the other runs. A failed run is retried, and when all the
+    attempts fail, a failure record is returned instead of the result.
+
+    Args:
+        run_fn (function): the function executing the run, i.e. exec_run or exec_run_to_dir;
+        agent_builder (AgentBuilder): agent builder to spawn an agent;
+        env_builder (EnvironmentBuilder): environment builder to spawn an environment;
+        max_retries (int, 0): number of times a failed run is executed again. The runs with a checkpoint
+            continue from it;
+        run_timeout (float, None): wall-clock time limit of each attempt in seconds. If set, each attempt is
+            executed in a child process, that is killed when the time limit expires;
+        **run_params: parameters of the run function.
+
+    Returns:
+        The result of the run or, if all the attempts failed, the failure record of the run, a dictionary
+        with the seed, the failed flag, the number of attempts and the error of the last attempt.
+
+    """
+    error = None
+    for attempt in range(max_retries + 1):
+        if run_timeout is None:
+            try:
+                return run_fn(agent_builder.copy(), env_builder.copy(), **run_params)
+            except Exception:
+                error = traceback.format_exc()
+        else:
+            result, error = _exec_timed_run(run_fn, agent_builder, env_builder, run_timeout, run_params)
+            if error is None:
+                return result
+
+    return dict(seed=run_params.get('seed'), failed=True, n_attempts=max_retries + 1, error=error)
+
+
+def is_failed_run(result):
+    """
+    Args:
+        result (dict): the result of a run.
+
+    Returns:
+        True if the result is the failure record of a run, False otherwise.
+
+    """
+    return result.get('failed', False)
+
+
+def _exec_timed_run(run_fn, agent_builder, env_builder, run_timeout, run_params):
+    # Forking the caller is not safe, as it may already use torch or other threads. Where possible, the run
+    # process is forked by a single-threaded server that has already imported the benchmark package
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['mushroom_rl_benchmark'])
+    else:
+        context = multiprocessing.get_context('spawn')
+
+    result_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(target=_run_process, args=(child_conn, run_fn, agent_builder, env_builder, run_params))
+    process.start()
+    child_conn.close()
+
+    start_time = time.time()
+    if result_conn.poll(run_timeout):
+        try:
+            result, error = result_conn.recv()
+        except EOFError:
+            process.join()
+            result, error = None, 'The run process terminated with exit code {}'.format(process.exitcode)
+            _kill_process_group(process)
+    else:
+        _kill_process_group(process)
+        result, error = None, 'The run timed out after {:.0f} seconds'.format(time.time() - start_time)
+
+    process.join()
+    result_conn.close()
+
+    return result, error
+
+
+def _kill_process_group(process):
+    # The processes started by the run, e.g. the asynchronous evaluator, are in the process group of the run
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        pass
+
+    if process.is_alive():
+        process.kill()
+
+
+def _run_process(child_conn, run_fn, agent_builder, env_builder, run_params):
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+
+    try:
+        child_conn.send((run_fn(agent_builder, env_builder, **run_params), None))
+    except Exception:
+        child_conn.send((None, traceback.format_exc()))
+    finally:
+        child_conn.close()
@@ -0,0 +1,246 @@
+import os
+import queue
+import pickle
+import traceback
+import multiprocessing
+import multiprocessing.util
+from collections import deque
+
+from tqdm import tqdm
+
+from .run_artifacts import exec_run_to_dir
+from .supervisor import exec_supervised_run
+
+
+class WorkerPool:
+    """
+    Class implementing a pool of long-lived processes executing the runs of the experiments. With the
+    forkserver start method, the workers are forked from a server process that has already imported the heavy
+    modules. The builders of an experiment are registered once and sent to each worker only the first time it
+    executes one of the runs of the experiment.
+
+    The workers are stopped by close, or when the pool is garbage collected or the interpreter exits.
+
+    """
+    _preload_modules = ['mushroom_rl_benchmark']
+
+    def __init__(self, n_workers=None, start_method='forkserver', preload=None, resources=None):
+        """
+        Constructor.
+
+        Args:
+            n_workers (int, None): number of worker processes. By default it uses the number of cores;
+            start_method (str, 'forkserver'): multiprocessing start method of the workers. If the method is
+                not available, the workers are spawned;
+            preload (list, None): modules imported by the forkserver before forking the workers. By default
+                the benchmark package, with torch and MushroomRL, is imported;
+            resources (ResourcePolicy, None): the resources assigned to each worker. If None, the threads of
+                the workers are not limited.
+
+        """
+        if n_workers is None or n_workers <= 0:
+            n_workers = multiprocessing.cpu_count()
+
+        if start_method not in multiprocessing.get_all_start_methods():
+            start_method = 'spawn'
+        context = multiprocessing.get_context(start_method)
+        if start_method == 'forkserver':
+            context.set_forkserver_preload(self._preload_modules if preload is None else preload)
+
+        self._context = context
+        self._resources = resources
+        self._result_queue = context.Queue()
+        self._task_queues = [None for _ in range(n_workers)]
+        self._workers = [None for _ in range(n_workers)]
+        self._start_workers(range(n_workers))
+
+        # The workers are not daemonic, as they start the processes of the runs, and would otherwise be joined
+        # forever at exit
+        self._finalizer = multiprocessing.util.Finalize(self, _stop_workers, args=(self._task_queues, self._workers),
+                                                        exitpriority=10)
+
+        self._builders = dict()
+        self._worker_builders = [set() for _ in range(n_workers)]
+
+    @property
+    def n_workers(self):
+        """
+        Returns:
+            The number of worker processes.
+
+        """
+        return len(self._workers)
+
+    def register(self, agent_builder, env_builder):
+        """
+        Register the builders of an experiment. The builders are serialized once, and copied by the workers
+        before each run.
+
+        Args:
+            agent_builder (AgentBuilder): the agent builder of the experiment;
+            env_builder (EnvironmentBuilder): the environment builder of the experiment.
+
+        Returns:
+            The id used to reference the builders in the runs.
+
+        """
+        builder_id = len(self._builders)
+        self._builders[builder_id] = pickle.dumps((agent_builder, env_builder), protocol=pickle.HIGHEST_PROTOCOL)
+
+        return builder_id
+
+    def run(self, runs, admission=None):
+        """
+        Execute the runs on the workers, keeping all the workers busy until no run is left.
+
+        Args:
+            runs (list): list of (builder id, parameters of exec_supervised_run) tuples. The runs appended to
+                the list while the results are consumed are executed as well;
+            admission (MemoryAdmission, None): the admission control of the runs, using the builder ids as
+                experiment keys. If None, a run is started as soon as a worker is idle.
+
+        Returns:
+            A generator of the (index of the run, result) tuples, in order of completion. When a worker
+            terminates during a run, e.g. killed by the OOM killer, the result is the failure record of the run,
+            and the worker is replaced.
+
+        """
+        pending = deque(enumerate(runs))
+        n_queued = len(runs)
+        idle_workers = list(reversed(range(self.n_workers)))
+        running = dict()
+
+        with tqdm(total=len(pending), leave=False) as progress_bar:
+            while len(pending) > 0 or len(running) > 0 or n_queued < len(runs):
+                if n_queued < len(runs):
+                    pending.extend((run_id, runs[run_id]) for run_id in range(n_queued, len(runs)))
+                    n_queued = len(runs)
+                    progress_bar.total = n_queued
+                    progress_bar.refresh()
+
+                while len(pending) > 0 and len(idle_workers) > 0:
+                    run = self._pop_admissible(pending, admission)
+                    if run is None:
+                        break
+                    worker = idle_workers.pop()
+                    self._submit(worker, *run)
+                    running[worker] = run[0]
+
+                try:
+                    completed = [self._result_queue.get(timeout=1)]
+                except queue.Empty:
+                    completed = self._replace_dead_workers(running)
+
+                for worker, run_id, result, error in completed:
+                    idle_workers.append(worker)
+                    del running[worker]
+                    if admission is not None:
+                        admission.release(run_id, runs[run_id][0],
+                                          None if result is None else result.get('peak_memory_mb'))
+
+                    # The errors outside of the supervised run are recorded as failures of the run
+                    if error is not None:
+                        result = dict(seed=runs[run_id][1].get('seed'), failed=True, n_attempts=1, error=error)
+
+                    progress_bar.update(1)
+                    yield run_id, result
+
+    def close(self):
+        """
+        Stop the worker processes.
+
+        """
+        self._finalizer()
+
+    def _start_workers(self, workers):
+        # The BLAS threads are read when the libraries are loaded, i.e. by the forkserver preloading them
+        environment = dict() if self._resources is None else self._resources.get_environment()
+        previous_environment = {variable: os.environ.get(variable) for variable in environment}
+        os.environ.update(environment)
+        try:
+            for worker in workers:
+                self._task_queues[worker] = self._context.Queue()
+                self._workers[worker] = self._context.Process(
+                    target=_run_worker, args=(worker, self._task_queues[worker], self._result_queue, self._resources))
+                self._workers[worker].start()
+        finally:
+            for variable, value in previous_environment.items():
+                if value is None:
+                    del os.environ[variable]
+                else:
+                    os.environ[variable] = value
+
+    def _replace_dead_workers(self, running):
+        # The run of a worker killed e.g. by a segmentation fault or by the OOM killer is recorded as failed,
+        # and the worker is replaced by a new one, that receives the builders again
+        dead_workers = [worker for worker, process in enumerate(self._workers) if not process.is_alive()]
+
+        completed = [(worker, running[worker], None,
+                      'The worker process terminated with exit code {}'.format(self._workers[worker].exitcode))
+                     for worker in dead_workers if worker in running]
+
+        self._start_workers(dead_workers)
+        for worker in dead_workers:
+            self._worker_builders[worker] = set()
+
+        return completed
+
+    @staticmethod
+    def _pop_admissible(pending, admission):
+        # Runs of an experiment that does not fit are skipped, as long as runs of other experiments fit
+        rejected = set()
+        for i, (run_id, run) in enumerate(pending):
+            builder_id = run[0]
+            if builder_id in rejected:
+                continue
+
+            if admission is None or admission.can_admit(builder_id):
+                del pending[i]
+                if admission is not None:
+                    admission.admit(run_id, builder_id)
+                return run_id, run
+
+            rejected.add(builder_id)
+
+        return None
+
+    def _submit(self, worker, run_id, run):
+        builder_id, run_params = run
+
+        if builder_id in self._worker_builders[worker]:
+            builders = None
+        else:
+            builders = self._builders[builder_id]
+            self._worker_builders[worker].add(builder_id)
+
+        self._task_queues[worker].put((run_id, builder_id, builders, run_params))
+
+
+def _stop_workers(task_queues, workers, timeout=10.):
+    # The workers still executing a run, e.g. when the interpreter exits on an error, are terminated
+    for task_queue, worker in zip(task_queues, workers):
+        if worker.is_alive():
+            task_queue.put(None)
+    for worker in workers:
+        worker.join(timeout)
+        if worker.is_alive():
+            worker.terminate()
+            worker.join()
+
+
+def _run_worker(worker, task_queue, result_queue, resources):
+    if resources is not None:
+        resources.apply(worker)
+
+    builders = dict()
+
+    for run_id, builder_id, serialized_builders, run_params in iter(task_queue.get, None):
+        try:
+            if serialized_builders is not None:
+                builders[builder_id] = pickle.loads(serialized_builders)
+            agent_builder, env_builder = builders[builder_id]
+
+            result = exec_supervised_run(exec_run_to_dir, agent_builder, env_builder, **run_params)
+            result_queue.put((worker, run_id, result, None))
+        except Exception:
+            result_queue.put((worker, run_id, None, traceback.format_exc()))
@@ -2,6 +2,7 @@ from .primitive import object_to_primitive, dictionary_to_primitive
 from .sweep import build_sweep_list, build_sweep_dict, generate_sweep, generate_sweep_params
 from .metrics import max_metric, convergence_metric
 from .utils import extract_arguments
+from .plot import plot_mean_conf
 
 
 __all__ = [
@@ -13,5 +14,6 @@ __all__ = [
     'generate_sweep_params',
     'max_metric',
     'convergence_metric',
-    'extract_arguments'
+    'extract_arguments',
+    'plot_mean_conf'
 ]
\ No newline at end of file
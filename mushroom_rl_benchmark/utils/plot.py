@@ -0,0 +1,30 @@
+import numpy as np
+
+from mushroom_rl.utils.plot import get_mean_and_confidence
+
+
+def plot_mean_conf(data, ax, x=None, color='blue', line='-', facecolor=None, alpha=0.4, label=None):
+    """
+    Method to plot mean and confidence interval for data on matplotlib axes, at the given epochs.
+
+    Args:
+        data (np.ndarray): Array of experiment data of shape (n_runs, n_evaluations);
+        ax (plt.Axes): matplotlib axes where to create the curve;
+        x (np.ndarray, None): the evaluated epochs. If None, one evaluation per epoch is assumed;
+        color (str, 'blue'): matplotlib color identifier for the mean curve;
+        line (str, '-'): matplotlib line type to be used for the mean curve;
+        facecolor (str, None): matplotlib color identifier for the confidence interval;
+        alpha (float, 0.4): transparency of the confidence interval;
+        label (str, None): legend label for the plotted curve.
+
+    """
+    facecolor = color if facecolor is None else facecolor
+
+    mean, conf = get_mean_and_confidence(np.array(data))
+    upper_bound = mean + conf
+    lower_bound = mean - conf
+
+    x = np.arange(np.size(mean)) if x is None else np.array(x)
+
+    ax.plot(x, mean, color=color, linestyle=line, label=label)
+    ax.fill_between(x, upper_bound, lower_bound, facecolor=facecolor, alpha=alpha)
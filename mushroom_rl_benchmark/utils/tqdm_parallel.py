@@ -5,9 +5,16 @@ from tqdm import tqdm
 class TqdmParallel(joblib.Parallel):
     def __call__(self, *args, total=None, **kwargs):
         self._total = total
+        if self.return_generator:
+            return self._generator_call(*args, **kwargs)
+
         with tqdm(total=total, leave=False) as self._progress_bar:
             return joblib.Parallel.__call__(self, *args, **kwargs)
 
+    def _generator_call(self, *args, **kwargs):
+        with tqdm(total=self._total, leave=False) as self._progress_bar:
+            yield from joblib.Parallel.__call__(self, *args, **kwargs)
+
     def print_progress(self):
         if self._total is None:
             self._progress_bar.total = self.n_dispatched_tasks
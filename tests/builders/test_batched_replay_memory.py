@@ -0,0 +1,71 @@
+import pickle
+
+import numpy as np
+
+from mushroom_rl.utils.replay_memory import ReplayMemory
+
+from mushroom_rl_benchmark.builders import DQNBuilder, DoubleDQNBuilder, DDPGBuilder, TD3Builder, SACBuilder
+from mushroom_rl_benchmark.builders.memory import BatchedReplayMemory
+
+
+def _get_dataset(n):
+    return [(np.array([float(i)]), np.array([i]), float(i), np.array([i + 1.]), False, False) for i in range(n)]
+
+
+def _get_memory(n_batches):
+    replay_memory = ReplayMemory(1, 100)
+    replay_memory.add(_get_dataset(50))
+
+    return BatchedReplayMemory(replay_memory, n_batches)
+
+
+def test_batched_replay_memory_splits_one_sample():
+    np.random.seed(1)
+    samples = _get_memory(4).unwrap().get(4 * 8)
+
+    np.random.seed(1)
+    memory = _get_memory(4)
+    batches = [memory.get(8) for _ in range(4)]
+
+    # The minibatches of a fit are the consecutive slices of a single sample of the wrapped memory
+    for i, batch in enumerate(batches):
+        assert len(batch) == len(samples)
+        for values, sample_values in zip(batch, samples):
+            assert len(values) == 8
+            assert np.array_equal(values, sample_values[i * 8:(i + 1) * 8])
+
+    next_batch = memory.get(8)
+    assert not np.array_equal(next_batch[0], batches[0][0])
+
+
+def test_batched_replay_memory_discards_batches():
+    memory = _get_memory(4)
+
+    memory.get(8)
+    assert len(memory._batches) == 3
+
+    # New elements and a different minibatch size discard the minibatches not used yet
+    memory.add(_get_dataset(10))
+    assert len(memory._batches) == 0
+
+    memory.get(8)
+    assert len(memory.get(5)[0]) == 5
+    assert len(memory._batches) == 3
+
+    memory.add(list())
+    assert len(memory._batches) == 3
+
+    memory = pickle.loads(pickle.dumps(memory))
+    assert len(memory._batches) == 0
+    assert memory.size == 60
+
+
+def test_fit_batch_builders():
+    # The fit batching mode is set by the default builders, as used by the suites
+    for builder_class in [DQNBuilder, DoubleDQNBuilder, DDPGBuilder, TD3Builder, SACBuilder]:
+        assert builder_class.default().get_fit_batch() is None
+
+        agent_builder, defaults = builder_class.default(fit_batch=4, get_default_dict=True)
+        assert agent_builder.get_fit_batch() == 4
+        assert agent_builder.copy().get_fit_batch() == 4
+        assert defaults['fit_batch'] == 4
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from mushroom_rl.utils.replay_memory import ReplayMemory
+
+from mushroom_rl_benchmark.builders.memory import CompactReplayMemory, CompactPrioritizedReplayMemory, \
+    VectorizedPrioritizedReplayMemory
+
+
+def _get_dataset(random_state, n_episodes, history_length=4):
+    # Episodes of stacked frames, as produced by the Atari environments
+    dataset = list()
+    for _ in range(n_episodes):
+        length = random_state.randint(3, 15)
+        frames = [random_state.randint(0, 255, size=(3, 3)).astype(np.uint8)
+                  for _ in range(length + 1)]
+        frames = [frames[0]] * (history_length - 1) + frames
+        for t in range(length):
+            state = np.stack(frames[t:t + history_length])
+            next_state = np.stack(frames[t + 1:t + 1 + history_length])
+            absorbing = t == length - 1 and random_state.uniform() < .5
+            dataset.append((state, np.array([random_state.randint(4)]), random_state.normal(), next_state,
+                            absorbing, t == length - 1))
+
+    return dataset
+
+
+def _assert_same(samples, other_samples):
+    assert len(samples) == len(other_samples)
+    for values, other_values in zip(samples, other_samples):
+        assert np.array_equal(np.asarray(values), np.asarray(other_values))
+
+
+@pytest.mark.parametrize('n_steps_return', [1, 3])
+def test_compact_replay_memory(n_steps_return):
+    random_state = np.random.RandomState(0)
+    replay_memory = ReplayMemory(10, 100)
+    compact_replay_memory = CompactReplayMemory(10, 100)
+
+    # The sampled transitions are the same of the replay memory of MushroomRL, also after the memory is full
+    for i in range(20):
+        dataset = _get_dataset(random_state, 3)
+        replay_memory.add(dataset, n_steps_return=n_steps_return, gamma=.9)
+        compact_replay_memory.add(dataset, n_steps_return=n_steps_return, gamma=.9)
+
+        assert compact_replay_memory.size == replay_memory.size
+
+        np.random.seed(i)
+        samples = replay_memory.get(32)
+        np.random.seed(i)
+        _assert_same(compact_replay_memory.get(32), samples)
+
+    # The frames shared by the stacks are stored once
+    assert compact_replay_memory._frames.n_frames < 20 * 3 * 16
+    assert compact_replay_memory._frames._capacity < 4 * compact_replay_memory.size
+
+
+def test_compact_prioritized_replay_memory():
+    random_state = np.random.RandomState(0)
+    replay_memory = VectorizedPrioritizedReplayMemory(10, 100, .6, .4)
+    compact_replay_memory = CompactPrioritizedReplayMemory(10, 100, .6, .4)
+
+    for i in range(20):
+        dataset = _get_dataset(random_state, 3)
+        priorities = random_state.uniform(.1, 2., size=len(dataset))
+        replay_memory.add(dataset, priorities)
+        compact_replay_memory.add(dataset, priorities)
+
+        np.random.seed(i)
+        samples = replay_memory.get(32)
+        np.random.seed(i)
+        compact_samples = compact_replay_memory.get(32)
+        _assert_same(compact_samples, samples)
+
+        new_priorities = random_state.uniform(.1, 2., size=32)
+        replay_memory.update(new_priorities, samples[6])
+        compact_replay_memory.update(new_priorities, compact_samples[6])
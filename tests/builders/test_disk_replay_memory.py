@@ -0,0 +1,75 @@
+import shutil
+
+import numpy as np
+
+from mushroom_rl.utils.replay_memory import ReplayMemory
+
+from mushroom_rl_benchmark.builders.memory import DiskReplayMemory
+from mushroom_rl_benchmark.experiment.checkpoint import ReplayMemorySnapshot
+
+
+def _get_dataset(start, n):
+    return [(np.array([float(i), -float(i)]), np.array([i % 3]), float(i), np.array([i + 1., -i - 1.]), False,
+             i % 10 == 9) for i in range(start, start + n)]
+
+
+def _get_all(memory):
+    return memory.get_transitions(np.arange(memory.size))
+
+
+def _assert_same(transitions, other_transitions):
+    for values, other_values in zip(transitions, other_transitions):
+        assert np.array_equal(np.asarray(values).reshape(len(values), -1),
+                              np.asarray(other_values).reshape(len(other_values), -1))
+
+
+def test_disk_replay_memory(tmp_path):
+    replay_memory = ReplayMemory(10, 50)
+    disk_replay_memory = DiskReplayMemory(10, 50, path=tmp_path / 'replay_memory', hot_size=8)
+
+    # The hot window and the files hold the same transitions of a replay memory in memory
+    for start in range(0, 120, 15):
+        replay_memory.add(_get_dataset(start, 15))
+        disk_replay_memory.add(_get_dataset(start, 15))
+
+        assert disk_replay_memory.size == replay_memory.size
+        assert disk_replay_memory.initialized == replay_memory.initialized
+
+        np.random.seed(start)
+        samples = replay_memory.get(16)
+        np.random.seed(start)
+        disk_samples = disk_replay_memory.get(16)
+        _assert_same(disk_samples, samples)
+
+    disk_replay_memory.remove()
+    assert not (tmp_path / 'replay_memory').exists()
+
+
+def test_disk_replay_memory_snapshot(tmp_path):
+    checkpoint_path = tmp_path / 'checkpoint'
+    replay_memory = DiskReplayMemory(10, 50, path=checkpoint_path / 'replay_memory', hot_size=8)
+    snapshot = ReplayMemorySnapshot(checkpoint_path)
+
+    replay_memory.add(_get_dataset(0, 60))
+    state = snapshot.save(replay_memory)
+    transitions = _get_all(replay_memory)
+
+    # The transitions overwritten after the snapshot, also by a later interrupted snapshot, are written back
+    replay_memory.add(_get_dataset(60, 30))
+    snapshot.save(replay_memory)
+    replay_memory.add(_get_dataset(90, 30))
+    replay_memory.flush()
+
+    # The snapshot is restored also when the directory is moved
+    moved_path = tmp_path / 'moved_checkpoint'
+    shutil.move(str(checkpoint_path), str(moved_path))
+
+    restored_memory = ReplayMemorySnapshot(moved_path).load(DiskReplayMemory(10, 50, hot_size=8), state)
+    assert restored_memory.size == 50
+    _assert_same(_get_all(restored_memory), transitions)
+
+    # The restored memory can be restored again, after new transitions overwrite the snapshot
+    restored_memory.add(_get_dataset(200, 40))
+    restored_memory.flush()
+    restored_memory = ReplayMemorySnapshot(moved_path).load(DiskReplayMemory(10, 50, hot_size=8), state)
+    _assert_same(_get_all(restored_memory), transitions)
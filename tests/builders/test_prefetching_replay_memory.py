@@ -0,0 +1,67 @@
+import numpy as np
+
+from mushroom_rl.utils.replay_memory import ReplayMemory
+
+from mushroom_rl_benchmark.builders.memory import PrefetchingReplayMemory
+
+
+def _get_dataset(start, n):
+    # The values of each transition identify it, so that the samples can be checked against the memory
+    return [(np.array([float(i)]), np.array([i]), 2. * i, np.array([i + .5]), False, i % 10 == 9)
+            for i in range(start, start + n)]
+
+
+def _assert_consistent(samples, valid_transitions):
+    states, actions, rewards, next_states, absorbing, last = samples
+    transitions = states[:, 0].astype(int)
+
+    assert np.isin(transitions, valid_transitions).all()
+    assert np.array_equal(actions[:, 0], transitions)
+    assert np.array_equal(rewards, 2. * transitions)
+    assert np.array_equal(next_states[:, 0], transitions + .5)
+    assert np.array_equal(last, transitions % 10 == 9)
+
+
+def test_prefetching_replay_memory_overwritten_samples():
+    memory = PrefetchingReplayMemory(ReplayMemory(1, 20), seed=1)
+    memory.add(_get_dataset(0, 20))
+
+    memory.get(500)
+    memory.add(_get_dataset(20, 8))
+
+    # The prefetched samples of the overwritten slots are gathered again
+    _assert_consistent(memory.get(500), np.arange(8, 28))
+    memory.unwrap()
+
+
+def test_prefetching_replay_memory_new_samples():
+    memory = PrefetchingReplayMemory(ReplayMemory(1, 1000), seed=1)
+    memory.add(_get_dataset(0, 100))
+
+    n_new = 0
+    n_samples = 0
+    for start in range(100, 400, 100):
+        memory.get(2000)
+        memory.add(_get_dataset(start, 100))
+
+        # The prefetched minibatch is distributed as one sampled after the new transitions are added
+        samples = memory.get(2000)
+        _assert_consistent(samples, np.arange(start + 100))
+        n_new += (samples[0][:, 0] >= start).sum()
+        n_samples += 100 / (start + 100) * len(samples[0])
+
+    assert np.isclose(n_new, n_samples, rtol=.05)
+    memory.unwrap()
+
+
+def test_prefetching_replay_memory_reset():
+    memory = PrefetchingReplayMemory(ReplayMemory(1, 20), seed=1)
+    memory.add(_get_dataset(0, 20))
+    memory.get(10)
+
+    memory.reset()
+    memory.add(_get_dataset(100, 5))
+
+    assert memory.size == 5
+    _assert_consistent(memory.get(50), np.arange(100, 105))
+    memory.unwrap()
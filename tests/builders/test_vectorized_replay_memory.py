@@ -0,0 +1,76 @@
+import numpy as np
+
+from mushroom_rl_benchmark.builders.memory import VectorizedSumTree, VectorizedPrioritizedReplayMemory
+
+
+def _build_tree(priorities):
+    tree = VectorizedSumTree(len(priorities))
+    tree.add([(i, 0, 0., i, False, False) for i in range(len(priorities))], priorities, 1, 1.)
+
+    return tree
+
+
+def test_vectorized_sum_tree_distribution():
+    np.random.seed(1)
+    priorities = np.random.uniform(.1, 2., size=10)
+    tree = _build_tree(priorities)
+
+    idx, p = tree.retrieve(np.random.uniform(0, tree.total_p, size=200000))
+    frequencies = np.bincount(idx - tree._n_leaves, minlength=len(priorities)) / len(idx)
+
+    assert np.isclose(tree.total_p, priorities.sum())
+    assert np.allclose(p, priorities[idx - tree._n_leaves])
+    assert np.allclose(frequencies, priorities / priorities.sum(), atol=5e-3)
+
+
+def test_vectorized_sum_tree_update():
+    np.random.seed(1)
+    tree = _build_tree(np.ones(5))
+
+    tree.update(np.array([1, 3, 1]) + tree._n_leaves, [4., 2., 3.])
+
+    assert np.isclose(tree.total_p, 8.)
+    assert np.isclose(tree.max_p, 3.)
+    assert tree.retrieve([1.5])[0][0] - tree._n_leaves == 1
+
+
+def test_vectorized_sum_tree_padding():
+    np.random.seed(1)
+    n = 1000
+    tree = _build_tree(np.random.uniform(.1, 2., size=n))
+    for _ in range(20000):
+        tree.update(np.random.randint(n, size=32) + tree._n_leaves, np.random.uniform(.1, 2., size=32))
+
+    # The values at the end of the cumulative priority never reach the padding leaves
+    s = [np.nextafter(tree.total_p, 0), tree.total_p, tree.total_p * (1 + 1e-9)]
+    idx, p = tree.retrieve(s)
+
+    assert np.all(idx - tree._n_leaves < n)
+    assert np.all(p > 0)
+    assert all(data is not None for data in tree.get_data(idx))
+
+
+def test_vectorized_sum_tree_partially_filled():
+    np.random.seed(1)
+    tree = VectorizedSumTree(100)
+    tree.add([(i, 0, 0., i, False, False) for i in range(3)], np.ones(3), 1, 1.)
+
+    idx, _ = tree.retrieve([0., tree.total_p, tree.total_p * 2])
+
+    assert np.all(idx - tree._n_leaves < 3)
+
+
+def test_vectorized_prioritized_replay_memory():
+    np.random.seed(1)
+    memory = VectorizedPrioritizedReplayMemory(5, 100, alpha=.6, beta=.4)
+    dataset = [(np.array([i]), np.array([0]), float(i), np.array([i + 1]), False, False) for i in range(50)]
+    memory.add(dataset, np.ones(50))
+
+    states, actions, rewards, next_states, absorbing, last, idxs, is_weight = memory.get(16)
+
+    assert states.shape == (16, 1)
+    assert np.allclose(states[:, 0], rewards)
+    assert np.all(np.isfinite(is_weight)) and np.isclose(is_weight.max(), 1.)
+
+    memory.update(np.random.uniform(size=16), idxs)
+    assert np.isfinite(memory.get(16)[-1]).all()
@@ -0,0 +1,65 @@
+import numpy as np
+
+from mushroom_rl_benchmark.core.asha import ASHAScheduler
+
+
+def _run_serially(scheduler, scores):
+    jobs = list()
+    job = scheduler.next_job()
+    while job is not None:
+        jobs.append(job)
+        scheduler.report(job[0], job[1], scores[job[0]])
+        job = scheduler.next_job()
+
+    return jobs
+
+
+def test_asha_rungs():
+    assert ASHAScheduler(['a'], 9, min_fraction=1 / 9, reduction_factor=3).rungs == [1, 3, 9]
+    assert ASHAScheduler(['a'], 100, min_fraction=0.1, reduction_factor=3).rungs == [10, 30, 90, 100]
+    assert ASHAScheduler(['a'], 1).rungs == [1]
+
+
+def test_asha_promotion_order():
+    scheduler = ASHAScheduler(['a', 'b', 'c', 'd'], 4, min_fraction=0.25, reduction_factor=2)
+    assert scheduler.rungs == [1, 2, 4]
+
+    jobs = _run_serially(scheduler, dict(a=1., b=4., c=3., d=2.))
+
+    # The promotions have precedence over the new configurations
+    assert jobs == [('a', 0), ('b', 0), ('b', 1), ('c', 0), ('d', 0), ('c', 1), ('b', 2)]
+
+    decisions = scheduler.get_decisions()
+    assert {name: decision['rung'] for name, decision in decisions.items()} == dict(a=0, b=2, c=1, d=0)
+    assert {name: decision['pruned'] for name, decision in decisions.items()} == \
+        dict(a=True, b=False, c=True, d=True)
+    assert decisions['b']['epochs'] == 4 and decisions['b']['score'] == 4.
+
+
+def test_asha_asynchronous_jobs():
+    scheduler = ASHAScheduler(['a', 'b', 'c', 'd'], 4, min_fraction=0.25, reduction_factor=2)
+
+    jobs = [scheduler.next_job() for _ in range(4)]
+    assert jobs == [('a', 0), ('b', 0), ('c', 0), ('d', 0)]
+
+    # No job is available until a running one is reported
+    assert scheduler.next_job() is None
+
+    scheduler.report('c', 0, 1.)
+    assert scheduler.next_job() is None
+    scheduler.report('a', 0, 2.)
+    assert scheduler.next_job() == ('a', 1)
+    scheduler.report('b', 0, np.nan)
+    scheduler.report('d', 0, 0.)
+    assert scheduler.next_job() == ('c', 1)
+    assert scheduler.get_decisions()['b']['score'] == -np.inf
+
+
+def test_asha_completes_a_configuration():
+    # Too few configurations to promote any: the best one is promoted anyway, up to the last rung
+    scheduler = ASHAScheduler(['a', 'b'], 9, min_fraction=1 / 9, reduction_factor=3)
+
+    jobs = _run_serially(scheduler, dict(a=1., b=2.))
+
+    assert jobs == [('a', 0), ('b', 0), ('b', 1), ('b', 2)]
+    assert not scheduler.get_decisions()['b']['pruned']
@@ -0,0 +1,58 @@
+import numpy as np
+import torch.nn as nn
+
+from mushroom_rl_benchmark.builders import EnvironmentBuilder, DQNBuilder
+from mushroom_rl_benchmark.core import BenchmarkExperiment, BenchmarkLogger
+
+
+class Network(nn.Module):
+    def __init__(self, input_shape, output_shape, **kwargs):
+        super().__init__()
+
+        self._h = nn.Linear(input_shape[0], output_shape[0])
+
+    def forward(self, state, action=None):
+        q = self._h(state.float())
+
+        if action is None:
+            return q
+        else:
+            return q.gather(1, action.long()).squeeze(1)
+
+
+def _get_experiment(log_dir):
+    env_builder = EnvironmentBuilder('Gym.CartPole-v1', dict(horizon=50, gamma=.99))
+    agent_builder = DQNBuilder.default(lr=1e-3, network=Network, initial_replay_size=20, max_replay_size=100,
+                                       batch_size=8, target_update_frequency=20)
+    logger = BenchmarkLogger(log_dir=str(log_dir), log_id='experiment', use_timestamp=False)
+
+    return BenchmarkExperiment(agent_builder, env_builder, logger)
+
+
+def test_experiment_resume(tmp_path):
+    exp = _get_experiment(tmp_path)
+    exp.run(n_runs=2, n_epochs=1, n_steps=50, n_steps_test=50, save_plot=False)
+
+    # Only the missing runs are executed, with the saved parameters
+    resumed_exp = BenchmarkExperiment.from_path(tmp_path / 'experiment')
+    resumed_exp.resume(n_runs=3, save_plot=False)
+
+    assert list(resumed_exp.seeds) == [0, 1, 2]
+    assert np.array_equal(np.array(resumed_exp.J)[:2], np.array(exp.J))
+    assert resumed_exp.config['n_runs_completed'] == 3
+    assert resumed_exp.config['n_epochs'] == 1
+
+
+def test_experiment_resume_parallel(tmp_path):
+    exp = _get_experiment(tmp_path)
+    exp.run(exec_type='parallel', parallel=dict(max_concurrent_runs=2), n_runs=2, n_epochs=1, n_steps=50,
+            n_steps_test=50, save_plot=False)
+
+    # The saved executor settings are used by the resumed execution
+    resumed_exp = BenchmarkExperiment.from_path(tmp_path / 'experiment')
+    resumed_exp.resume(exec_type='parallel', n_runs=3, save_plot=False)
+
+    assert sorted(resumed_exp.seeds) == [0, 1, 2]
+    assert resumed_exp.config['n_runs_completed'] == 3
+    assert resumed_exp.config['max_concurrent_runs'] == 2
+    assert resumed_exp.config['run_parallel']
@@ -0,0 +1,97 @@
+import numpy as np
+
+from mushroom_rl_benchmark.core import BenchmarkLogger
+
+
+def _get_runs(n_runs, n_evaluations, seed=0):
+    rng = np.random.RandomState(seed)
+    return [rng.normal(size=n_evaluations) for _ in range(n_runs)]
+
+
+def _assert_runs_equal(loaded, expected):
+    assert len(loaded) == len(expected)
+    for loaded_run, run in zip(loaded, expected):
+        assert np.array_equal(np.asarray(loaded_run), run)
+
+
+def test_pickle_append_round_trip(tmp_path):
+    logger = BenchmarkLogger(tmp_path, 'exp', use_timestamp=False, columnar=False)
+    runs = _get_runs(5, 11)
+
+    logger.save_J(runs[:1])
+    logger.append_J(runs[1:3])
+    logger.append_J(runs[3:])
+    logger.save_seeds([0])
+    logger.append_seeds([1, 2, 3, 4])
+
+    assert logger.get_path('J.pkl').exists()
+    assert not logger.get_path('J.npy').exists()
+    _assert_runs_equal(logger.load_J(), runs)
+    assert list(logger.load_seeds()) == [0, 1, 2, 3, 4]
+
+    # A logger opened on an existing pickle log keeps the format
+    logger = BenchmarkLogger(tmp_path, 'exp', use_timestamp=False)
+    logger.append_J(runs[:1])
+    _assert_runs_equal(logger.load_J(), runs + runs[:1])
+
+
+def test_columnar_append_round_trip(tmp_path):
+    logger = BenchmarkLogger(tmp_path, 'exp', use_timestamp=False)
+    runs = _get_runs(4, 11)
+
+    logger.save_J(runs[:1])
+    inode = logger.get_path('J.npy').stat().st_ino
+    for run in runs[1:]:
+        logger.append_J([run])
+
+    assert not logger.get_path('J.pkl').exists()
+    assert np.load(logger.get_path('J.npy')).shape == (4, 11)
+    assert logger.get_path('J.npy').stat().st_ino == inode
+    _assert_runs_equal(logger.load_J(), runs)
+
+
+def test_columnar_append_runs_of_different_length(tmp_path):
+    logger = BenchmarkLogger(tmp_path, 'exp', use_timestamp=False)
+    runs = _get_runs(2, 11) + _get_runs(1, 5, seed=1) + _get_runs(1, 15, seed=2)
+
+    logger.save_J(runs[:2])
+    logger.append_J(runs[2:3])
+    logger.append_J(runs[3:])
+
+    _assert_runs_equal(logger.load_J(), runs)
+
+    J = logger.load_metric_array('J')
+    assert J.shape == (4, 15)
+    assert np.array_equal(J.mask.sum(axis=1), [4, 4, 10, 0])
+    assert np.array_equal(J[2].compressed(), runs[2])
+
+
+def test_columnar_append_integer_metric(tmp_path):
+    logger = BenchmarkLogger(tmp_path, 'exp', use_timestamp=False)
+    epochs = [np.arange(0, 11, dtype=int) for _ in range(3)]
+
+    logger.save_epochs(epochs[:1])
+    logger.append_epochs(epochs[1:])
+    logger.save_seeds([2])
+    logger.append_seeds([0, 1])
+
+    _assert_runs_equal(logger.load_epochs(), epochs)
+    assert list(logger.load_seeds()) == [2, 0, 1]
+
+
+def test_convert_to_columnar(tmp_path):
+    logger = BenchmarkLogger(tmp_path, 'exp', use_timestamp=False, columnar=False)
+    runs = _get_runs(3, 7)
+    logger.save_J(runs[:2])
+    logger.append_J(runs[2:])
+    logger.save_R(runs)
+
+    assert logger.convert_to_columnar() == 2
+
+    assert not logger.get_path('J.pkl').exists()
+    assert logger.get_path('J.npy').exists()
+    _assert_runs_equal(logger.load_J(), runs)
+    _assert_runs_equal(logger.load_R(), runs)
+
+    logger.append_J(runs[:1])
+    _assert_runs_equal(logger.load_J(), runs + runs[:1])
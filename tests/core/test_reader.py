@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from mushroom_rl_benchmark.core import BenchmarkLogger, ExperimentReader, SuiteReader, SweepStore
+
+
+def _save_experiment(logger, seed=0):
+    rng = np.random.RandomState(seed)
+    J = [rng.normal(size=6) for _ in range(3)]
+    logger.save_J(J[:1])
+    logger.append_J(J[1:])
+    logger.save_R([2 * run for run in J])
+    logger.save_seeds([0, 1, 2])
+    logger.save_epochs([np.arange(6) for _ in J])
+    logger.save_config(dict(n_runs=3, n_epochs=5))
+    logger.save_stats(dict(best_J=float(np.max(J))))
+
+    return J
+
+
+def _list_files(path):
+    return sorted(str(file.relative_to(path)) for file in path.rglob('*'))
+
+
+@pytest.mark.parametrize('columnar', [True, False])
+def test_experiment_reader_round_trip(tmp_path, columnar):
+    logger = BenchmarkLogger(tmp_path, 'exp', use_timestamp=False, columnar=columnar)
+    J = _save_experiment(logger)
+    files = _list_files(tmp_path)
+
+    reader = ExperimentReader(tmp_path / 'exp')
+
+    assert reader.exists_J() and reader.exists_seeds() and reader.exists_epochs()
+    assert reader.exists_config() and reader.exists_stats()
+    assert not reader.exists_value_function() and not reader.exists_policy_entropy()
+    assert not reader.exists_best_agent()
+    for loaded_run, run in zip(reader.load_J(), J):
+        assert np.array_equal(loaded_run, run)
+    for loaded_run, run in zip(reader.load_R(), J):
+        assert np.array_equal(loaded_run, 2 * run)
+    assert list(reader.load_seeds()) == [0, 1, 2]
+    assert np.array_equal(reader.load_metric_array('J'), np.array(J))
+    assert reader.load_config() == dict(n_runs=3, n_epochs=5)
+    assert reader.load_stats() == logger.load_stats()
+    assert _list_files(tmp_path) == files
+
+
+def test_experiment_reader_does_not_create_files(tmp_path):
+    reader = ExperimentReader(tmp_path / 'missing')
+
+    assert not reader.exists_J()
+    assert reader.get_run_dirs() == list()
+    assert not (tmp_path / 'missing').exists()
+
+
+def test_suite_reader_round_trip(tmp_path):
+    J = _save_experiment(BenchmarkLogger(tmp_path / 'Env', 'A', use_timestamp=False))
+    for i, sweep_key in enumerate(['x', 'y']):
+        _save_experiment(BenchmarkLogger(tmp_path / 'Env' / 'B', sweep_key, use_timestamp=False), seed=i)
+
+    store = SweepStore(tmp_path / 'Env' / 'C')
+    for sweep_key in ['z', 'w']:
+        logger = store.get_logger(sweep_key)
+        logger.save_J(J)
+        logger.save_config(dict(n_runs=3))
+    store.close()
+    files = _list_files(tmp_path)
+
+    reader = SuiteReader(tmp_path)
+
+    assert reader.get_environments() == ['Env']
+    assert sorted(reader.get_agents('Env')) == ['A', 'B', 'C']
+    assert reader.get_sweep_keys('Env', 'A') == list()
+    assert sorted(reader.get_sweep_keys('Env', 'B')) == ['x', 'y']
+    assert reader.get_sweep_keys('Env', 'C') == ['z', 'w']
+    assert reader.is_sweep()
+
+    experiments = {(environment, agent, sweep_key): experiment
+                   for environment, agent, sweep_key, experiment in reader.get_experiments()}
+    assert sorted(experiments, key=str) == sorted([('Env', 'A', None), ('Env', 'B', 'x'), ('Env', 'B', 'y'),
+                                                   ('Env', 'C', 'z'), ('Env', 'C', 'w')], key=str)
+    for key in [('Env', 'A', None), ('Env', 'C', 'w')]:
+        for loaded_run, run in zip(experiments[key].load_J(), J):
+            assert np.array_equal(loaded_run, run)
+    assert experiments[('Env', 'C', 'z')].load_config() == dict(n_runs=3)
+    assert _list_files(tmp_path) == files
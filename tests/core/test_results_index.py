@@ -0,0 +1,107 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from mushroom_rl_benchmark.core import BenchmarkLogger, ResultsIndex
+
+
+def _get_result(seed, final_J, n_epochs=4):
+    J = np.linspace(final_J - 1, final_J, n_epochs + 1)
+    J[1] = final_J + 2
+
+    return dict(seed=seed, epochs=np.arange(n_epochs + 1), J=J, R=2 * J, V=None, run_time_sec=10. + seed,
+                eval_time_sec=1., peak_memory_mb=100.)
+
+
+def _add_experiment(index, tmp_path, environment, agent, final_Js, sweep_key=None):
+    experiment_dir = tmp_path / environment / (agent if sweep_key is None else sweep_key)
+    for seed, final_J in enumerate(final_Js):
+        index.add_run(_get_result(seed, final_J), experiment_dir, environment, agent, sweep_key)
+
+    return experiment_dir
+
+
+def test_results_index_runs(tmp_path):
+    index = ResultsIndex(tmp_path / 'results.db')
+    experiment_dir = _add_experiment(index, tmp_path, 'CartPole', 'DQN', [1., 3., 2.])
+    index.add_run_failure(dict(seed=3, failed=True), experiment_dir, 'CartPole', 'DQN')
+
+    runs = index.get_runs(order_by='final_J')
+    assert [run['seed'] for run in runs] == [1, 2, 0]
+    assert runs[0]['final_J'] == 3.
+    assert runs[0]['best_J'] == 5.
+    assert runs[0]['final_R'] == 6.
+    assert runs[0]['best_V'] is None
+    assert runs[0]['n_epochs'] == 4
+    assert runs[0]['run_time_sec'] == 11.
+    assert runs[0]['experiment_dir'] == str(experiment_dir)
+
+    assert len(index.get_runs(include_failed=True)) == 4
+    assert [run['seed'] for run in index.get_runs(include_failed=True, failed=True)] == [3]
+    assert len(index.get_runs(where='final_J >= 2')) == 2
+    assert len(index.get_runs(seed=[0, 1])) == 2
+    assert len(index.get_runs(order_by='best_J', limit=1)) == 1
+
+    # A run recorded again replaces its previous record
+    index.add_run(_get_result(3, 4.), experiment_dir, 'CartPole', 'DQN')
+    assert len(index.get_runs(include_failed=True)) == 4
+    assert index.get_runs(order_by='final_J')[0]['seed'] == 3
+
+    with pytest.raises(ValueError):
+        index.get_runs(order_by='final_J; DROP TABLE runs')
+
+
+def test_results_index_rank(tmp_path):
+    index = ResultsIndex(tmp_path / 'results.db')
+    _add_experiment(index, tmp_path, 'CartPole', 'DQN', [1., 2., 7.])
+    _add_experiment(index, tmp_path, 'CartPole', 'DDQN', [3., 3., 3.])
+    _add_experiment(index, tmp_path, 'Acrobot', 'DQN', [-1., -2.])
+    _add_experiment(index, tmp_path, 'Acrobot', 'DQN', [-3.], sweep_key='lr_1')
+
+    ranking = index.rank()
+    assert [(experiment['environment'], experiment['agent']) for experiment in ranking] == \
+        [('CartPole', 'DQN'), ('CartPole', 'DDQN'), ('Acrobot', 'DQN'), ('Acrobot', 'DQN')]
+    assert ranking[0]['value'] == pytest.approx(10. / 3)
+    assert ranking[0]['std'] == pytest.approx(np.std([1., 2., 7.]))
+    assert ranking[0]['n_runs'] == 3
+    assert ranking[1]['std'] == pytest.approx(0.)
+
+    # The median is robust to the outlier of the first experiment
+    ranking = index.rank(aggregate='median', environment='CartPole')
+    assert [experiment['agent'] for experiment in ranking] == ['DDQN', 'DQN']
+    assert ranking[1]['value'] == pytest.approx(2.)
+
+    top = index.top_k(k=1)
+    assert [(experiment['environment'], experiment['agent'], experiment['sweep_key']) for experiment in top] == \
+        [('Acrobot', 'DQN', None), ('CartPole', 'DQN', None)]
+
+    top = index.top_k(k=2, environment='Acrobot', descending=False)
+    assert [experiment['sweep_key'] for experiment in top] == ['lr_1', None]
+
+
+def test_results_index_experiment(tmp_path):
+    logger = BenchmarkLogger(log_dir=str(tmp_path / 'suite' / 'CartPole'), log_id='DQN', use_timestamp=False)
+    results = [_get_result(seed, final_J) for seed, final_J in [(0, 1.), (2, 5.)]]
+    logger.save_seeds([result['seed'] for result in results])
+    logger.save_epochs([result['epochs'] for result in results])
+    logger.save_J([result['J'] for result in results])
+    logger.save_R([result['R'] for result in results])
+
+    index = ResultsIndex(tmp_path / 'suite' / 'results.db')
+    assert index.add_experiment(logger, 'CartPole', 'DQN') == 2
+
+    runs = index.get_runs(order_by='seed', descending=False)
+    assert [run['seed'] for run in runs] == [0, 2]
+    assert [run['final_J'] for run in runs] == [1., 5.]
+    assert runs[0]['run_dir'] is None
+
+    # The records of the experiment are replaced, and the paths follow the moved index
+    assert index.add_experiment(logger, 'CartPole', 'DQN') == 2
+    index.close()
+
+    shutil.move(str(tmp_path / 'suite'), str(tmp_path / 'moved_suite'))
+    index = ResultsIndex(tmp_path / 'moved_suite' / 'results.db')
+    runs = index.get_runs()
+    assert len(runs) == 2
+    assert runs[0]['experiment_dir'] == str(tmp_path / 'moved_suite' / 'CartPole' / 'DQN')
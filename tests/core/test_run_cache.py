@@ -0,0 +1,109 @@
+import time
+import pickle
+import functools
+import threading
+
+import numpy as np
+import torch
+
+from mushroom_rl_benchmark.builders import EnvironmentBuilder, DQNBuilder
+from mushroom_rl_benchmark.core import RunCache
+
+
+def _get_builders(lr=1e-4):
+    agent_builder = DQNBuilder.default(lr=lr, initial_replay_size=100, max_replay_size=1000)
+    env_builder = EnvironmentBuilder('Gym.CartPole-v1', dict(horizon=200, gamma=.99))
+
+    return agent_builder, env_builder
+
+
+def _get_result(seed, n_evaluations=5):
+    J = np.random.RandomState(seed).normal(size=n_evaluations)
+
+    return dict(seed=seed, epochs=np.arange(n_evaluations), J=J, R=2 * J, V=J / 2,
+                score=[J.max(), 2 * J.max(), J.max() / 2], run_time_sec=1., eval_time_sec=.5,
+                eval_time_saved_sec=0., peak_memory_mb=100., n_env_steps=0, n_updates=0)
+
+
+def test_run_cache_key_stability():
+    run_params = dict(seed=0, n_epochs=10, n_steps=1000, n_steps_test=500)
+    key = RunCache.get_key(*_get_builders(), run_params)
+
+    assert len(key) == 64
+    assert RunCache.get_key(*_get_builders(), dict(run_params)) == key
+    assert RunCache.get_key(*pickle.loads(pickle.dumps(_get_builders())), run_params) == key
+    assert RunCache.get_key(*_get_builders(), dict(run_params, quiet=True, run_dir='/tmp/run_0',
+                                                   checkpoint_frequency=2, max_retries=3)) == key
+
+    assert RunCache.get_key(*_get_builders(), dict(run_params, seed=1)) != key
+    assert RunCache.get_key(*_get_builders(), dict(run_params, n_epochs=11)) != key
+    assert RunCache.get_key(*_get_builders(lr=1e-3), run_params) != key
+    assert RunCache.get_key(*_get_builders(), dict(run_params, seed=None)) is None
+    assert RunCache.get_key(*_get_builders(), dict(run_params, keep_checkpoint=True)) is None
+
+
+def test_run_cache_key_opaque_objects():
+    run_params = dict(seed=0, n_epochs=10, n_steps=1000, n_steps_test=500)
+
+    def get_key(value):
+        agent_builder, env_builder = _get_builders()
+        agent_builder.extra_param = value
+        return RunCache.get_key(agent_builder, env_builder, run_params)
+
+    # The objects not keeping their state in their attributes are distinguished by their content
+    assert get_key(torch.tensor([1., 2.])) == get_key(torch.tensor([1., 2.]))
+    assert get_key(torch.tensor([1., 2.])) != get_key(torch.tensor([1., 3.]))
+    assert get_key(functools.partial(max, 1)) == get_key(functools.partial(max, 1))
+    assert get_key(functools.partial(max, 1)) != get_key(functools.partial(max, 2))
+    assert get_key(functools.partial(max, key=abs)) != get_key(functools.partial(max, key=len))
+    assert get_key(np.random.RandomState(0)) == get_key(np.random.RandomState(0))
+    assert get_key(np.random.RandomState(0)) != get_key(np.random.RandomState(1))
+
+    # The runs whose specification cannot be serialized are not cached
+    assert get_key(threading.Lock()) is None
+
+
+def test_run_cache_round_trip(tmp_path):
+    cache = RunCache(tmp_path / 'cache')
+    result = _get_result(0)
+
+    assert cache.get('a') is None
+    cache.put('a', result, compute_policy_entropy=False)
+
+    cached = cache.get('a')
+    assert cached['cached']
+    assert np.array_equal(cached['J'], result['J'])
+    assert np.array_equal(cached['epochs'], result['epochs'])
+    assert cached['run_time_sec'] == result['run_time_sec']
+
+    summary = cache.get('a', tmp_path / 'run_0')
+    assert summary['run_dir'] == str(tmp_path / 'run_0')
+    assert (tmp_path / 'run_0' / 'stats.yaml').exists()
+    assert 'J' not in summary
+
+
+def test_run_cache_eviction(tmp_path):
+    cache = RunCache(tmp_path / 'cache', max_entries=2)
+
+    cache.put('a', _get_result(0), compute_policy_entropy=False)
+    time.sleep(.01)
+    cache.put('b', _get_result(1), compute_policy_entropy=False)
+    time.sleep(.01)
+    cache.get('a')
+    time.sleep(.01)
+    cache.put('c', _get_result(2), compute_policy_entropy=False)
+
+    # The least recently used entry is evicted
+    assert cache.get_size()[0] == 2
+    assert cache.get('b') is None
+    assert not (cache.path / 'entries' / 'b').exists()
+    assert cache.get('a') is not None and cache.get('c') is not None
+
+    # Lower limits evict the entries when the cache is opened again
+    _, size_mb = cache.get_size()
+    cache = RunCache(tmp_path / 'cache', max_size_mb=.75 * size_mb)
+    assert cache.get_size()[0] == 1
+    assert cache.get('c') is not None
+
+    cache.clear()
+    assert cache.get_size() == (0, 0.)
@@ -0,0 +1,71 @@
+import numpy as np
+
+from mushroom_rl_benchmark.core import SweepStore
+
+
+def test_sweep_store_runs_round_trip(tmp_path):
+    store = SweepStore(tmp_path)
+    runs = [np.random.RandomState(i).normal(size=i + 3) for i in range(4)]
+
+    store.save_runs('a', 'J', runs[:2])
+    store.append_runs('a', 'J', runs[2:])
+    store.save_runs('b', 'J', runs[:1])
+
+    assert store.exists_runs('a', 'J')
+    assert not store.exists_runs('a', 'R')
+    for loaded_run, run in zip(store.load_runs('a', 'J'), runs):
+        assert np.array_equal(loaded_run, run)
+    assert len(store.load_runs('b', 'J')) == 1
+
+    # Saving replaces the runs of the metric of the configuration only
+    store.save_runs('a', 'J', runs[3:])
+    assert len(store.load_runs('a', 'J')) == 1
+    assert len(store.load_runs('b', 'J')) == 1
+
+
+def test_sweep_store_content_addressed_fields(tmp_path):
+    store = SweepStore(tmp_path)
+    for sweep_key in ['a', 'b']:
+        store.get_logger(sweep_key)
+        store.save_field(sweep_key, 'agent_builder', b'builder', content_addressed=True)
+
+    assert store.load_field('a', 'agent_builder') == store.load_field('b', 'agent_builder')
+    assert store.load_field('a', 'agent_builder', content_addressed=True) == b'builder'
+    assert store._connection.execute('SELECT COUNT(*) FROM objects').fetchone()[0] == 1
+
+    # A replaced object is removed only once no configuration references it
+    store.save_field('a', 'best_agent', b'agent 1', content_addressed=True)
+    store.save_field('b', 'best_agent', b'agent 1', content_addressed=True)
+    store.save_field('a', 'best_agent', b'agent 2', content_addressed=True)
+    assert store._connection.execute('SELECT COUNT(*) FROM objects').fetchone()[0] == 3
+    store.save_field('b', 'best_agent', b'agent 2', content_addressed=True)
+    assert store._connection.execute('SELECT COUNT(*) FROM objects').fetchone()[0] == 2
+
+
+def test_sweep_logger_round_trip(tmp_path):
+    store = SweepStore(tmp_path)
+    logger = store.get_logger('lr_0.001')
+    J = [np.arange(5.), np.arange(5.) + 1]
+
+    logger.save_J(J[:1])
+    logger.append_J(J[1:])
+    logger.save_seeds([0])
+    logger.append_seeds([1])
+    logger.save_config(dict(n_runs=2, n_epochs=4))
+    logger.save_stats(dict(best_J=5.))
+    logger.save_parameters(dict(lr=0.001))
+    store.close()
+
+    store = SweepStore(tmp_path, read_only=True)
+    logger = store.get_logger('lr_0.001')
+
+    assert store.get_sweep_keys() == ['lr_0.001']
+    assert logger.exists_J() and logger.exists_seeds() and not logger.exists_value_function()
+    for loaded_run, run in zip(logger.load_J(), J):
+        assert np.array_equal(loaded_run, run)
+    assert logger.load_seeds() == [0, 1]
+    assert np.array_equal(logger.load_metric_array('J'), np.array(J))
+    assert logger.load_config() == dict(n_runs=2, n_epochs=4)
+    assert logger.load_stats() == dict(best_J=5.)
+    assert logger.load_parameters() == dict(lr=0.001)
+    assert logger.get_run_path(0) is None
@@ -0,0 +1,59 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+import torch.nn as nn
+
+from mushroom_rl_benchmark.builders import EnvironmentBuilder, DQNBuilder
+from mushroom_rl_benchmark.experiment import exec_run
+
+
+class Network(nn.Module):
+    def __init__(self, input_shape, output_shape, **kwargs):
+        super().__init__()
+
+        self._h = nn.Linear(input_shape[0], output_shape[0])
+
+    def forward(self, state, action=None):
+        q = self._h(state.float())
+
+        if action is None:
+            return q
+        else:
+            return q.gather(1, action.long()).squeeze(1)
+
+
+class FailingDQNBuilder(DQNBuilder):
+    def compute_Q(self, agent, states):
+        raise ValueError('The evaluation failed')
+
+
+def _get_builders(builder_class=DQNBuilder):
+    env_builder = EnvironmentBuilder('Gym.CartPole-v1', dict(horizon=50, gamma=.99))
+    agent_builder = builder_class.default(lr=1e-3, network=Network, initial_replay_size=20, max_replay_size=100,
+                                          batch_size=8, target_update_frequency=20)
+    return agent_builder, env_builder
+
+
+def _get_children():
+    # The workers started by the other tests, e.g. the joblib executors, are still alive
+    return set(process.pid for process in multiprocessing.active_children())
+
+
+def test_async_evaluation():
+    children = _get_children()
+    result = exec_run(*_get_builders(), n_epochs=3, n_steps=50, n_steps_test=50, seed=0, async_eval=True)
+
+    assert np.array_equal(result['epochs'], np.arange(4))
+    assert len(result['J']) == 4
+    assert _get_children() <= children
+
+
+def test_async_evaluation_failure():
+    # The evaluation process is stopped when the run fails
+    children = _get_children()
+    with pytest.raises(RuntimeError, match='Evaluation of epoch 0 failed'):
+        exec_run(*_get_builders(FailingDQNBuilder), n_epochs=3, n_steps=50, n_steps_test=50, seed=0,
+                 async_eval=True)
+
+    assert _get_children() <= children
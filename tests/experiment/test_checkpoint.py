@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+import torch.nn as nn
+
+from mushroom_rl.utils.replay_memory import ReplayMemory, PrioritizedReplayMemory
+
+from mushroom_rl_benchmark.builders import EnvironmentBuilder, DQNBuilder
+from mushroom_rl_benchmark.builders.memory import CompactReplayMemory, CompactPrioritizedReplayMemory, \
+    VectorizedPrioritizedReplayMemory
+from mushroom_rl_benchmark.experiment import exec_run
+from mushroom_rl_benchmark.experiment.checkpoint import ReplayMemorySnapshot
+
+
+class Network(nn.Module):
+    def __init__(self, input_shape, output_shape, **kwargs):
+        super().__init__()
+
+        self._h = nn.Linear(input_shape[0], output_shape[0])
+
+    def forward(self, state, action=None):
+        q = self._h(state.float())
+
+        if action is None:
+            return q
+        else:
+            return q.gather(1, action.long()).squeeze(1)
+
+
+def _get_dataset(n, random_state, frames):
+    if frames:
+        frame_list = [random_state.randint(0, 255, size=(3, 3)).astype(np.uint8) for _ in range(n + 4)]
+        states = [np.stack(frame_list[i:i + 4]) for i in range(n + 1)]
+    else:
+        states = [random_state.normal(size=2) for _ in range(n + 1)]
+
+    return [(states[i], np.array([random_state.randint(3)]), random_state.normal(), states[i + 1], False,
+             i == n - 1) for i in range(n)]
+
+
+@pytest.mark.parametrize('build_memory, prioritized, frames', [
+    (lambda: ReplayMemory(10, 300), False, False),
+    (lambda: PrioritizedReplayMemory(10, 300, .6, .4), True, False),
+    (lambda: VectorizedPrioritizedReplayMemory(10, 300, .6, .4), True, False),
+    (lambda: CompactReplayMemory(10, 300), False, True),
+    (lambda: CompactPrioritizedReplayMemory(10, 300, .6, .4), True, True)
+])
+def test_replay_memory_snapshot(tmp_path, build_memory, prioritized, frames):
+    random_state = np.random.RandomState(0)
+    replay_memory = build_memory()
+    snapshot = ReplayMemorySnapshot(tmp_path)
+
+    states = list()
+    for _ in range(5):
+        dataset = _get_dataset(80, random_state, frames)
+        if prioritized:
+            replay_memory.add(dataset, np.full(len(dataset), random_state.uniform(.5, 2.)))
+            replay_memory.update(random_state.normal(size=16), replay_memory.get(16)[6])
+        else:
+            replay_memory.add(dataset)
+        states.append(snapshot.save(replay_memory, len(dataset)))
+
+    # The following snapshots append the new slots to the first one
+    assert states[1]['generation'] == states[0]['generation']
+
+    restored_memory = ReplayMemorySnapshot(tmp_path).load(build_memory(), states[-1])
+
+    np.random.seed(1)
+    samples = replay_memory.get(64)
+    np.random.seed(1)
+    restored_samples = restored_memory.get(64)
+    for values, restored_values in zip(samples, restored_samples):
+        assert np.array_equal(values, restored_values)
+
+
+@pytest.mark.parametrize('replay_memory', [None, 'compact', 'disk'])
+def test_checkpoint_resume(tmp_path, replay_memory):
+    def get_builders():
+        env_builder = EnvironmentBuilder('Gym.CartPole-v1', dict(horizon=100, gamma=.99))
+        agent_builder = DQNBuilder.default(lr=1e-3, network=Network, initial_replay_size=50, max_replay_size=300,
+                                           batch_size=16, target_update_frequency=50, replay_memory=replay_memory)
+        return agent_builder, env_builder
+
+    run_params = dict(n_steps=150, n_steps_test=100, seed=3)
+    result = exec_run(*get_builders(), n_epochs=4, **run_params)
+
+    # The run continued from the checkpoint of the second epoch is the same as the uninterrupted one
+    checkpoint_dir = tmp_path / 'checkpoint'
+    exec_run(*get_builders(), n_epochs=2, checkpoint_dir=str(checkpoint_dir), keep_checkpoint=True, **run_params)
+    assert checkpoint_dir.exists()
+    resumed_result = exec_run(*get_builders(), n_epochs=4, checkpoint_dir=str(checkpoint_dir), **run_params)
+
+    assert np.array_equal(resumed_result['epochs'], result['epochs'])
+    assert np.array_equal(resumed_result['J'], result['J'])
+    assert np.array_equal(resumed_result['R'], result['R'])
+    assert np.array_equal(resumed_result['V'], result['V'])
+    assert not checkpoint_dir.exists()
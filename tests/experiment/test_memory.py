@@ -0,0 +1,77 @@
+from collections import deque
+
+import numpy as np
+
+from mushroom_rl_benchmark.experiment import memory
+from mushroom_rl_benchmark.experiment.memory import MemoryAdmission
+from mushroom_rl_benchmark.experiment.worker_pool import WorkerPool
+
+
+def test_memory_admission_budget():
+    admission = MemoryAdmission(budget=1000., min_available=-np.inf, safety_factor=1.)
+    admission.set_estimate('a', 400.)
+    admission.set_estimate('b', 150.)
+
+    for run_id in range(2):
+        assert admission.can_admit('a')
+        admission.admit(run_id, 'a')
+
+    assert not admission.can_admit('a')
+    assert admission.can_admit('b')
+
+    admission.release(0, 'a')
+    assert admission.can_admit('a')
+
+
+def test_memory_admission_first_run():
+    # A run larger than the budget is admitted when no other run is running
+    admission = MemoryAdmission(budget=100., min_available=-np.inf)
+    admission.set_estimate('a', 400.)
+
+    assert admission.can_admit('a')
+    admission.admit(0, 'a')
+    assert not admission.can_admit('a')
+
+
+def test_memory_admission_measured_memory():
+    admission = MemoryAdmission(budget=1000., min_available=-np.inf, safety_factor=1.5)
+    admission.set_estimate('a', 400.)
+
+    assert admission.get_estimate('a') == 400.
+    assert admission.get_estimate('b') == memory._process_memory_mb
+
+    admission.admit(0, 'a')
+    assert not admission.can_admit('a')
+
+    # The largest peak memory measured replaces the estimate
+    admission.release(0, 'a', peak_memory=200.)
+    admission.admit(1, 'a')
+    admission.release(1, 'a', peak_memory=150.)
+    assert admission.get_estimate('a') == 200.
+
+    admission.admit(2, 'a')
+    assert admission.can_admit('a')
+
+
+def test_memory_admission_available_memory(monkeypatch):
+    monkeypatch.setattr(memory, 'get_system_memory', lambda: (16000., 1500.))
+    admission = MemoryAdmission(min_available=1024., safety_factor=1.)
+    admission.set_estimate('a', 400.)
+    admission.set_estimate('b', 600.)
+    admission.admit(0, 'a')
+
+    assert admission.can_admit('a')
+    assert not admission.can_admit('b')
+
+
+def test_worker_pool_admission_order():
+    admission = MemoryAdmission(budget=1000., min_available=-np.inf, safety_factor=1.)
+    admission.set_estimate('a', 600.)
+    admission.set_estimate('b', 300.)
+    admission.admit('running', 'a')
+
+    # The runs of an experiment that does not fit are skipped for the runs of the ones that fit
+    pending = deque(enumerate([('a', dict(seed=0)), ('a', dict(seed=1)), ('b', dict(seed=0))]))
+    assert WorkerPool._pop_admissible(pending, admission) == (2, ('b', dict(seed=0)))
+    assert WorkerPool._pop_admissible(pending, admission) is None
+    assert len(pending) == 2
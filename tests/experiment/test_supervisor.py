@@ -0,0 +1,74 @@
+import time
+
+import numpy as np
+import torch.nn as nn
+
+from mushroom_rl_benchmark.builders import EnvironmentBuilder, DQNBuilder
+from mushroom_rl_benchmark.experiment import exec_run
+from mushroom_rl_benchmark.experiment.supervisor import exec_supervised_run, is_failed_run
+
+
+class Network(nn.Module):
+    def __init__(self, input_shape, output_shape, **kwargs):
+        super().__init__()
+
+        self._h = nn.Linear(input_shape[0], output_shape[0])
+
+    def forward(self, state, action=None):
+        q = self._h(state.float())
+
+        if action is None:
+            return q
+        else:
+            return q.gather(1, action.long()).squeeze(1)
+
+
+def _get_builders():
+    env_builder = EnvironmentBuilder('Gym.CartPole-v1', dict(horizon=50, gamma=.99))
+    agent_builder = DQNBuilder.default(lr=1e-3, network=Network, initial_replay_size=20, max_replay_size=100,
+                                       batch_size=8, target_update_frequency=20)
+    return agent_builder, env_builder
+
+
+def _sleeping_run(agent_builder, env_builder, duration, seed=None):
+    time.sleep(duration)
+    return dict(seed=seed)
+
+
+def _failing_run(agent_builder, env_builder, seed=None):
+    raise ValueError('The run failed')
+
+
+def test_supervised_run():
+    run_params = dict(n_epochs=2, n_steps=50, n_steps_test=50, seed=0)
+    result = exec_supervised_run(exec_run, *_get_builders(), **run_params)
+
+    # The run executed in a separate process gives the same results
+    timed_result = exec_supervised_run(exec_run, *_get_builders(), run_timeout=300, **run_params)
+
+    assert not is_failed_run(timed_result)
+    assert np.array_equal(timed_result['J'], result['J'])
+    assert np.array_equal(timed_result['R'], result['R'])
+
+
+def test_supervised_run_failure():
+    result = exec_supervised_run(_failing_run, *_get_builders(), max_retries=2, seed=3)
+
+    assert is_failed_run(result)
+    assert result['seed'] == 3
+    assert result['n_attempts'] == 3
+    assert 'The run failed' in result['error']
+
+
+def test_supervised_run_timeout():
+    start_time = time.time()
+    result = exec_supervised_run(_sleeping_run, *_get_builders(), max_retries=1, run_timeout=1, duration=60,
+                                 seed=3)
+
+    assert is_failed_run(result)
+    assert result['n_attempts'] == 2
+    assert 'timed out' in result['error']
+    assert time.time() - start_time < 60
+
+    result = exec_supervised_run(_sleeping_run, *_get_builders(), run_timeout=30, duration=0, seed=3)
+    assert result == dict(seed=3)
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+import torch.nn as nn
+
+from mushroom_rl.utils.dataset import compute_J
+
+from mushroom_rl_benchmark.builders import EnvironmentBuilder, DQNBuilder
+from mushroom_rl_benchmark.experiment import VectorizedEvaluator
+
+
+class Network(nn.Module):
+    def __init__(self, input_shape, output_shape, **kwargs):
+        super().__init__()
+
+        self._h = nn.Linear(input_shape[0], output_shape[0])
+
+    def forward(self, state, action=None):
+        q = self._h(state.float())
+
+        if action is None:
+            return q
+        else:
+            return q.gather(1, action.long()).squeeze(1)
+
+
+def _get_episodes(dataset):
+    episodes = list()
+    start = 0
+    for t, transition in enumerate(dataset):
+        if transition[5]:
+            episodes.append(dataset[start:t + 1])
+            start = t + 1
+
+    return episodes
+
+
+@pytest.mark.parametrize('n_envs', [1, 3, 4])
+def test_vectorized_evaluation_steps(n_envs):
+    horizon = 30
+    env_builder = EnvironmentBuilder('Gym.CartPole-v1', dict(horizon=horizon, gamma=.99))
+    agent_builder = DQNBuilder.default(network=Network, initial_replay_size=20, max_replay_size=100)
+    evaluator = VectorizedEvaluator(env_builder, n_envs, seed=0)
+    agent = agent_builder.build(evaluator.environments[0].info)
+    agent_builder.set_eval_mode(agent, True)
+
+    np.random.seed(0)
+    dataset = evaluator.evaluate(agent, agent_builder, n_steps=100)
+
+    assert 100 - (n_envs - 1) * horizon <= len(dataset) <= 100
+    assert dataset[-1][5]
+
+    # As with Core.evaluate, only the last episode can be truncated by the number of steps
+    episodes = _get_episodes(dataset)
+    for episode in episodes[:-1]:
+        assert episode[-1][4] or len(episode) == horizon
+    assert len(compute_J(dataset)) == len(episodes)
+
+
+def test_vectorized_evaluation_episodes():
+    env_builder = EnvironmentBuilder('Gym.CartPole-v1', dict(horizon=30, gamma=.99))
+    agent_builder = DQNBuilder.default(network=Network, initial_replay_size=20, max_replay_size=100)
+    evaluator = VectorizedEvaluator(env_builder, 3, seed=0)
+    agent = agent_builder.build(evaluator.environments[0].info)
+    agent_builder.set_eval_mode(agent, True)
+
+    dataset = evaluator.evaluate(agent, agent_builder, n_episodes=7)
+
+    episodes = _get_episodes(dataset)
+    assert len(episodes) == 7
+    for episode in episodes:
+        assert episode[-1][4] or len(episode) == 30
@@ -0,0 +1,80 @@
+import sys
+import subprocess
+
+import torch.nn as nn
+
+from mushroom_rl_benchmark.builders import EnvironmentBuilder, DQNBuilder
+from mushroom_rl_benchmark.experiment import WorkerPool
+from mushroom_rl_benchmark.experiment.run_artifacts import load_run_result
+
+
+class Network(nn.Module):
+    def __init__(self, input_shape, output_shape, **kwargs):
+        super().__init__()
+
+        self._h = nn.Linear(input_shape[0], output_shape[0])
+
+    def forward(self, state, action=None):
+        q = self._h(state.float())
+
+        if action is None:
+            return q
+        else:
+            return q.gather(1, action.long()).squeeze(1)
+
+
+def _get_builders():
+    env_builder = EnvironmentBuilder('Gym.CartPole-v1', dict(horizon=50, gamma=.99))
+    agent_builder = DQNBuilder.default(lr=1e-3, network=Network, initial_replay_size=20, max_replay_size=100,
+                                       batch_size=8, target_update_frequency=20)
+    return agent_builder, env_builder
+
+
+def test_worker_pool_run(tmp_path):
+    pool = WorkerPool(2)
+    try:
+        builder_id = pool.register(*_get_builders())
+        runs = [(builder_id, dict(n_epochs=1, n_steps=50, n_steps_test=50, seed=seed,
+                                  run_dir=str(tmp_path / str(seed)))) for seed in range(3)]
+
+        results = dict()
+        for run_id, result in pool.run(runs):
+            # The runs appended while the results are consumed are executed as well
+            if len(runs) == 3:
+                runs.append((builder_id, dict(n_epochs=1, n_steps=50, n_steps_test=50, seed=3,
+                                              run_dir=str(tmp_path / '3'))))
+            results[run_id] = result
+    finally:
+        pool.close()
+
+    assert sorted(results) == list(range(4))
+    for run_id, result in results.items():
+        assert result['seed'] == run_id
+        assert not result.get('failed', False)
+        assert len(load_run_result(result)['J']) == 2
+
+
+def test_worker_pool_failed_run():
+    pool = WorkerPool(1)
+    try:
+        builder_id = pool.register(*_get_builders())
+        runs = [(builder_id, dict(n_epochs=1, n_steps=50, seed=0)),
+                (builder_id, dict(n_epochs=1, n_steps=50, n_steps_test=50, seed=1))]
+        results = dict(pool.run(runs))
+    finally:
+        pool.close()
+
+    assert results[0]['failed']
+    assert not results[1].get('failed', False)
+
+
+def test_worker_pool_exit_without_close():
+    # The interpreter exits even if the pool is not closed
+    script = '\n'.join([
+        'from mushroom_rl_benchmark.experiment import WorkerPool',
+        'if __name__ == "__main__":',
+        '    pool = WorkerPool(2)'
+    ])
+    process = subprocess.run([sys.executable, '-c', script], timeout=120)
+
+    assert process.returncode == 0